@@ -9,6 +9,8 @@ set -e
 JOB_NAME="monte-carlo-batch"
 DEFAULT_DAYS=252
 DEFAULT_SIMULATIONS=10000
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PYTHON="${PYTHON:-python3}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -89,8 +91,9 @@ OPTIONS:
     -d, --days DAYS              Number of trading days to simulate (default: $DEFAULT_DAYS)
     -s, --simulations SIMS       Number of Monte Carlo paths (default: $DEFAULT_SIMULATIONS)
     -j, --job-name NAME          Nomad job name (default: $JOB_NAME)
-    -w, --wait                   Wait for all jobs to complete
-    -m, --monitor                Monitor job progress after dispatch
+    -w, --wait                   Wait for all jobs to complete; exit non-zero if any failed
+    -m, --monitor                Follow job progress after dispatch (Ctrl-C to stop)
+    -t, --timeout SECONDS        Stop monitoring or waiting after SECONDS
     -c, --cleanup                Stop all running child jobs for this job
     -h, --help                   Show this help message
 
@@ -117,6 +120,7 @@ DAYS=$DEFAULT_DAYS
 SIMULATIONS=$DEFAULT_SIMULATIONS
 WAIT_FOR_COMPLETION=false
 MONITOR_JOBS=false
+MONITOR_TIMEOUT=""
 CLEANUP_JOBS=false
 
 while [[ $# -gt 0 ]]; do
@@ -141,6 +145,10 @@ while [[ $# -gt 0 ]]; do
             MONITOR_JOBS=true
             shift
             ;;
+        -t|--timeout)
+            MONITOR_TIMEOUT="$2"
+            shift 2
+            ;;
         -c|--cleanup)
             CLEANUP_JOBS=true
             shift
@@ -218,8 +226,9 @@ for ticker in "${TICKERS[@]}"; do
         -meta SIMULATIONS="$SIMULATIONS" \
         "$JOB_NAME" 2>&1); then
 
-        # Extract job ID from output (format: "Dispatched Job ID: <id>")
-        if JOB_ID=$(echo "$JOB_OUTPUT" | grep -o "Dispatched Job ID: [a-z0-9-]*" | cut -d' ' -f4); then
+        # Extract job ID from output (format: "Dispatched Job ID = <job>/dispatch-<id>")
+        JOB_ID=$(echo "$JOB_OUTPUT" | grep -oE "Dispatched Job ID (=|:) [^ ]+" | awk '{print $NF}' || true)
+        if [[ -n "$JOB_ID" ]]; then
             DISPATCHED_JOBS+=("$JOB_ID")
             success "Dispatched job for $ticker (Job ID: $JOB_ID)"
         else
@@ -244,48 +253,37 @@ if [[ ${#DISPATCHED_JOBS[@]} -gt 0 ]]; then
     done
 fi
 
-# Monitor jobs if requested
-if [[ "$MONITOR_JOBS" == true || "$WAIT_FOR_COMPLETION" == true ]]; then
+# Monitor jobs if requested. job_monitor.py follows the dispatched jobs over
+# one Nomad event-stream connection instead of polling each job's status
+if [[ ("$MONITOR_JOBS" == true || "$WAIT_FOR_COMPLETION" == true) && ${#DISPATCHED_JOBS[@]} -gt 0 ]]; then
     log "Monitoring job progress..."
 
-    while true; do
-        running_count=0
-        completed_count=0
-        failed_count=0
-
-        for job_id in "${DISPATCHED_JOBS[@]}"; do
-            if status=$(nomad job status -short "$job_id" 2>/dev/null); then
-                if echo "$status" | grep -q "running"; then
-                    ((running_count++))
-                elif echo "$status" | grep -q "complete"; then
-                    ((completed_count++))
-                elif echo "$status" | grep -q "failed\|dead"; then
-                    ((failed_count++))
-                fi
-            fi
+    # Dispatch record in the format written by nomad_dispatcher.py --output
+    DISPATCH_RECORD=$(mktemp)
+    trap 'rm -f "$DISPATCH_RECORD"' EXIT
+    {
+        echo '{"dispatched": ['
+        for i in "${!DISPATCHED_JOBS[@]}"; do
+            [[ $i -gt 0 ]] && echo ','
+            echo "{\"job_id\": \"${DISPATCHED_JOBS[$i]}\"}"
         done
+        echo ']}'
+    } > "$DISPATCH_RECORD"
 
-        log "Job Status: Running=$running_count, Completed=$completed_count, Failed=$failed_count"
-
-        # Break if all jobs are done
-        if [[ $((completed_count + failed_count)) -eq ${#DISPATCHED_JOBS[@]} ]]; then
-            break
-        fi
-
-        # Break if only monitoring (not waiting)
-        if [[ "$MONITOR_JOBS" == true && "$WAIT_FOR_COMPLETION" == false ]]; then
-            log "Monitoring stopped. Jobs are still running in the background."
-            break
-        fi
+    MONITOR_ARGS=(--job-name "$JOB_NAME" --dispatch-record "$DISPATCH_RECORD")
+    if [[ -n "$MONITOR_TIMEOUT" ]]; then
+        MONITOR_ARGS+=(--timeout "$MONITOR_TIMEOUT")
+    fi
 
-        sleep 10
-    done
+    monitor_status=0
+    "$PYTHON" "$SCRIPT_DIR/src/job_monitor.py" "${MONITOR_ARGS[@]}" || monitor_status=$?
 
     if [[ "$WAIT_FOR_COMPLETION" == true ]]; then
-        if [[ $failed_count -eq 0 ]]; then
-            success "All jobs completed successfully!"
-        else
-            warning "$failed_count job(s) failed"
-        fi
+        case $monitor_status in
+            0) success "All jobs completed successfully!" ;;
+            2) warning "Timed out with jobs still running" ;;
+            *) warning "One or more jobs failed" ;;
+        esac
+        exit $monitor_status
     fi
 fi
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+"""
+Combine Monte Carlo results from many dispatched allocations
+
+Each monte-carlo-batch allocation uploads to
+gs://<bucket>/<NOMAD_ALLOC_ID>/<timestamp>/ with its own upload_manifest.json.
+This tool discovers those manifests, fetches only the small per-ticker
+summary files they reference, and merges them into one cross-ticker report.
+Simulation path CSVs are never downloaded.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from gcs_uploader import GCSUploader
+
+
+MANIFEST_NAME = 'upload_manifest.json'
+SUMMARY_SUFFIX = '_summary.json'
+
+
+class TickerAggregate:
+    """
+    Running merge of all summaries for one ticker and simulation horizon
+
+    Runs start from different prices (each uses the close on its run date),
+    so final prices are pooled as gross returns (final / initial price).
+    Price figures in the report are those returns applied to the latest
+    run's initial price.
+    """
+
+    def __init__(self, ticker: str, days: int):
+        self.ticker = ticker
+        self.days = days
+        self.runs = 0
+        self.simulations = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.latest = None
+
+    def add(self, summary: Dict[str, Any]):
+        """Fold one run's summary into the aggregate"""
+        stats = summary['statistics']
+        initial_price = summary['initial_price']
+        n = summary['simulations']
+        total = self.simulations + n
+
+        # Pairwise combination of mean and sum of squared deviations
+        # (Chan et al.), using the population std each run reports, all
+        # scaled by the run's initial price
+        mean = stats['mean'] / initial_price
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += (stats['std'] / initial_price) ** 2 * n + delta ** 2 * self.simulations * n / total
+        self.simulations = total
+
+        self.min = min(self.min, stats['min'] / initial_price)
+        self.max = max(self.max, stats['max'] / initial_price)
+        self.runs += 1
+
+        if self.latest is None or summary.get('generated_at', '') >= self.latest.get('generated_at', ''):
+            self.latest = summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report entry: pooled final-price figures plus the latest run's risk metrics"""
+        latest = self.latest
+        initial_price = latest['initial_price']
+        return_std = math.sqrt(self.m2 / self.simulations) if self.simulations else 0.0
+
+        return {
+            'ticker': self.ticker,
+            'days': self.days,
+            'sector': latest.get('sector'),
+            'industry': latest.get('industry'),
+            'runs': self.runs,
+            'total_simulations': self.simulations,
+            'pooled_mean': self.mean * initial_price,
+            'pooled_std': return_std * initial_price,
+            'min': self.min * initial_price,
+            'max': self.max * initial_price,
+            'latest_run': {
+                'generated_at': latest.get('generated_at'),
+                'source': latest.get('source'),
+                'initial_price': initial_price,
+                'statistics': latest['statistics'],
+                'var': latest['var']
+            },
+            'expected_return': self.mean - 1,
+            'return_std': return_std,
+            'var_loss_pct': {level: 1 - value / initial_price for level, value in latest['var'].items()}
+        }
+
+
+class ResultsAggregator:
+    """Discovers upload manifests under a prefix and merges their summaries"""
+
+    def __init__(self, uploader: GCSUploader, max_workers: int = 16):
+        self.uploader = uploader
+        self.max_workers = max_workers
+        self.manifests_read = 0
+        self.summaries_read = 0
+        self.errors: List[str] = []
+
+    def discover_manifests(self, bucket_name: str, prefix: str) -> Iterator[str]:
+        """Lazily yield the object names of upload manifests under prefix"""
+        for blob in self.uploader.iter_bucket_contents(bucket_name, prefix=prefix):
+            if blob.name.endswith('/' + MANIFEST_NAME) or blob.name == MANIFEST_NAME:
+                yield blob.name
+
+    def _read_json(self, bucket_name: str, object_name: str) -> Dict[str, Any]:
+        return json.loads(self.uploader.read_object(bucket_name, object_name))
+
+    def _summary_objects(self, manifest: Dict[str, Any], suffix: str = SUMMARY_SUFFIX) -> List[Tuple[str, str]]:
+        """(bucket, object) pairs of the summary files listed in a manifest"""
+        objects = []
+        for gcs_url in manifest.get('files', {}).values():
+            if gcs_url.endswith(suffix):
+                objects.append(self.uploader.parse_gcs_url(gcs_url))
+        return objects
+
+    def iter_summaries(self, bucket_name: str, prefix: str,
+                       suffix: str = SUMMARY_SUFFIX) -> Iterator[Dict[str, Any]]:
+        """
+        Yield run summaries (files ending in suffix) as they arrive
+
+        Manifest reads and summary reads share one bounded worker pool: new
+        manifests are only pulled from the listing while fewer than
+        2 x max_workers reads are pending, so memory stays flat no matter how
+        many allocations exist under the prefix.
+        """
+        manifests = self.discover_manifests(bucket_name, prefix)
+        max_pending = self.max_workers * 2
+        pending = {}
+        listing_done = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while not listing_done and len(pending) < max_pending:
+                    manifest_name = next(manifests, None)
+                    if manifest_name is None:
+                        listing_done = True
+                        break
+                    future = executor.submit(self._read_json, bucket_name, manifest_name)
+                    pending[future] = ('manifest', bucket_name, manifest_name)
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, object_bucket, object_name = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        print(f"  Error: Failed to read gs://{object_bucket}/{object_name}: {e}")
+                        self.errors.append(f"gs://{object_bucket}/{object_name}")
+                        continue
+
+                    if kind == 'manifest':
+                        self.manifests_read += 1
+                        for summary_bucket, summary_name in self._summary_objects(data, suffix):
+                            future = executor.submit(self._read_json, summary_bucket, summary_name)
+                            pending[future] = ('summary', summary_bucket, summary_name)
+                    else:
+                        self.summaries_read += 1
+                        data.setdefault('source', f"gs://{object_bucket}/{object_name}")
+                        yield data
+
+    def aggregate(self, bucket_url: str) -> Dict[str, Any]:
+        """Build the cross-ticker report for every run under a GCS URL"""
+        bucket_name, prefix = self.uploader.parse_gcs_url(bucket_url)
+
+        aggregates: Dict[Tuple[str, int], TickerAggregate] = {}
+        for summary in self.iter_summaries(bucket_name, prefix):
+            key = (summary['ticker'], summary['days'])
+            if key not in aggregates:
+                aggregates[key] = TickerAggregate(*key)
+            aggregates[key].add(summary)
+
+        tickers = [aggregates[key].to_dict() for key in sorted(aggregates)]
+
+        cross_ticker = {
+            'tickers': len({entry['ticker'] for entry in tickers}),
+            'total_runs': sum(entry['runs'] for entry in tickers),
+            'total_simulations': sum(entry['total_simulations'] for entry in tickers)
+        }
+        if tickers:
+            ranked = sorted(tickers, key=lambda entry: entry['expected_return'], reverse=True)
+            cross_ticker['mean_expected_return'] = sum(e['expected_return'] for e in tickers) / len(tickers)
+            cross_ticker['best_expected_return'] = ranked[0]['ticker']
+            cross_ticker['worst_expected_return'] = ranked[-1]['ticker']
+
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'source': bucket_url,
+            'manifests_read': self.manifests_read,
+            'summaries_read': self.summaries_read,
+            'errors': self.errors,
+            'cross_ticker': cross_ticker,
+            'tickers': tickers
+        }
+
+
+def write_report(report: Dict[str, Any], output_dir: str) -> Tuple[str, str]:
+    """Write the report as JSON plus a flat per-ticker CSV"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    json_path = os.path.join(output_dir, 'aggregate_report.json')
+    with open(json_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    levels = sorted({level for entry in report['tickers'] for level in entry['var_loss_pct']})
+    csv_path = os.path.join(output_dir, 'aggregate_report.csv')
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ticker', 'days', 'runs', 'total_simulations', 'pooled_mean',
+                         'pooled_std', 'min', 'max', 'expected_return', 'return_std', 'sector', 'industry']
+                        + [f'var_loss_pct_{level}' for level in levels])
+        for entry in report['tickers']:
+            writer.writerow([entry['ticker'], entry['days'], entry['runs'], entry['total_simulations'],
+                             entry['pooled_mean'], entry['pooled_std'], entry['min'], entry['max'],
+                             entry['expected_return'], entry['return_std'], entry.get('sector') or '', entry.get('industry') or '']
+                            + [entry['var_loss_pct'].get(level, '') for level in levels])
+
+    return json_path, csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate Monte Carlo results across allocations')
+
+    parser.add_argument('gcs_url',
+                       help='GCS URL containing per-allocation results (e.g., gs://bucket/path)')
+    parser.add_argument('--output-dir', '-o', default='./aggregate',
+                       help='Directory for the aggregate report (default: ./aggregate)')
+    parser.add_argument('--workers', '-w', type=int, default=16,
+                       help='Maximum concurrent object reads (default: 16)')
+
+    args = parser.parse_args()
+
+    print(f"Aggregating results under: {args.gcs_url}")
+
+    try:
+        aggregator = ResultsAggregator(GCSUploader(), max_workers=args.workers)
+        report = aggregator.aggregate(args.gcs_url)
+        json_path, csv_path = write_report(report, args.output_dir)
+    except Exception as e:
+        print(f"Error during aggregation: {e}")
+        sys.exit(1)
+
+    print(f"\nRead {report['manifests_read']} manifests and {report['summaries_read']} summaries")
+    for entry in report['tickers']:
+        print(f"  {entry['ticker']} ({entry['days']} days): {entry['runs']} runs, "
+              f"mean ${entry['pooled_mean']:.2f}, expected return {entry['expected_return'] * 100:.2f}%")
+
+    print(f"\nReport saved to: {json_path}")
+    print(f"CSV saved to: {csv_path}")
+
+    if report['errors']:
+        print(f"\nWarning: {len(report['errors'])} objects could not be read. Check logs above.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
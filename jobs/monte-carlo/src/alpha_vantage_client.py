@@ -0,0 +1,132 @@
+"""
+Pooled HTTP client for the Alpha Vantage endpoints DataFetcher uses
+
+The alpha_vantage library opens a new connection for every call and
+returns JSON that is converted dict -> DataFrame with string columns
+('1. open', ...). This client keeps one keep-alive session with a
+connection pool, lets the server gzip responses, and requests
+datatype=csv so daily prices parse straight into typed columns. It exposes
+the same get_daily / get_company_overview calls as TimeSeries and
+FundamentalData, so DataFetcher can use either.
+"""
+
+import io
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+BASE_URL = 'https://www.alphavantage.co/query'
+
+# CSV header -> DataFetcher column name and dtype
+DAILY_CSV_COLUMNS = {
+    'open': ('Open', 'float64'),
+    'high': ('High', 'float64'),
+    'low': ('Low', 'float64'),
+    'close': ('Close', 'float64'),
+    'volume': ('Volume', 'float64')
+}
+
+# Keys Alpha Vantage uses for errors and throttling notices; they arrive as
+# a JSON body with status 200 even when CSV was requested
+ERROR_KEYS = ('Error Message', 'Note', 'Information')
+
+
+class AlphaVantageError(ValueError):
+    """Error reported by the Alpha Vantage API in a response body"""
+
+
+class AlphaVantageClient:
+    """Keep-alive, gzip-enabled Alpha Vantage client returning pandas objects"""
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL, pool_size: int = 8,
+                 timeout: float = 30.0, max_retries: int = 3):
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests library is required for the pooled Alpha Vantage client")
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+
+        # Transport-level retries only (connection errors, 5xx); API-level
+        # errors and throttling notices are surfaced to the caller
+        retry = Retry(total=max_retries, backoff_factor=0.5,
+                      status_forcelist=(500, 502, 503, 504), allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive'
+        })
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, params: Dict[str, str]) -> 'requests.Response':
+        response = self.session.get(self.base_url, params=dict(params, apikey=self.api_key),
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _raise_for_api_error(payload: Any):
+        if not payload:
+            raise AlphaVantageError("Error getting data from the api, no return was given.")
+        if isinstance(payload, dict):
+            for key in ERROR_KEYS:
+                if key in payload:
+                    raise AlphaVantageError(payload[key])
+
+    @staticmethod
+    def _is_json(response: 'requests.Response') -> bool:
+        if 'json' in response.headers.get('Content-Type', ''):
+            return True
+        return response.content.lstrip()[:1] == b'{'
+
+    def get_daily(self, symbol: str, outputsize: str = 'compact') -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Daily OHLCV prices for a symbol
+
+        Returns:
+        tuple: (DataFrame indexed by date with Open/High/Low/Close/Volume
+               float64 columns, newest first like the API; metadata dict)
+        """
+        response = self._get({
+            'function': 'TIME_SERIES_DAILY',
+            'symbol': symbol,
+            'outputsize': outputsize,
+            'datatype': 'csv'
+        })
+
+        if self._is_json(response):
+            self._raise_for_api_error(response.json())
+            raise AlphaVantageError(f"Unexpected JSON response for {symbol}")
+
+        data = pd.read_csv(io.BytesIO(response.content), index_col='timestamp', parse_dates=['timestamp'],
+                           dtype={column: dtype for column, (_, dtype) in DAILY_CSV_COLUMNS.items()})
+        data = data.rename(columns={column: name for column, (name, _) in DAILY_CSV_COLUMNS.items()})
+        data.index.name = 'date'
+
+        return data, {'symbol': symbol, 'outputsize': outputsize, 'rows': len(data)}
+
+    def get_company_overview(self, symbol: str) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+        """Company overview as a one-row DataFrame (empty if the symbol is unknown)"""
+        response = self._get({'function': 'OVERVIEW', 'symbol': symbol})
+        payload = response.json()
+
+        if payload == {}:
+            return pd.DataFrame(), None
+
+        self._raise_for_api_error(payload)
+        return pd.DataFrame([payload]), None
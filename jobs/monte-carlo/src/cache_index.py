@@ -0,0 +1,166 @@
+"""
+SQLite index of DataFetcher cache entries
+
+One row per (ticker, period) holds what used to live in a
+{ticker}_{period}_meta.json sidecar, plus the entry's size on disk and
+when it was last read. Validity checks become a primary-key lookup, and
+cache statistics and bulk invalidation become queries instead of
+directory scans and one file parse per entry.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Metadata keys stored in their own columns; anything else goes in extra
+INDEXED_FIELDS = ('cached_at', 'rows', 'format', 'data_source')
+
+# Stored as PRAGMA user_version; bump when the entries table changes
+SCHEMA_VERSION = 1
+
+
+class CacheIndex:
+    """Transactional index of cache entries shared by every fetcher on a cache directory"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+        # One connection shared by the fetcher's threads; WAL lets readers in
+        # other processes proceed while one of them writes
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+
+        # A new database, or one written with another schema, starts empty
+        # and has to be rebuilt by the caller (see rebuild_required)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        self.rebuild_required = version != SCHEMA_VERSION
+        if self.rebuild_required:
+            self.conn.execute("DROP TABLE IF EXISTS entries")
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                ticker TEXT NOT NULL,
+                period TEXT NOT NULL,
+                cached_at TEXT NOT NULL,
+                rows INTEGER,
+                bytes INTEGER,
+                format TEXT,
+                data_source TEXT,
+                last_access TEXT,
+                extra TEXT,
+                PRIMARY KEY (ticker, period)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_cached_at ON entries (cached_at)")
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def _to_meta(row: tuple) -> Dict[str, Any]:
+        ticker, period, cached_at, rows, size, cache_format, data_source, last_access, extra = row
+        meta = json.loads(extra) if extra else {}
+        meta.update({
+            'ticker': ticker,
+            'period': period,
+            'cached_at': cached_at,
+            'rows': rows,
+            'bytes': size,
+            'format': cache_format,
+            'data_source': data_source,
+            'last_access': last_access
+        })
+        return meta
+
+    def get(self, ticker: str, period: str) -> Optional[Dict[str, Any]]:
+        """Metadata for one entry, or None if it is not indexed"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM entries WHERE ticker = ? AND period = ?",
+                                    (ticker, period)).fetchone()
+        return self._to_meta(row) if row else None
+
+    def put(self, ticker: str, period: str, meta: Dict[str, Any], size: Optional[int] = None):
+        """Insert or replace an entry; last_access is kept across updates"""
+        extra = {key: value for key, value in meta.items()
+                 if key not in INDEXED_FIELDS + ('ticker', 'period', 'bytes', 'last_access')}
+
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO entries (ticker, period, cached_at, rows, bytes, format, data_source, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, period) DO UPDATE SET
+                    cached_at = excluded.cached_at, rows = excluded.rows, bytes = excluded.bytes,
+                    format = excluded.format, data_source = excluded.data_source, extra = excluded.extra
+            """, (ticker, period, meta['cached_at'], meta.get('rows'), size, meta.get('format'),
+                  meta.get('data_source'), json.dumps(extra) if extra else None))
+
+    def touch(self, ticker: str, period: str):
+        """Record a read of an entry"""
+        with self.lock:
+            self.conn.execute("UPDATE entries SET last_access = ? WHERE ticker = ? AND period = ?",
+                              (datetime.now().isoformat(), ticker, period))
+
+    def entries(self, ticker: Optional[str] = None, period: Optional[str] = None,
+                cached_before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries matching every given filter, oldest first"""
+        where, params = self._filters(ticker, period, cached_before)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT * FROM entries{where} ORDER BY cached_at", params).fetchall()
+        return [self._to_meta(row) for row in rows]
+
+    def delete(self, ticker: Optional[str] = None, period: Optional[str] = None,
+               cached_before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Remove matching entries in one transaction
+
+        Returns:
+        list: metadata of the removed entries, so the caller can delete files
+        """
+        where, params = self._filters(ticker, period, cached_before)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(f"SELECT * FROM entries{where}", params).fetchall()
+                self.conn.execute(f"DELETE FROM entries{where}", params)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return [self._to_meta(row) for row in rows]
+
+    def least_recently_used(self) -> List[Dict[str, Any]]:
+        """All entries, least recently read (or written, if never read) first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM entries ORDER BY COALESCE(last_access, cached_at)").fetchall()
+        return [self._to_meta(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, total bytes and distinct tickers"""
+        with self.lock:
+            count, total_bytes = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+            tickers = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT ticker FROM entries ORDER BY ticker")]
+        return {'entries': count, 'bytes': total_bytes, 'tickers': tickers}
+
+    @staticmethod
+    def _filters(ticker: Optional[str], period: Optional[str],
+                 cached_before: Optional[str]) -> Tuple[str, tuple]:
+        clauses = []
+        params = []
+        for clause, value in (("ticker = ?", ticker), ("period = ?", period),
+                              ("cached_at < ?", cached_before)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
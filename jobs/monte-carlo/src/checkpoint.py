@@ -0,0 +1,119 @@
+"""
+Checkpoint stores for resumable simulations
+
+monte-carlo-batch allows 15 reschedules, and without checkpoints each one
+restarts a chunk from its first path. A chunk run (distributed.run_chunk)
+periodically saves its progress - blocks completed, the generator's
+bit_generator state, the accumulated partial summary and the fitted
+parameters - under a key derived from the run's parameters. A restarted run
+with the same parameters picks up from the last checkpoint and produces
+results identical to an uninterrupted run.
+
+- LocalCheckpointStore: a directory, e.g. /alloc/data with a sticky,
+  migrating ephemeral disk so it follows the job to its next allocation
+- GCSCheckpointStore: objects in a bucket, written through GCSUploader
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from stores import GCSStore, create_store
+
+
+def checkpoint_key(identity: Dict[str, Any]) -> str:
+    """Stable object/file name for a run identified by identity"""
+    digest = hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return f"{identity.get('ticker', 'run')}_{digest}.json"
+
+
+class CheckpointStore(ABC):
+    """Base class for stores of JSON checkpoints keyed by name"""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the checkpoint saved under key, or None if absent"""
+
+    @abstractmethod
+    def save(self, key: str, checkpoint: Dict[str, Any]):
+        """Replace the checkpoint saved under key"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the checkpoint saved under key, if any"""
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """Checkpoints as JSON files in a directory, replaced atomically"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.root / key, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"  Warning: Ignoring unreadable checkpoint {self.root / key}: {e}")
+            return None
+
+    def save(self, key: str, checkpoint: Dict[str, Any]):
+        # Write then rename, so an eviction mid-write leaves the previous
+        # checkpoint intact
+        tmp_path = self.root / f"{key}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / key)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.root / key)
+        except FileNotFoundError:
+            pass
+
+
+class GCSCheckpointStore(GCSStore, CheckpointStore):
+    """Checkpoints as objects in a GCS bucket, using an existing GCSUploader client"""
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.uploader.get_blob(self.bucket_name, self._object_name(key)) is None:
+            return None
+
+        try:
+            return json.loads(self.uploader.read_object(self.bucket_name, self._object_name(key)))
+        except json.JSONDecodeError as e:
+            print(f"  Warning: Ignoring unreadable checkpoint gs://{self.bucket_name}/{self._object_name(key)}: {e}")
+            return None
+
+    def save(self, key: str, checkpoint: Dict[str, Any]):
+        # A single-object upload replaces the previous checkpoint atomically
+        fd, tmp_path = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(checkpoint, f)
+            self.uploader.upload_file(tmp_path, self.bucket_name, self._object_name(key), compress=False)
+        finally:
+            os.remove(tmp_path)
+
+    def delete(self, key: str):
+        self.uploader.delete_object(self.bucket_name, self._object_name(key))
+
+
+def create_checkpoint_store(location: str, uploader=None) -> CheckpointStore:
+    """
+    Build the checkpoint store for a location
+
+    Parameters:
+    location: gs://bucket/prefix for GCS, otherwise a directory path
+    uploader: Optional GCSUploader to reuse for gs:// locations
+    """
+    return create_store(location, LocalCheckpointStore, GCSCheckpointStore, uploader)
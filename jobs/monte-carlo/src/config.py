@@ -0,0 +1,45 @@
+"""
+Configuration helpers shared by the entry points
+
+main.py (the batch CLI) and service.py (the warm HTTP service) read the
+same simulation.yaml and use the same default directories, inside the
+container or in a local checkout.
+"""
+
+import os
+from pathlib import Path
+
+import yaml
+
+
+def load_config(config_path):
+    """Load configuration from YAML file"""
+    try:
+        with open(config_path, 'r') as file:
+            return yaml.safe_load(file)
+    except FileNotFoundError:
+        print(f"Config file not found: {config_path}")
+        return {}
+    except yaml.YAMLError as e:
+        print(f"Error parsing config file: {e}")
+        return {}
+
+
+def get_default_dirs():
+    """Get default directories based on execution environment"""
+    # Check if we're running in Docker container
+    if os.path.exists('/app') and os.path.exists('/app/config'):
+        # Running in Docker container
+        return {
+            'config': '/app/config/simulation.yaml',
+            'output': '/app/results',
+            'cache': '/app/data'
+        }
+    else:
+        # Running locally - use current directory subfolders
+        current_dir = Path.cwd()
+        return {
+            'config': str(current_dir / 'config' / 'simulation.yaml'),
+            'output': str(current_dir / 'results'),
+            'cache': str(current_dir / 'data')
+        }
@@ -1,81 +1,271 @@
 import pandas as pd
+import importlib.util
 import os
 import json
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
-from alpha_vantage.timeseries import TimeSeries
-from alpha_vantage.fundamentaldata import FundamentalData
-import queue
+from typing import Optional, Dict, Any, List
+import asyncio
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+from cache_index import CacheIndex
+from data_sources import DataSource, create_data_source
+from fundamentals import FundamentalsStore
+from quota import QuotaStore, InMemoryQuotaStore, create_quota_store
+from remote_cache import RemoteCache, create_remote_cache
 
-class RateLimiter:
-    """Rate limiter for API calls"""
+# pyarrow backs the parquet and feather cache formats; pandas imports it when
+# it first reads or writes one, so only its presence is checked here
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+
+# Cache file suffix per supported cache format
+CACHE_FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather'
+}
+
+# Standard OHLCV columns after renaming from Alpha Vantage format
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Columns stored in cache_float_dtype; Volume is kept as int64, since float32
+# cannot represent volumes above 2**24 exactly
+OHLC_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Alpha Vantage 'compact' responses cover the latest 100 trading days
+# (~140 calendar days); cached history older than this needs a full refetch
+INCREMENTAL_MAX_GAP_DAYS = 120
+
+# CSV caches are appended to until this many rows fall outside the
+# requested period, then rewritten trimmed
+INCREMENTAL_COMPACT_ROWS = 60
+
+# SQLite index of cache entries, kept in the cache directory
+CACHE_INDEX_NAME = '.cache_index.db'
+
+# SQLite store of company overviews, kept in the cache directory
+FUNDAMENTALS_DB_NAME = '.fundamentals.db'
 
-    def __init__(self, calls_per_minute: int = 5, daily_limit: int = 25):
+# Supported values of data.api_client
+API_CLIENTS = ('library', 'pooled')
+
+# The alpha_vantage package (and requests beneath it) is imported when the
+# first API call needs a client, so runs served from the cache never load it
+TimeSeries = None
+FundamentalData = None
+
+
+def _import_alpha_vantage():
+    """Bind TimeSeries and FundamentalData on first use"""
+    global TimeSeries, FundamentalData
+    if TimeSeries is None:
+        from alpha_vantage.timeseries import TimeSeries
+    if FundamentalData is None:
+        from alpha_vantage.fundamentaldata import FundamentalData
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the daily API call limit has been reached"""
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter for API calls
+
+    Call history is kept in a QuotaStore: process-local by default, or shared
+    (SQLite on a host volume, Consul KV) so that every allocation using the
+    same API key draws from one global budget. The slot decision is made
+    under the lock, but any waiting happens outside it: one caller sleeping
+    for a slot never stalls others.
+    """
+
+    def __init__(self, calls_per_minute: int = 5, daily_limit: int = 25,
+                 store: Optional[QuotaStore] = None):
         self.calls_per_minute = calls_per_minute
         self.daily_limit = daily_limit
-        self.call_times = queue.Queue()
-        self.daily_calls = 0
-        self.last_reset = datetime.now().date()
+        self.store = store or InMemoryQuotaStore()
         self.lock = threading.Lock()
 
-    def wait_if_needed(self):
-        """Wait if rate limit would be exceeded"""
+    @property
+    def daily_calls(self) -> int:
+        """Calls recorded today across everyone sharing the store"""
+        return self.store.daily_calls(time.time())
+
+    def _reserve(self, now: float) -> tuple[float, bool]:
+        """
+        Try to record a call at time now (caller must hold the lock)
+
+        Returns:
+        tuple: (wait, daily_exhausted) - wait is 0.0 if the call was recorded,
+               otherwise the seconds until the next slot frees up
+        """
+        return self.store.reserve(now, self.calls_per_minute, self.daily_limit)
+
+    def try_acquire(self) -> float:
+        """
+        Take a slot if one is free, without blocking or raising
+
+        Returns:
+        0.0 if a slot was taken, otherwise the seconds until the next slot
+        (until midnight when the daily limit is exhausted)
+        """
         with self.lock:
-            now = datetime.now()
+            wait, _ = self._reserve(time.time())
+        return wait
+
+    def acquire(self):
+        """Block until a slot is free; raise RateLimitExceeded if the daily limit is reached"""
+        while True:
+            with self.lock:
+                wait, daily_exhausted = self._reserve(time.time())
 
-            # Reset daily counter if new day
-            if now.date() > self.last_reset:
-                self.daily_calls = 0
-                self.last_reset = now.date()
+            if wait <= 0:
+                return
+            if daily_exhausted:
+                raise RateLimitExceeded(f"Daily API limit of {self.daily_limit} calls exceeded")
 
-            # Check daily limit
-            if self.daily_calls >= self.daily_limit:
-                raise Exception(f"Daily API limit of {self.daily_limit} calls exceeded")
+            print(f"  Rate limit: waiting {wait:.1f} seconds...")
+            time.sleep(wait)
 
-            # Clean old call times (older than 1 minute)
-            cutoff_time = now - timedelta(minutes=1)
-            temp_queue = queue.Queue()
+    async def acquire_async(self):
+        """Asynchronous acquire: awaits instead of sleeping the thread"""
+        while True:
+            with self.lock:
+                wait, daily_exhausted = self._reserve(time.time())
 
-            while not self.call_times.empty():
-                call_time = self.call_times.get()
-                if call_time > cutoff_time:
-                    temp_queue.put(call_time)
+            if wait <= 0:
+                return
+            if daily_exhausted:
+                raise RateLimitExceeded(f"Daily API limit of {self.daily_limit} calls exceeded")
 
-            self.call_times = temp_queue
+            print(f"  Rate limit: waiting {wait:.1f} seconds...")
+            await asyncio.sleep(wait)
 
-            # Wait if per-minute limit would be exceeded
-            if self.call_times.qsize() >= self.calls_per_minute:
-                oldest_call = None
-                temp_calls = []
+    def wait_if_needed(self):
+        """Wait if rate limit would be exceeded (alias of acquire)"""
+        self.acquire()
+
+    def remaining_today(self) -> int:
+        """Calls left in today's budget across everyone sharing the store"""
+        return max(0, self.daily_limit - self.daily_calls)
 
-                while not self.call_times.empty():
-                    call_time = self.call_times.get()
-                    temp_calls.append(call_time)
-                    if oldest_call is None:
-                        oldest_call = call_time
 
-                for call_time in temp_calls:
-                    self.call_times.put(call_time)
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key
 
-                if oldest_call:
-                    wait_time = 60 - (now - oldest_call).total_seconds()
-                    if wait_time > 0:
-                        print(f"  Rate limit: waiting {wait_time:.1f} seconds...")
-                        time.sleep(wait_time)
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result (or exception) instead of
+    repeating the work. Once the call finishes the key is forgotten, so later
+    calls run fresh.
+    """
 
-            # Record this call
-            self.call_times.put(now)
-            self.daily_calls += 1
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.calls: Dict[Any, 'SingleFlight._Call'] = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs) -> tuple[Any, bool]:
+        """
+        Run func(*args, **kwargs) once per in-flight key
+
+        Returns:
+        tuple: (result, shared) - shared is True for callers that waited on
+               another caller's execution
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._Call()
+                self.calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class MemoryLRU:
+    """
+    Bounded in-memory LRU of validated DataFrames
+
+    Entries carry the cached_at of the disk entry they were read from, so a
+    refresh by another thread or process is detected on the next lookup.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self.entries: 'OrderedDict[tuple, tuple[str, pd.DataFrame]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple, cached_at: str) -> Optional[pd.DataFrame]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != cached_at:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, cached_at: str, data: pd.DataFrame):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (cached_at, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, ticker: str, period: str):
+        """Drop every column projection held for a cache entry"""
+        with self.lock:
+            for key in [key for key in self.entries if key[:2] == (ticker, period)]:
+                del self.entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
 
 
 class DataFetcher:
     """Handles fetching and caching of ticker data using Alpha Vantage API"""
 
-    def __init__(self, cache_dir: str = "/app/data", config: Dict[str, Any] = None):
+    def __init__(self, cache_dir: str = "/app/data", config: Dict[str, Any] = None,
+                 remote_cache: Optional[RemoteCache] = None,
+                 data_source: Optional[DataSource] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -85,28 +275,128 @@ class DataFetcher:
 
         # Cache settings
         self.cache_duration_days = data_config.get('cache_duration_days', 1)
+        # Entries past cache_duration_days but within the hard expiry are
+        # served immediately and refreshed in the background
+        self.cache_hard_expiry_days = max(data_config.get('cache_hard_expiry_days', self.cache_duration_days),
+                                          self.cache_duration_days)
+        self.cache_format = data_config.get('cache_format', 'csv')
+        self.cache_float_dtype = data_config.get('cache_float_dtype', 'float64')
+
+        # Concurrent fetch settings
+        self.fetch_workers = data_config.get('fetch_workers', 4)
+        self._inflight = SingleFlight()
+        self._background_refreshes: Dict[tuple, threading.Thread] = {}
+        self._background_lock = threading.Lock()
+
+        # Bulk source consulted before the cache and the API
+        self.data_source = data_source or create_data_source(data_config)
+        if self.data_source is not None:
+            print(f"  Using bulk data source: {data_config.get('dataset_path', type(self.data_source).__name__)}")
+
+        # Shared remote tier behind the local cache directory
+        self.remote_cache = remote_cache
+        remote_location = data_config.get('remote_cache')
+        if self.remote_cache is None and remote_location:
+            try:
+                self.remote_cache = create_remote_cache(remote_location)
+                print(f"  Using remote cache: {remote_location}")
+            except Exception as e:
+                print(f"  Warning: remote cache {remote_location} unavailable, using local cache only: {e}")
+
+        if self.cache_format not in CACHE_FORMATS:
+            raise ValueError(f"Unsupported cache format: {self.cache_format}. "
+                             f"Expected one of {sorted(CACHE_FORMATS)}")
+        if self.cache_format != 'csv' and not PYARROW_AVAILABLE:
+            print(f"  pyarrow not installed - falling back to csv cache instead of {self.cache_format}")
+            self.cache_format = 'csv'
+
+        # Disk quota (None = unbounded) and in-memory hot tier
+        max_size_mb = data_config.get('cache_max_size_mb')
+        self.cache_max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.memory_cache = MemoryLRU(data_config.get('memory_cache_entries', 32))
+        self.evictions = 0
+
+        # Legacy sidecars are only scanned for when the index is new or its
+        # schema changed, so startup does not grow with the cache
+        self.cache_index = CacheIndex(self.cache_dir / CACHE_INDEX_NAME)
+        if self.cache_index.rebuild_required:
+            self._import_meta_files()
+
+        # Company overviews: long TTL, refreshed in the background only
+        # while more than fundamentals_reserve_calls API calls are left today
+        self.fundamentals = FundamentalsStore(self.cache_dir / FUNDAMENTALS_DB_NAME,
+                                              ttl_days=data_config.get('fundamentals_ttl_days', 90))
+        self.fundamentals_reserve_calls = data_config.get('fundamentals_reserve_calls', 5)
+        self._fundamentals_pending: List[str] = []
 
         # API configuration
         self.api_key = self._get_api_key(data_config)
+        self._ts = None
+        self._fd = None
+        self._api_client_lock = threading.Lock()
 
         # Initialize Alpha Vantage clients only if API key is available
         if self.api_key:
             # Rate limiter
             calls_per_minute = data_config.get('api_rate_limit_per_minute', 5)
             daily_limit = data_config.get('api_daily_limit', 25)
-            self.rate_limiter = RateLimiter(calls_per_minute, daily_limit)
-
-            # Alpha Vantage clients
-            self.ts = TimeSeries(key=self.api_key, output_format='pandas')
-            self.fd = FundamentalData(key=self.api_key, output_format='pandas')
-
-            print(f"  Initialized Alpha Vantage client with rate limit: {calls_per_minute}/min, {daily_limit}/day")
+            quota_store = create_quota_store(data_config, self.cache_dir)
+            self.rate_limiter = RateLimiter(calls_per_minute, daily_limit, store=quota_store)
+
+            # Alpha Vantage clients: the alpha_vantage library, or one pooled
+            # keep-alive session fetching CSV that serves both roles. They are
+            # created by the first API call (see ts and fd)
+            self.api_client = data_config.get('api_client', 'library')
+            if self.api_client not in API_CLIENTS:
+                raise ValueError(f"Unsupported api_client: {self.api_client}. Expected library or pooled")
+
+            print(f"  Initialized Alpha Vantage client with rate limit: {calls_per_minute}/min, {daily_limit}/day "
+                  f"({data_config.get('quota_backend', 'memory')} quota)")
         else:
             self.rate_limiter = None
-            self.ts = None
-            self.fd = None
             print("  No API key provided - will use cached data only if available")
 
+    @property
+    def ts(self):
+        """Time series client (None without an API key), created on first use"""
+        if self._ts is None and self.api_key:
+            self._create_api_clients()
+        return self._ts
+
+    @ts.setter
+    def ts(self, client):
+        self._ts = client
+
+    @property
+    def fd(self):
+        """Fundamental data client (None without an API key), created on first use"""
+        if self._fd is None and self.api_key:
+            self._create_api_clients()
+        return self._fd
+
+    @fd.setter
+    def fd(self, client):
+        self._fd = client
+
+    def _create_api_clients(self):
+        """Build whichever API clients are not set yet"""
+        with self._api_client_lock:
+            if self._ts is not None and self._fd is not None:
+                return
+
+            if self.api_client == 'pooled':
+                from alpha_vantage_client import AlphaVantageClient
+                ts = fd = AlphaVantageClient(self.api_key, pool_size=max(self.fetch_workers, 1))
+            else:
+                _import_alpha_vantage()
+                ts = TimeSeries(key=self.api_key, output_format='pandas')
+                fd = FundamentalData(key=self.api_key, output_format='pandas')
+
+            if self._ts is None:
+                self._ts = ts
+            if self._fd is None:
+                self._fd = fd
+
     def _get_api_key(self, data_config: Dict[str, Any]) -> Optional[str]:
         """Get API key from config or environment variable"""
         # Try config first
@@ -117,40 +407,208 @@ class DataFetcher:
         # Fall back to environment variable
         return os.getenv('ALPHA_VANTAGE_API_KEY')
 
-    def _get_cache_path(self, ticker: str, period: str) -> Path:
+    def _get_cache_path(self, ticker: str, period: str, cache_format: str = None) -> Path:
         """Get cache file path for ticker and period"""
-        return self.cache_dir / f"{ticker}_{period}_data.csv"
+        suffix = CACHE_FORMATS[cache_format or self.cache_format]
+        return self.cache_dir / f"{ticker}_{period}_data{suffix}"
 
     def _get_cache_meta_path(self, ticker: str, period: str) -> Path:
-        """Get cache metadata file path"""
+        """Get the legacy per-entry metadata file path (superseded by the cache index)"""
         return self.cache_dir / f"{ticker}_{period}_meta.json"
 
+    def _import_meta_files(self):
+        """Move metadata from legacy {ticker}_{period}_meta.json sidecars into the index"""
+        imported = 0
+        for meta_path in self.cache_dir.glob("*_meta.json"):
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                self._write_cache_meta(meta['ticker'], meta['period'], meta)
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                print(f"  Skipping unreadable cache metadata {meta_path.name}: {e}")
+                continue
+            meta_path.unlink(missing_ok=True)
+            imported += 1
+
+        if imported:
+            print(f"  Imported {imported} cache metadata files into the cache index")
+
+    def _read_cache_meta(self, ticker: str, period: str) -> Optional[Dict[str, Any]]:
+        """Read cache metadata, or None if the entry is not indexed"""
+        return self.cache_index.get(ticker, period)
+
+    def _write_cache_meta(self, ticker: str, period: str, meta: Dict[str, Any]):
+        """Write cache metadata, recording the entry's size on disk"""
+        cache_path = self._get_cache_path(ticker, period, meta.get('format'))
+        size = cache_path.stat().st_size if cache_path.exists() else None
+        self.cache_index.put(ticker, period, meta, size)
+        self.memory_cache.invalidate(ticker, period)
+
+        if self.cache_max_bytes is not None:
+            self._enforce_disk_quota(keep=(ticker, period))
+
+    def _remove_cache_files(self, ticker: str, period: str):
+        """Delete an entry's data files in every format and drop it from memory"""
+        for cache_format in CACHE_FORMATS:
+            self._get_cache_path(ticker, period, cache_format).unlink(missing_ok=True)
+        self.memory_cache.invalidate(ticker, period)
+
+    def _enforce_disk_quota(self, keep: Optional[tuple] = None):
+        """Evict least recently used entries until the cache fits in cache_max_bytes"""
+        total = self.cache_index.stats()['bytes']
+        if total <= self.cache_max_bytes:
+            return
+
+        for entry in self.cache_index.least_recently_used():
+            if total <= self.cache_max_bytes:
+                break
+            if (entry['ticker'], entry['period']) == keep:
+                continue
+
+            self.cache_index.delete(entry['ticker'], entry['period'])
+            self._remove_cache_files(entry['ticker'], entry['period'])
+            total -= entry['bytes'] or 0
+            self.evictions += 1
+            print(f"  Evicted {entry['ticker']} ({entry['period']}) from cache "
+                  f"(last used {entry['last_access'] or entry['cached_at']})")
+
     def _is_cache_valid(self, ticker: str, period: str) -> bool:
         """Check if cached data is still valid"""
-        meta_path = self._get_cache_meta_path(ticker, period)
+        return self._is_meta_fresh(self._read_cache_meta(ticker, period))
 
-        if not meta_path.exists():
-            return False
+    def _cache_state(self, ticker: str, period: str) -> str:
+        """
+        Classify a cache entry by age
+
+        Returns:
+        str: 'fresh' (within cache_duration_days), 'stale' (past it but within
+             cache_hard_expiry_days), 'expired', or 'missing'
+        """
+        meta = self._read_cache_meta(ticker, period)
 
         try:
-            with open(meta_path, 'r') as f:
-                meta = json.load(f)
+            age = datetime.now() - datetime.fromisoformat(meta['cached_at'])
+        except (TypeError, KeyError, ValueError):
+            return 'missing'
+
+        if age < timedelta(days=self.cache_duration_days):
+            return 'fresh'
+        if age < timedelta(days=self.cache_hard_expiry_days):
+            return 'stale'
+        return 'expired'
+
+    def cache_status(self, ticker: str, period: str) -> Dict[str, Any]:
+        """
+        Describe the local cache entry for a ticker
 
+        Returns:
+        dict: state ('fresh', 'stale', 'expired' or 'missing'), cached_at and
+              age_days (None when missing)
+        """
+        ticker = ticker.upper()
+        meta = self._read_cache_meta(ticker, period) or {}
+        state = self._cache_state(ticker, period)
+
+        age_days = None
+        if state != 'missing':
+            age = datetime.now() - datetime.fromisoformat(meta['cached_at'])
+            age_days = age.total_seconds() / 86400
+
+        return {'state': state, 'cached_at': meta.get('cached_at'), 'age_days': age_days}
+
+    def _is_meta_fresh(self, meta: Optional[Dict[str, Any]]) -> bool:
+        """Check if cache metadata (local or remote) is within the cache duration"""
+        if meta is None:
+            return False
+
+        try:
             cached_time = datetime.fromisoformat(meta['cached_at'])
             expiry_time = cached_time + timedelta(days=self.cache_duration_days)
 
             return datetime.now() < expiry_time
 
-        except (json.JSONDecodeError, KeyError, ValueError):
+        except (KeyError, ValueError):
             return False
 
+    def _to_cache_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Normalise dtypes before caching: datetime index, float prices and integer volume"""
+        data = data.copy()
+        data.index = pd.to_datetime(data.index)
+        data.index.name = 'Date'
+
+        for column in OHLC_COLUMNS:
+            if column in data.columns:
+                data[column] = data[column].astype(self.cache_float_dtype)
+
+        # Missing volumes cannot be stored as int64; float64 is still exact
+        # for any realistic volume
+        if 'Volume' in data.columns:
+            volume_dtype = 'int64' if data['Volume'].notna().all() else 'float64'
+            data['Volume'] = data['Volume'].astype(volume_dtype)
+
+        return data
+
+    def _write_cache_file(self, path: Path, data: pd.DataFrame, cache_format: str):
+        """Write a cache file atomically so concurrent readers never see partial data"""
+        tmp_path = path.with_name(path.name + '.tmp')
+
+        if cache_format == 'parquet':
+            data.to_parquet(tmp_path)
+        elif cache_format == 'feather':
+            # Feather has no index support; store the dates as a column
+            data.reset_index().to_feather(tmp_path)
+        else:
+            data.to_csv(tmp_path)
+
+        os.replace(tmp_path, path)
+
+    def _read_cache_file(self, path: Path, cache_format: str,
+                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read a cache file, optionally projecting to a subset of columns"""
+        if cache_format == 'parquet':
+            # Index columns are restored from the pandas metadata
+            return pd.read_parquet(path, columns=columns)
+
+        if cache_format == 'feather':
+            read_columns = ['Date'] + columns if columns else None
+            return pd.read_feather(path, columns=read_columns).set_index('Date')
+
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        return data[columns] if columns else data
+
+    def _migrate_cache_entry(self, ticker: str, period: str) -> bool:
+        """
+        Convert a CSV cache entry to the configured binary format
+
+        Returns True if an entry was migrated. The original cached_at is kept
+        so migration does not extend the entry's validity.
+        """
+        csv_path = self._get_cache_path(ticker, period, 'csv')
+        if self.cache_format == 'csv' or not csv_path.exists():
+            return False
+
+        data = self._to_cache_frame(self._read_cache_file(csv_path, 'csv'))
+        self._write_cache_file(self._get_cache_path(ticker, period), data, self.cache_format)
+        csv_path.unlink()
+
+        meta = self._read_cache_meta(ticker, period)
+        if meta is not None:
+            meta['format'] = self.cache_format
+            self._write_cache_meta(ticker, period, meta)
+
+        print(f"  Migrated cache for {ticker} ({period}) from csv to {self.cache_format}")
+        return True
+
     def _save_to_cache(self, ticker: str, period: str, data: pd.DataFrame):
         """Save data to cache with metadata"""
         cache_path = self._get_cache_path(ticker, period)
-        meta_path = self._get_cache_meta_path(ticker, period)
 
         # Save data
-        data.to_csv(cache_path)
+        self._write_cache_file(cache_path, self._to_cache_frame(data), self.cache_format)
+
+        # Drop any CSV left over from before a format switch
+        if self.cache_format != 'csv':
+            self._get_cache_path(ticker, period, 'csv').unlink(missing_ok=True)
 
         # Save metadata
         meta = {
@@ -159,23 +617,41 @@ class DataFetcher:
             'cached_at': datetime.now().isoformat(),
             'rows': len(data),
             'columns': list(data.columns),
+            'format': self.cache_format,
             'data_source': 'alpha_vantage'
         }
 
-        with open(meta_path, 'w') as f:
-            json.dump(meta, f, indent=2)
+        self._write_cache_meta(ticker, period, meta)
 
         print(f"  Cached {len(data)} rows for {ticker}")
 
-    def _load_from_cache(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
-        """Load data from cache"""
-        cache_path = self._get_cache_path(ticker, period)
+    def _load_from_cache(self, ticker: str, period: str,
+                         columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load data from cache
 
-        if not cache_path.exists():
-            return None
+        Parameters:
+        ticker: Stock ticker symbol
+        period: Cached period
+        columns: Optional subset of columns to read (e.g. ['Close']); binary
+                 formats read only these columns from disk
+        """
+        cache_path = self._get_cache_path(ticker, period)
 
         try:
-            data = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+            if not cache_path.exists() and not self._migrate_cache_entry(ticker, period):
+                return None
+
+            data = self._read_cache_file(cache_path, self.cache_format, columns)
+
+            # Incrementally refreshed CSVs may keep a few rows older than the
+            # requested period on disk; hide them from callers
+            trim_before = (self._read_cache_meta(ticker, period) or {}).get('trim_before')
+            if trim_before:
+                data = data[data.index >= pd.Timestamp(trim_before)]
+
+            self.cache_index.touch(ticker, period)
+
             print(f"  Loaded {len(data)} rows from cache for {ticker}")
             return data
 
@@ -183,14 +659,179 @@ class DataFetcher:
             print(f"  Error loading cache for {ticker}: {e}")
             return None
 
-    def _validate_data(self, data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    def _append_to_cache(self, ticker: str, period: str, cached_data: pd.DataFrame,
+                         new_rows: pd.DataFrame):
+        """
+        Persist an incremental refresh of a cache entry
+
+        CSV entries get only the new rows appended to the end of the file
+        until enough rows fall outside the requested period, at which point
+        the entry is rewritten trimmed. Binary formats cannot be appended to
+        in place and are rewritten (they are cheap to write).
+        """
+        cache_path = self._get_cache_path(ticker, period)
+        cutoff = self._period_cutoff(period)
+        merged = pd.concat([cached_data, new_rows]).sort_index()
+
+        # cached_data has already been trimmed to the previous trim_before, so
+        # stale rows are counted on the file itself to include earlier ones
+        stale_rows = 0
+        if cutoff is not None and self.cache_format == 'csv':
+            disk_dates = self._read_cache_dates(cache_path)
+            stale_rows = int((disk_dates < cutoff).sum()) + int((new_rows.index < cutoff).sum())
+        trim_before = None
+
+        if cutoff is not None:
+            merged = merged[merged.index >= cutoff]
+
+        if self.cache_format == 'csv' and stale_rows < INCREMENTAL_COMPACT_ROWS:
+            if not new_rows.empty:
+                self._to_cache_frame(new_rows).to_csv(cache_path, mode='a', header=False)
+            if stale_rows:
+                trim_before = cutoff.isoformat()
+        else:
+            self._write_cache_file(cache_path, self._to_cache_frame(merged), self.cache_format)
+
+        meta = self._read_cache_meta(ticker, period) or {'ticker': ticker, 'period': period}
+        meta.update({
+            'cached_at': datetime.now().isoformat(),
+            'rows': len(merged),
+            'columns': list(merged.columns),
+            'format': self.cache_format,
+            'data_source': 'alpha_vantage',
+            'refresh': 'incremental',
+            'trim_before': trim_before
+        })
+        self._write_cache_meta(ticker, period, meta)
+
+    def _read_cache_dates(self, path: Path) -> pd.DatetimeIndex:
+        """Dates of every row in a CSV cache file, including trimmed ones"""
+        if not path.exists():
+            return pd.DatetimeIndex([])
+        return pd.read_csv(path, usecols=[0], index_col=0, parse_dates=True).index
+
+    def _remote_key(self, ticker: str, period: str) -> str:
+        """Remote cache key; the format travels in the metadata, not the name"""
+        return f"{ticker}_{period}"
+
+    def _pull_from_remote(self, ticker: str, period: str) -> bool:
+        """
+        Read through to the remote cache tier on a local miss
+
+        The remote entry is only downloaded if its metadata shows it is newer
+        than the local one. Expired remote entries are still pulled, since
+        they let an incremental refresh replace a full download.
+
+        Returns:
+        bool: True if a fresh entry is now in the local cache
+        """
+        if self.remote_cache is None:
+            return False
+
+        key = self._remote_key(ticker, period)
+
+        try:
+            remote_meta = self.remote_cache.stat(key)
+            if remote_meta is None:
+                return False
+
+            local_meta = self._read_cache_meta(ticker, period)
+            if local_meta and local_meta.get('cached_at', '') >= remote_meta.get('cached_at', ''):
+                return False
+
+            remote_format = remote_meta.get('format', 'csv')
+            if remote_format not in CACHE_FORMATS or (remote_format != 'csv' and not PYARROW_AVAILABLE):
+                print(f"  Skipping remote cache entry for {ticker}: unreadable format {remote_format}")
+                return False
+
+            download_path = self.cache_dir / f"{key}.remote{CACHE_FORMATS[remote_format]}"
+            try:
+                self.remote_cache.get(key, str(download_path))
+                data = self._to_cache_frame(self._read_cache_file(download_path, remote_format))
+            finally:
+                download_path.unlink(missing_ok=True)
+
+            # Store in the local format, keeping the remote cached_at so the
+            # entry expires when it would have at its origin
+            self._write_cache_file(self._get_cache_path(ticker, period), data, self.cache_format)
+            if self.cache_format != 'csv':
+                self._get_cache_path(ticker, period, 'csv').unlink(missing_ok=True)
+
+            meta = dict(remote_meta, format=self.cache_format)
+            self._write_cache_meta(ticker, period, meta)
+
+            fresh = self._is_meta_fresh(meta)
+            print(f"  Pulled {len(data)} rows for {ticker} from remote cache "
+                  f"(cached at {meta.get('cached_at')}{'' if fresh else ', expired'})")
+            return fresh
+
+        except Exception as e:
+            print(f"  Warning: remote cache read failed for {ticker}: {e}")
+            return False
+
+    def _push_to_remote(self, ticker: str, period: str):
+        """Write a freshly fetched cache entry back to the remote tier"""
+        if self.remote_cache is None:
+            return
+
+        try:
+            meta = self._read_cache_meta(ticker, period)
+            self.remote_cache.put(self._remote_key(ticker, period),
+                                  str(self._get_cache_path(ticker, period)), meta)
+        except Exception as e:
+            print(f"  Warning: remote cache write failed for {ticker}: {e}")
+
+    def _can_refresh_incrementally(self, cached_data: pd.DataFrame) -> bool:
+        """Check if a compact fetch is enough to bring cached history up to date"""
+        if cached_data is None or cached_data.empty:
+            return False
+
+        missing_columns = [col for col in PRICE_COLUMNS if col not in cached_data.columns]
+        if missing_columns:
+            return False
+
+        gap = datetime.now() - cached_data.index.max()
+        return gap <= timedelta(days=INCREMENTAL_MAX_GAP_DAYS)
+
+    def _refresh_incrementally(self, ticker: str, period: str,
+                               cached_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Bring a cached series up to date with a compact (last 100 days) fetch
+
+        Rows newer than the last cached date are merged into the cached
+        history by date; only those rows are written back.
+        """
+        last_cached = cached_data.index.max()
+        print(f"  Refreshing {ticker} incrementally (cached through {last_cached.date()})...")
+
+        self.rate_limiter.wait_if_needed()
+        data, meta_data = self.ts.get_daily(symbol=ticker, outputsize='compact')
+
+        if data.empty:
+            raise ValueError(f"No data returned from Alpha Vantage for {ticker}")
+
+        recent = self._validate_data(data, ticker)
+        new_rows = recent[recent.index > last_cached][list(cached_data.columns)]
+
+        self._append_to_cache(ticker, period, cached_data, new_rows)
+        self._push_to_remote(ticker, period)
+        print(f"  Added {len(new_rows)} new rows for {ticker}")
+
+        merged = pd.concat([cached_data, new_rows]).sort_index()
+        if period not in ['max', 'full']:
+            merged = self._filter_by_period(merged, period)
+
+        return merged
+
+    def _validate_data(self, data: pd.DataFrame, ticker: str,
+                       required_columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Validate and clean fetched data"""
         if data.empty:
             raise ValueError(f"No data available for ticker {ticker}")
 
         # Check if data is already in renamed format (from cache) or Alpha Vantage format (fresh)
         has_alpha_vantage_columns = '1. open' in data.columns
-        has_renamed_columns = 'Open' in data.columns
+        has_renamed_columns = any(col in data.columns for col in PRICE_COLUMNS)
 
         if has_alpha_vantage_columns:
             # Fresh data from Alpha Vantage - validate and rename columns
@@ -210,8 +851,8 @@ class DataFetcher:
             })
 
         elif has_renamed_columns:
-            # Data from cache - validate renamed columns
-            required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+            # Data from cache - validate renamed (possibly projected) columns
+            required_columns = required_columns or PRICE_COLUMNS
             missing_columns = [col for col in required_columns if col not in data.columns]
 
             if missing_columns:
@@ -242,7 +883,8 @@ class DataFetcher:
         return 'full' if period in long_periods else 'compact'
 
     def fetch_ticker_data(self, ticker: str, period: str = "2y",
-                         force_refresh: bool = False) -> tuple[pd.DataFrame, bool]:
+                         force_refresh: bool = False,
+                         columns: Optional[List[str]] = None) -> tuple[pd.DataFrame, bool]:
         """
         Fetch ticker data with caching using Alpha Vantage API
 
@@ -250,6 +892,8 @@ class DataFetcher:
         ticker: Stock ticker symbol (e.g., 'AAPL')
         period: Time period ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
         force_refresh: Force refresh of cached data
+        columns: Optional subset of columns to return (e.g. ['Close']); with a
+                 binary cache format only these columns are read from disk
 
         Returns:
         tuple: (DataFrame, is_from_cache) - Data and boolean indicating if from cache
@@ -257,10 +901,241 @@ class DataFetcher:
 
         ticker = ticker.upper()
 
+        if self.data_source is not None:
+            loaded = self._load_from_source([ticker], period, columns)
+            if ticker in loaded:
+                return loaded[ticker]
+
+        return self._fetch_cached_or_api(ticker, period, force_refresh, columns)
+
+    def _fetch_cached_or_api(self, ticker: str, period: str, force_refresh: bool = False,
+                             columns: Optional[List[str]] = None) -> tuple[pd.DataFrame, bool]:
+        """fetch_ticker_data for a ticker the bulk data source does not hold"""
         print(f"  Fetching data for {ticker} (period: {period})")
 
-        # Check cache first
-        if not force_refresh and self._is_cache_valid(ticker, period):
+        # Check cache first; stale entries are served as-is while a
+        # background refresh brings them up to date
+        if not force_refresh:
+            state = self._cache_state(ticker, period)
+            if state == 'fresh' or (state == 'stale' and self.api_key):
+                validated = self._load_validated(ticker, period, columns)
+                if validated is not None:
+                    if state == 'stale':
+                        print(f"  Serving stale cache for {ticker}, refreshing in background")
+                        self._refresh_in_background(ticker, period)
+                    return validated, True
+
+        # Cache misses go through one shared fetch per (ticker, period), so
+        # concurrent callers never spend two API calls on the same series
+        (data, is_from_cache), shared = self._inflight.do(
+            (ticker, period), self._fetch_uncached, ticker, period, force_refresh)
+
+        if shared:
+            print(f"  Shared in-flight fetch for {ticker}")
+
+        if columns and not data.empty:
+            data = data[columns]
+        elif shared:
+            data = data.copy()
+
+        return data, is_from_cache
+
+    def refresh_ticker_data(self, ticker: str, period: str = "2y") -> tuple[pd.DataFrame, bool]:
+        """
+        Refresh a cache entry now, whatever its age
+
+        Uses the remote tier or an incremental fetch where possible and joins
+        any refresh already in flight for the same entry.
+
+        Returns:
+        tuple: (DataFrame, is_from_cache) - is_from_cache is True when no
+               API data was used: a fresher remote entry, or the old local
+               entry after a failed fetch (check cache_status to tell apart)
+        """
+        ticker = ticker.upper()
+        (data, is_from_cache), _ = self._inflight.do(
+            (ticker, period), self._fetch_uncached, ticker, period)
+        return data, is_from_cache
+
+    def _refresh_in_background(self, ticker: str, period: str):
+        """
+        Start a background refresh of a stale entry unless one is running
+
+        The refresh goes through the same single-flight as foreground
+        fetches, so a caller that hits the hard expiry meanwhile joins it
+        rather than spending a second API call.
+        """
+        key = (ticker, period)
+
+        def refresh():
+            try:
+                self._inflight.do(key, self._fetch_uncached, ticker, period)
+            except Exception as e:
+                print(f"  Background refresh failed for {ticker}: {e}")
+
+        with self._background_lock:
+            running = self._background_refreshes.get(key)
+            if running is not None and running.is_alive():
+                return
+
+            thread = threading.Thread(target=refresh, name=f"refresh-{ticker}-{period}", daemon=True)
+            self._background_refreshes[key] = thread
+            thread.start()
+
+    def wait_for_background_refreshes(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for background refreshes to finish
+
+        Parameters:
+        timeout: Maximum seconds to wait in total (None waits indefinitely)
+
+        Returns:
+        bool: True if no refresh is still running
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._background_lock:
+            threads = list(self._background_refreshes.values())
+
+        for thread in threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(remaining)
+
+        with self._background_lock:
+            self._background_refreshes = {key: thread for key, thread in self._background_refreshes.items()
+                                          if thread.is_alive()}
+            return not self._background_refreshes
+
+    def _load_validated(self, ticker: str, period: str,
+                        columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load and validate a cache entry through the in-memory hot tier
+
+        Returns a copy, so callers cannot alter the frame held in memory.
+        """
+        meta = self._read_cache_meta(ticker, period)
+        if meta is None:
+            return None
+
+        key = (ticker, period, tuple(columns) if columns else None)
+        validated = self.memory_cache.get(key, meta['cached_at'])
+
+        if validated is None:
+            cached_data = self._load_from_cache(ticker, period, columns)
+            if cached_data is None:
+                return None
+            validated = self._validate_data(cached_data, ticker, columns)
+            self.memory_cache.put(key, meta['cached_at'], validated)
+        else:
+            self.cache_index.touch(ticker, period)
+
+        return validated.copy()
+
+    def fetch_many(self, tickers: List[str], period: str = "2y",
+                   force_refresh: bool = False,
+                   columns: Optional[List[str]] = None,
+                   max_workers: Optional[int] = None) -> Dict[str, tuple[pd.DataFrame, bool]]:
+        """
+        Fetch several tickers concurrently
+
+        Fresh and stale cache entries are served immediately on the calling
+        thread; only misses are handed to the worker pool, where the rate
+        limiter paces the API calls and duplicate tickers share one in-flight
+        fetch.
+
+        Parameters:
+        tickers: Stock ticker symbols
+        period: Time period, as for fetch_ticker_data
+        force_refresh: Force refresh of cached data
+        columns: Optional subset of columns to return
+        max_workers: Concurrent fetches (default: data.fetch_workers, 4)
+
+        Returns:
+        dict: ticker -> (DataFrame, is_from_cache), in input order; a ticker
+              that could not be fetched maps to an empty DataFrame
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        results: Dict[str, tuple[pd.DataFrame, bool]] = {}
+        misses = []
+
+        # The bulk source answers for every ticker it holds in one load
+        if self.data_source is not None:
+            results.update(self._load_from_source(tickers, period, columns))
+            if len(results) < len(tickers):
+                print(f"  {len(tickers) - len(results)} tickers not in the bulk data source, "
+                      f"falling back to cache and API")
+
+        # Tickers left over have already been looked up in the bulk source
+        def fetch(ticker):
+            try:
+                return self._fetch_cached_or_api(ticker, period, force_refresh, columns)
+            except Exception as e:
+                print(f"  Error fetching data for {ticker}: {e}")
+                return pd.DataFrame(), False
+
+        for ticker in tickers:
+            if ticker in results:
+                continue
+            if not force_refresh and self._cache_state(ticker, period) in ('fresh', 'stale'):
+                results[ticker] = fetch(ticker)
+            else:
+                misses.append(ticker)
+
+        if misses:
+            workers = max(1, min(max_workers or self.fetch_workers, len(misses)))
+            print(f"  Fetching {len(misses)} of {len(tickers)} tickers with {workers} workers")
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for ticker, result in zip(misses, executor.map(fetch, misses)):
+                    results[ticker] = result
+
+        return {ticker: results[ticker] for ticker in tickers}
+
+    def fetch_close_many(self, tickers: List[str], period: str = "2y") -> pd.DataFrame:
+        """
+        Close prices for several tickers as one wide DataFrame
+
+        Returns:
+        DataFrame: Date index, one column per ticker that could be fetched
+        """
+        results = self.fetch_many(tickers, period, columns=['Close'])
+        return pd.DataFrame({ticker: data['Close'] for ticker, (data, _) in results.items()
+                             if not data.empty})
+
+    def _load_from_source(self, tickers: List[str], period: str,
+                          columns: Optional[List[str]] = None) -> Dict[str, tuple[pd.DataFrame, bool]]:
+        """
+        Load tickers from the bulk data source in a single scan
+
+        Returns:
+        dict: ticker -> (validated DataFrame, True) for tickers the source
+              holds; tickers whose data fails validation are left out so
+              the caller falls back to the cache and API
+        """
+        frames = self.data_source.load(tickers, self._period_cutoff(period), columns)
+
+        results = {}
+        for ticker, frame in frames.items():
+            try:
+                results[ticker] = (self._validate_data(frame, ticker, columns or list(frame.columns)), True)
+            except ValueError as e:
+                print(f"  Error in bulk data for {ticker}, falling back to cache and API: {e}")
+
+        print(f"  Loaded {len(frames)} of {len(tickers)} tickers from the bulk data source")
+        return results
+
+    def _fetch_uncached(self, ticker: str, period: str,
+                        force_refresh: bool = False) -> tuple[pd.DataFrame, bool]:
+        """
+        Cache-miss path of fetch_ticker_data: refresh from Alpha Vantage,
+        falling back to expired cache entries
+
+        Returns:
+        tuple: (DataFrame, is_from_cache) with all cached columns
+        """
+
+        # Another allocation may already have fetched this series
+        if not force_refresh and self._pull_from_remote(ticker, period):
             cached_data = self._load_from_cache(ticker, period)
             if cached_data is not None:
                 return self._validate_data(cached_data, ticker), True
@@ -276,6 +1151,13 @@ class DataFetcher:
 
         # Fetch fresh data from Alpha Vantage
         try:
+            # Expired cache entry: fetch only the recent delta if possible
+            if not force_refresh:
+                cached_data = self._load_from_cache(ticker, period)
+                if self._can_refresh_incrementally(cached_data):
+                    refreshed = self._refresh_incrementally(ticker, period, cached_data)
+                    return self._validate_data(refreshed, ticker), False
+
             print(f"  Downloading fresh data for {ticker} from Alpha Vantage...")
 
             # Wait for rate limiting
@@ -303,8 +1185,9 @@ class DataFetcher:
                 if period not in ['max', 'full']:
                     validated_data = self._filter_by_period(validated_data, period)
 
-                # Cache the data
+                # Cache the data locally and in the shared tier
                 self._save_to_cache(ticker, period, validated_data)
+                self._push_to_remote(ticker, period)
 
                 return validated_data, False
             else:
@@ -324,6 +1207,15 @@ class DataFetcher:
 
     def _filter_by_period(self, data: pd.DataFrame, period: str) -> pd.DataFrame:
         """Filter data to requested time period"""
+        cutoff_date = self._period_cutoff(period)
+
+        if cutoff_date is not None:
+            data = data[data.index >= cutoff_date]
+
+        return data
+
+    def _period_cutoff(self, period: str) -> Optional[datetime]:
+        """Earliest date included in a period, or None for unbounded periods"""
         now = datetime.now()
 
         period_map = {
@@ -340,90 +1232,208 @@ class DataFetcher:
         }
 
         if period in period_map:
-            cutoff_date = now - period_map[period]
-            data = data[data.index >= cutoff_date]
+            return now - period_map[period]
 
-        return data
+        return None
+
+    def _fetch_ticker_info(self, symbol: str) -> Dict[str, Any]:
+        """Fetch a company overview from the API (one rate-limited call)"""
+        print(f"  Fetching company info for {symbol}...")
+
+        # Wait for rate limiting
+        self.rate_limiter.wait_if_needed()
+
+        # Get company overview
+        overview, _ = self.fd.get_company_overview(symbol=symbol)
+
+        if overview.empty:
+            raise LookupError(f"No company info available for {symbol}")
+
+        # Extract info from first row
+        info = overview.iloc[0].to_dict()
+
+        return {
+            'symbol': symbol,
+            'name': info.get('Name', 'N/A'),
+            'sector': info.get('Sector', 'N/A'),
+            'industry': info.get('Industry', 'N/A'),
+            'market_cap': info.get('MarketCapitalization', 0),
+            'currency': info.get('Currency', 'USD'),
+            'exchange': info.get('Exchange', 'N/A'),
+            'description': info.get('Description', 'N/A')
+        }
+
+    def _refresh_ticker_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch and store a company overview
 
-    def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
-        """Get basic information about a ticker using Alpha Vantage company overview"""
+        Symbols without an overview are stored as such, so they are not
+        looked up again until the fundamentals TTL passes. Other errors
+        (throttling, network) are raised without touching the store.
+        """
         try:
-            print(f"  Fetching company info for {ticker}...")
+            info = self._fetch_ticker_info(symbol)
+        except LookupError as e:
+            self.fundamentals.put(symbol, error=str(e))
+            raise
 
-            # Wait for rate limiting
-            self.rate_limiter.wait_if_needed()
+        self.fundamentals.put(symbol, info)
+        return info
 
-            # Get company overview
-            overview, _ = self.fd.get_company_overview(symbol=ticker.upper())
+    @staticmethod
+    def _stored_info(entry: Dict[str, Any]) -> Dict[str, Any]:
+        if entry['info'] is not None:
+            return entry['info']
+        return {'symbol': entry['symbol'], 'error': entry['error']}
 
-            if overview.empty:
-                raise ValueError(f"No company info available for {ticker}")
+    def get_ticker_info(self, ticker: str, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get basic information about a ticker using Alpha Vantage company overview
 
-            # Extract info from first row
-            info = overview.iloc[0].to_dict()
+        Overviews come from the fundamentals store while younger than
+        fundamentals_ttl_days; only missing or expired entries cost an API
+        call. If that call fails, an expired entry is returned instead.
+        """
+        symbol = ticker.upper()
+        entry = self.fundamentals.get(symbol)
 
-            return {
-                'symbol': ticker.upper(),
-                'name': info.get('Name', 'N/A'),
-                'sector': info.get('Sector', 'N/A'),
-                'industry': info.get('Industry', 'N/A'),
-                'market_cap': info.get('MarketCapitalization', 0),
-                'currency': info.get('Currency', 'USD'),
-                'exchange': info.get('Exchange', 'N/A'),
-                'description': info.get('Description', 'N/A')
-            }
+        if not force_refresh and self.fundamentals.is_fresh(entry):
+            return self._stored_info(entry)
+
+        try:
+            if self.fd is None:
+                raise ValueError("No API key available")
+            return self._refresh_ticker_info(symbol)
 
         except Exception as e:
+            if entry is not None and entry['info'] is not None:
+                print(f"  Could not refresh info for {symbol} ({e}) - using info from {entry['fetched_at'][:10]}")
+                return entry['info']
             print(f"  Error fetching info for {ticker}: {e}")
-            return {'symbol': ticker.upper(), 'error': str(e)}
+            return {'symbol': symbol, 'error': str(e)}
+
+    def get_ticker_info_many(self, tickers: List[str], refresh: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Company info for many tickers from the fundamentals store, without API calls
+
+        Expired entries are returned as they are. With refresh, missing and
+        expired tickers are queued for a background refresh that spends
+        only spare quota (see refresh_fundamentals_in_background).
+
+        Returns:
+        dict: ticker -> info as returned by get_ticker_info; tickers never
+              fetched are omitted
+        """
+        symbols = [ticker.upper() for ticker in tickers]
+        entries = self.fundamentals.get_many(symbols)
 
-    def clear_cache(self, ticker: str = None, period: str = None):
-        """Clear cache for specific ticker/period or all cache"""
+        if refresh:
+            self.refresh_fundamentals_in_background(symbols)
+
+        return {symbol: self._stored_info(entries[symbol]) for symbol in symbols if symbol in entries}
+
+    def refresh_fundamentals_in_background(self, tickers: List[str]) -> List[str]:
+        """
+        Queue missing and expired company overviews for a background refresh
+
+        A single worker thread drains the queue, paced by the rate limiter,
+        and stops as soon as only fundamentals_reserve_calls calls are left
+        today so price fetches are never starved. Unfinished symbols are
+        picked up by the next call. wait_for_background_refreshes() also
+        waits for this worker.
+
+        Returns:
+        list: symbols queued by this call
+        """
+        if self.rate_limiter is None:
+            return []
+
+        stale = self.fundamentals.needs_refresh([ticker.upper() for ticker in tickers])
+
+        with self._background_lock:
+            queued = [symbol for symbol in stale if symbol not in self._fundamentals_pending]
+            self._fundamentals_pending.extend(queued)
+
+            key = ('fundamentals', None)
+            running = self._background_refreshes.get(key)
+            if self._fundamentals_pending and (running is None or not running.is_alive()):
+                thread = threading.Thread(target=self._drain_fundamentals, name="refresh-fundamentals",
+                                          daemon=True)
+                self._background_refreshes[key] = thread
+                thread.start()
+
+        return queued
+
+    def _drain_fundamentals(self):
+        while True:
+            with self._background_lock:
+                if not self._fundamentals_pending:
+                    return
+                if self.rate_limiter.remaining_today() <= self.fundamentals_reserve_calls:
+                    print(f"  Deferring {len(self._fundamentals_pending)} company info refreshes "
+                          f"to keep {self.fundamentals_reserve_calls} API calls in reserve")
+                    self._fundamentals_pending.clear()
+                    return
+                symbol = self._fundamentals_pending.pop(0)
+
+            try:
+                self._refresh_ticker_info(symbol)
+            except RateLimitExceeded as e:
+                print(f"  Background info refresh stopped: {e}")
+                with self._background_lock:
+                    self._fundamentals_pending.clear()
+                return
+            except Exception as e:
+                print(f"  Background info refresh failed for {symbol}: {e}")
+
+    def clear_cache(self, ticker: str = None, period: str = None,
+                    older_than_days: Optional[float] = None):
+        """
+        Clear cache entries matching every given filter
+
+        Parameters:
+        ticker: Only this ticker (all periods unless period is given)
+        period: Only this period
+        older_than_days: Only entries cached more than this many days ago
+        """
+        ticker = ticker.upper() if ticker else None
+        cached_before = None
+        if older_than_days is not None:
+            cached_before = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+
+        removed = self.cache_index.delete(ticker, period, cached_before)
+        targets = {(entry['ticker'], entry['period']) for entry in removed}
         if ticker and period:
-            # Clear specific ticker and period
-            cache_path = self._get_cache_path(ticker.upper(), period)
-            meta_path = self._get_cache_meta_path(ticker.upper(), period)
+            targets.add((ticker, period))
 
-            if cache_path.exists():
-                cache_path.unlink()
-            if meta_path.exists():
-                meta_path.unlink()
+        for entry_ticker, entry_period in targets:
+            # Every format, in case the entry predates a format switch
+            self._remove_cache_files(entry_ticker, entry_period)
 
+        if older_than_days is not None:
+            print(f"Cleared {len(removed)} cache entries older than {older_than_days} days")
+        elif ticker and period:
             print(f"Cleared cache for {ticker} ({period})")
-
         elif ticker:
-            # Clear all periods for ticker
-            ticker = ticker.upper()
-            for file in self.cache_dir.glob(f"{ticker}_*"):
-                file.unlink()
             print(f"Cleared all cache for {ticker}")
-
         else:
-            # Clear all cache
-            for file in self.cache_dir.glob("*"):
-                if file.is_file():
-                    file.unlink()
             print("Cleared all cache")
 
     def get_cache_info(self) -> Dict[str, Any]:
         """Get information about cached data"""
-        cache_files = list(self.cache_dir.glob("*_data.csv"))
-        meta_files = list(self.cache_dir.glob("*_meta.json"))
-
-        total_size = sum(f.stat().st_size for f in cache_files) / (1024 * 1024)  # MB
-
-        cached_tickers = set()
-        for file in cache_files:
-            parts = file.stem.split('_')
-            if len(parts) >= 2:
-                cached_tickers.add(parts[0])
+        stats = self.cache_index.stats()
 
         return {
             'cache_dir': str(self.cache_dir),
-            'total_files': len(cache_files),
-            'total_size_mb': round(total_size, 2),
-            'cached_tickers': sorted(cached_tickers),
+            'total_files': stats['entries'],
+            'total_size_mb': round(stats['bytes'] / (1024 * 1024), 2),
+            'cached_tickers': stats['tickers'],
             'cache_duration_days': self.cache_duration_days,
-            'api_calls_today': self.rate_limiter.daily_calls,
-            'daily_limit': self.rate_limiter.daily_limit
+            'cache_format': self.cache_format,
+            'cache_max_size_mb': self.cache_max_bytes / (1024 * 1024) if self.cache_max_bytes else None,
+            'evictions': self.evictions,
+            'memory_cache': self.memory_cache.stats(),
+            'fundamentals': self.fundamentals.stats(),
+            'api_calls_today': self.rate_limiter.daily_calls if self.rate_limiter else 0,
+            'daily_limit': self.rate_limiter.daily_limit if self.rate_limiter else 0
         }
@@ -0,0 +1,183 @@
+"""
+Bulk historical data sources for DataFetcher
+
+Alpha Vantage serves one ticker per rate-limited call. A DataSource instead
+answers for many tickers at once; DataFetcher consults it before its cache
+and the API. LocalDatasetSource reads vendor end-of-day dumps laid out as a
+(optionally hive-partitioned) Parquet or CSV directory through
+pyarrow.dataset: the directory is discovered once, ticker and date filters
+are pushed down so only matching partitions, row groups and columns are
+read, and all requested tickers come back from a single scan.
+"""
+
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# pyarrow and pyarrow.dataset are imported when a dataset source is built,
+# so runs without one never load them
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+pa = None
+ds = None
+
+
+def _import_pyarrow():
+    """Bind pa and ds on first use"""
+    global pa, ds
+    if pa is None:
+        import pyarrow as pa
+    if ds is None:
+        import pyarrow.dataset as ds
+
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class DataSource:
+    """Base class for sources that load price history for many tickers at once"""
+
+    def load(self, tickers: List[str], start: Optional[datetime] = None,
+             columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Price history per ticker
+
+        Parameters:
+        tickers: Ticker symbols (upper case)
+        start: Earliest date to include (None for all history)
+        columns: Subset of Open/High/Low/Close/Volume (default: all available)
+
+        Returns:
+        dict: ticker -> DataFrame indexed by Date, oldest first; tickers the
+              source does not hold are omitted
+        """
+        raise NotImplementedError
+
+    def load_close(self, tickers: List[str], start: Optional[datetime] = None) -> pd.DataFrame:
+        """Close prices as one wide DataFrame: Date index, one column per ticker"""
+        frames = self.load(tickers, start, columns=['Close'])
+        if not frames:
+            return pd.DataFrame()
+        return pd.DataFrame({ticker: frame['Close'] for ticker, frame in frames.items()})
+
+
+class LocalDatasetSource(DataSource):
+    """
+    Vendor dump in a Parquet or CSV directory, read with pyarrow.dataset
+
+    Expected layout: long format with one row per (ticker, date), e.g.
+    dumps/ticker=AAPL/part-0.parquet (hive partitioning) or flat files
+    holding many tickers. Price columns are matched case-insensitively
+    (close, Close, CLOSE) unless column_map says otherwise.
+    """
+
+    def __init__(self, path: str, file_format: str = 'parquet', partitioning: Optional[str] = 'hive',
+                 ticker_column: str = 'ticker', date_column: str = 'date',
+                 column_map: Optional[Dict[str, str]] = None):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the local dataset source")
+        _import_pyarrow()
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported dataset format: {file_format}. Expected parquet or csv")
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Dataset not found: {path}")
+
+        self.path = path
+        self.ticker_column = ticker_column
+        self.date_column = date_column
+
+        # File discovery happens once, here
+        self.dataset = ds.dataset(path, format=file_format, partitioning=partitioning)
+        schema = self.dataset.schema
+
+        for column in (ticker_column, date_column):
+            if schema.get_field_index(column) < 0:
+                raise ValueError(f"Dataset {path} has no '{column}' column")
+
+        by_lower = {name.lower(): name for name in schema.names}
+        self.column_map = {column: by_lower[column.lower()] for column in PRICE_COLUMNS
+                           if column.lower() in by_lower}
+        self.column_map.update(column_map or {})
+
+    def _start_scalar(self, start: datetime) -> 'pa.Scalar':
+        """The start date as a scalar comparable with the dataset's date column"""
+        date_type = self.dataset.schema.field(self.date_column).type
+
+        if pa.types.is_timestamp(date_type):
+            return pa.scalar(start, type=date_type)
+        if pa.types.is_date(date_type):
+            return pa.scalar(start.date(), type=date_type)
+        # ISO date strings compare correctly as strings
+        return pa.scalar(start.date().isoformat())
+
+    def load(self, tickers: List[str], start: Optional[datetime] = None,
+             columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        columns = [column for column in (columns or PRICE_COLUMNS) if column in self.column_map]
+        if not tickers or not columns:
+            return {}
+
+        row_filter = ds.field(self.ticker_column).isin(tickers)
+        if start is not None:
+            row_filter &= ds.field(self.date_column) >= self._start_scalar(start)
+
+        # One scan for every ticker; only the needed columns are read
+        table = self.dataset.to_table(
+            columns=[self.ticker_column, self.date_column] + [self.column_map[c] for c in columns],
+            filter=row_filter
+        )
+        if table.num_rows == 0:
+            return {}
+
+        data = table.to_pandas()
+        data = data.rename(columns={self.column_map[c]: c for c in columns})
+        data[self.date_column] = pd.to_datetime(data[self.date_column])
+        for column in columns:
+            data[column] = data[column].astype('float64')
+
+        frames = {}
+        for ticker, group in data.groupby(self.ticker_column, sort=False, observed=True):
+            frame = group.set_index(self.date_column)[columns].sort_index()
+            frame.index.name = 'Date'
+            frames[str(ticker)] = frame
+
+        return frames
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'type': 'local_dataset',
+            'path': self.path,
+            'files': len(self.dataset.files),
+            'columns': sorted(self.column_map)
+        }
+
+
+def create_data_source(data_config: Dict[str, Any]) -> Optional[DataSource]:
+    """
+    Build the bulk data source selected by the data configuration
+
+    data.data_source: 'alpha_vantage' (default, no bulk source) or 'local_dataset'
+    data.dataset_path: Dataset directory
+    data.dataset_format: parquet (default) or csv
+    data.dataset_partitioning: hive (default) or none
+    data.dataset_ticker_column / data.dataset_date_column: Column names
+    data.dataset_columns: Optional explicit map of Open/High/Low/Close/Volume to dataset columns
+    """
+    source = data_config.get('data_source', 'alpha_vantage')
+
+    if source == 'alpha_vantage':
+        return None
+
+    if source == 'local_dataset':
+        partitioning = data_config.get('dataset_partitioning', 'hive')
+        return LocalDatasetSource(
+            data_config['dataset_path'],
+            file_format=data_config.get('dataset_format', 'parquet'),
+            partitioning=None if partitioning == 'none' else partitioning,
+            ticker_column=data_config.get('dataset_ticker_column', 'ticker'),
+            date_column=data_config.get('dataset_date_column', 'date'),
+            column_map=data_config.get('dataset_columns')
+        )
+
+    raise ValueError(f"Unsupported data source: {source}. Expected alpha_vantage or local_dataset")
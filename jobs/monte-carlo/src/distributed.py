@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+
+"""
+Split one large simulation across many allocations
+
+A run of 1,000,000 paths x 1000 days does not fit one monte-carlo-batch
+allocation, so it is dispatched as K path-chunk tasks of the same ticker
+(CHUNK_INDEX/CHUNK_COUNT/SEED meta). The dispatcher fits the initial price,
+drift and volatility once (fit_parameters) and passes them to every chunk as
+PARAMETERS meta, so the chunks neither fetch history nor disagree after a
+cache refresh. Each task draws its share of the paths from its own seed,
+spawned from the run's SEED with numpy's SeedSequence, and keeps only a
+mergeable partial summary of the final prices:
+
+- moments (count, mean, central sums of powers 2-4, min, max), merged with
+  the pairwise update of Chan et al./Pebay
+- a fixed-grid histogram of log final prices; the grid is derived from the
+  fitted drift and volatility, so every chunk of a run shares it
+
+Paths are generated in blocks and never held in memory as a whole. With a
+checkpoint store, progress is saved between blocks and a rescheduled chunk
+resumes where the previous allocation stopped (see checkpoint.py). The
+reducer merges the partials of every chunk into a <TICKER>_summary.json with
+the same statistics and VaR as MonteCarloSimulator.run_simulation: moments
+are exact, median/quartiles/VaR are read from the histogram and are accurate
+to within one bin (16 sigma*sqrt(days) / SKETCH_BINS in log price).
+
+    python src/distributed.py gs://bucket --output-dir ./reduced
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import CheckpointStore, checkpoint_key
+from monte_carlo import MonteCarloSimulator
+
+
+PARTIAL_SUFFIX = '_partial.json'
+
+# Histogram grid: SKETCH_BINS bins spanning the expected log final price
+# +/- SKETCH_WIDTH standard deviations
+SKETCH_BINS = 20000
+SKETCH_WIDTH = 8.0
+
+# Normal draws generated per block (8 bytes each)
+MAX_BLOCK_VALUES = 1_000_000
+
+
+def chunk_seed(seed: int, chunk_index: int) -> np.random.SeedSequence:
+    """The chunk's child of SeedSequence(seed), same as .spawn(count)[chunk_index]"""
+    return np.random.SeedSequence(seed, spawn_key=(chunk_index,))
+
+
+def chunk_sizes(simulations: int, chunk_count: int) -> List[int]:
+    """Paths per chunk; sizes differ by at most one"""
+    if chunk_count < 1:
+        raise ValueError(f"Chunk count must be at least 1: {chunk_count}")
+    base, extra = divmod(simulations, chunk_count)
+    return [base + (1 if i < extra else 0) for i in range(chunk_count)]
+
+
+def partial_filename(ticker: str, chunk_index: int, chunk_count: int) -> str:
+    return f"{ticker}_chunk_{chunk_index:04d}_of_{chunk_count:04d}{PARTIAL_SUFFIX}"
+
+
+def final_price_blocks(initial_price: float, daily_drift: float, daily_volatility: float,
+                       days: int, paths: int, rng: np.random.Generator,
+                       start: int = 0) -> Iterator[np.ndarray]:
+    """
+    Yield final prices of GBM paths, a block of paths at a time
+
+    Each path takes one normal draw per day like geometric_brownian_motion;
+    only the running log price of the block is kept. Block boundaries depend
+    only on days, so a run resumed at start (a block boundary) with the
+    generator state saved there continues exactly where it stopped.
+    """
+    rows = max(1, MAX_BLOCK_VALUES // max(days, 1))
+    days_per_draw = max(1, MAX_BLOCK_VALUES // rows)
+    step = daily_drift - 0.5 * daily_volatility ** 2
+
+    for start in range(start, paths, rows):
+        count = min(rows, paths - start)
+        log_price = np.full(count, math.log(initial_price))
+        for day_start in range(0, days, days_per_draw):
+            day_count = min(days_per_draw, days - day_start)
+            dW = rng.standard_normal((count, day_count))
+            log_price += step * day_count + daily_volatility * dW.sum(axis=1)
+        yield np.exp(log_price)
+
+
+class PartialSummary:
+    """
+    Mergeable summary of final prices: moments plus a fixed-grid histogram
+
+    Parameters:
+    lo: Lower edge of the histogram grid (log price)
+    hi: Upper edge of the histogram grid (log price)
+    bins: Number of equal-width bins between lo and hi
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = SKETCH_BINS):
+        self.lo = lo
+        self.hi = hi
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def for_parameters(cls, initial_price: float, daily_drift: float, daily_volatility: float,
+                       days: int, bins: int = SKETCH_BINS) -> 'PartialSummary':
+        """Summary whose grid covers the GBM final-price distribution"""
+        center = math.log(initial_price) + (daily_drift - 0.5 * daily_volatility ** 2) * days
+        half_width = max(SKETCH_WIDTH * daily_volatility * math.sqrt(days), 1e-9)
+        return cls(center - half_width, center + half_width, bins)
+
+    def _merge_moments(self, n: int, mean: float, m2: float, m3: float, m4: float):
+        if n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = n, mean, m2, m3, m4
+            return
+
+        na, nb = self.n, n
+        total = na + nb
+        delta = mean - self.mean
+
+        m4_total = (self.m4 + m4
+                    + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / total ** 3
+                    + 6 * delta ** 2 * (na * na * m2 + nb * nb * self.m2) / total ** 2
+                    + 4 * delta * (na * m3 - nb * self.m3) / total)
+        m3_total = (self.m3 + m3
+                    + delta ** 3 * na * nb * (na - nb) / total ** 2
+                    + 3 * delta * (na * m2 - nb * self.m2) / total)
+        m2_total = self.m2 + m2 + delta ** 2 * na * nb / total
+
+        self.n = total
+        self.mean += delta * nb / total
+        self.m2, self.m3, self.m4 = m2_total, m3_total, m4_total
+
+    def add(self, values: np.ndarray):
+        """Fold a block of final prices into the summary"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+
+        mean = float(values.mean())
+        deviations = values - mean
+        squared = deviations ** 2
+        self._merge_moments(values.size, mean, float(squared.sum()),
+                            float((squared * deviations).sum()), float((squared * squared).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positions = np.floor((np.log(values) - self.lo) / (self.hi - self.lo) * self.bins)
+        self.below += int((positions < 0).sum())
+        self.above += int((positions >= self.bins).sum())
+        inside = positions[(positions >= 0) & (positions < self.bins)].astype(np.int64)
+        self.counts += np.bincount(inside, minlength=self.bins)
+
+    def merge(self, other: 'PartialSummary'):
+        """Fold another chunk's summary (on the same grid) into this one"""
+        if (other.lo, other.hi, other.bins) != (self.lo, self.hi, self.bins):
+            raise ValueError("Cannot merge partial summaries built on different histogram grids")
+
+        self._merge_moments(other.n, other.mean, other.m2, other.m3, other.m4)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.counts += other.counts
+        self.below += other.below
+        self.above += other.above
+
+    def _value_at(self, rank: int) -> float:
+        """Approximate value of the rank-th smallest price (0-based)"""
+        if rank < self.below:
+            return self.min
+        rank -= self.below
+        cumulative = np.cumsum(self.counts)
+        if rank >= cumulative[-1]:
+            return self.max
+
+        index = int(np.searchsorted(cumulative, rank, side='right'))
+        before = cumulative[index] - self.counts[index]
+        # Values are spread evenly across their bin
+        position = (rank - before + 0.5) / self.counts[index]
+        width = (self.hi - self.lo) / self.bins
+        return min(max(math.exp(self.lo + (index + position) * width), self.min), self.max)
+
+    def percentile(self, q: float) -> float:
+        """Percentile q (0-100) with np.percentile's linear interpolation"""
+        if self.n == 0:
+            raise ValueError("Cannot take a percentile of an empty summary")
+        h = (self.n - 1) * q / 100
+        lower = int(math.floor(h))
+        value = self._value_at(lower)
+        if h > lower:
+            value += (h - lower) * (self._value_at(lower + 1) - value)
+        return value
+
+    def statistics(self) -> Dict[str, float]:
+        """Same keys and definitions as MonteCarloSimulator.calculate_statistics"""
+        std = math.sqrt(self.m2 / self.n)
+        return {
+            'mean': self.mean,
+            'median': self.percentile(50),
+            'std': std,
+            'min': self.min,
+            'max': self.max,
+            'q25': self.percentile(25),
+            'q75': self.percentile(75),
+            'skewness': (self.m3 / self.n) / std ** 3 if std else 0.0,
+            'kurtosis': (self.m4 / self.n) / std ** 4 - 3 if std else 0.0
+        }
+
+    def var(self, confidence_levels: List[float]) -> Dict[float, float]:
+        """Same levels and definition as MonteCarloSimulator.calculate_var"""
+        return {confidence: self.percentile((1 - confidence) * 100) for confidence in confidence_levels}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Only the occupied stretch of the histogram is stored
+        occupied = np.nonzero(self.counts)[0]
+        offset = int(occupied[0]) if occupied.size else 0
+        end = int(occupied[-1]) + 1 if occupied.size else 0
+        return {
+            'n': self.n, 'mean': self.mean, 'm2': self.m2, 'm3': self.m3, 'm4': self.m4,
+            'min': self.min, 'max': self.max,
+            'histogram': {
+                'lo': self.lo, 'hi': self.hi, 'bins': self.bins,
+                'below': self.below, 'above': self.above,
+                'offset': offset, 'counts': self.counts[offset:end].tolist()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PartialSummary':
+        histogram = data['histogram']
+        summary = cls(histogram['lo'], histogram['hi'], histogram['bins'])
+        counts = histogram['counts']
+        summary.counts[histogram['offset']:histogram['offset'] + len(counts)] = counts
+        summary.below = histogram['below']
+        summary.above = histogram['above']
+        summary.n = data['n']
+        summary.mean, summary.m2, summary.m3, summary.m4 = data['mean'], data['m2'], data['m3'], data['m4']
+        summary.min, summary.max = data['min'], data['max']
+        return summary
+
+
+def fit_parameters(historical_data: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Fit a run's initial price and GBM parameters from its price history
+
+    Returns:
+    dict: JSON-serialisable {'initial_price', 'parameters'}, shared by every chunk
+    """
+    if historical_data is None or 'Close' not in historical_data.columns:
+        raise ValueError("Historical data must contain 'Close' column")
+    prices = historical_data['Close'].dropna()
+    if len(prices) < 30:
+        raise ValueError("Insufficient historical data (need at least 30 days)")
+
+    simulator = MonteCarloSimulator()
+    return {
+        'initial_price': float(prices.iloc[-1]),
+        'parameters': {key: float(value) for key, value in
+                       simulator.estimate_parameters(simulator.calculate_returns(prices)).items()}
+    }
+
+
+def chunk_identity(ticker: str, days: int, simulations: int, confidence_levels: List[float],
+                   chunk_index: int, chunk_count: int, seed: int) -> Dict[str, Any]:
+    """Parameters that identify one chunk; a checkpoint only resumes the same chunk"""
+    return {
+        'ticker': ticker,
+        'days': int(days),
+        'simulations': int(simulations),
+        'confidence_levels': [float(level) for level in confidence_levels],
+        'chunk_index': int(chunk_index),
+        'chunk_count': int(chunk_count),
+        'seed': int(seed),
+        'block_values': MAX_BLOCK_VALUES
+    }
+
+
+def find_checkpoint(store: Optional[CheckpointStore], identity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The saved checkpoint of the chunk identified by identity, if any"""
+    if store is None:
+        return None
+    checkpoint = store.load(checkpoint_key(identity))
+    if checkpoint is None or checkpoint.get('run') != identity:
+        return None
+    return checkpoint
+
+
+def run_chunk(ticker: str, historical_data: Optional[pd.DataFrame], days: int, simulations: int,
+              confidence_levels: List[float], chunk_index: int, chunk_count: int,
+              seed: int, checkpoint_store: Optional[CheckpointStore] = None,
+              checkpoint_interval: float = 60.0, fit: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Simulate one path chunk of a distributed run
+
+    Parameters:
+    ticker: Stock ticker symbol
+    historical_data: DataFrame with 'Close' price column (may be None when
+                     fit is given or when resuming from a checkpoint, which
+                     holds the fitted parameters)
+    days: Number of days to simulate
+    simulations: Total Monte Carlo paths across all chunks
+    confidence_levels: Confidence levels for VaR, applied by the reducer
+    chunk_index: This chunk (0-based)
+    chunk_count: Number of chunks the run is split into
+    seed: Seed of the whole run; the chunk's own seed is spawned from it
+    checkpoint_store: Where to save progress and look for a checkpoint to resume
+    checkpoint_interval: Minimum seconds between checkpoints (0 saves after every block)
+    fit: Parameters fitted once for the whole run (see fit_parameters);
+         without it the chunk fits them from historical_data
+
+    Returns:
+    dict: JSON-serialisable partial summary for reduce_partials
+    """
+    if not 0 <= chunk_index < chunk_count:
+        raise ValueError(f"Chunk index {chunk_index} out of range for {chunk_count} chunks")
+
+    identity = chunk_identity(ticker, days, simulations, confidence_levels, chunk_index, chunk_count, seed)
+    paths = chunk_sizes(simulations, chunk_count)[chunk_index]
+    rng = np.random.default_rng(chunk_seed(seed, chunk_index))
+    checkpoint = find_checkpoint(checkpoint_store, identity)
+
+    if checkpoint is not None:
+        # The checkpoint's fitted parameters are reused even if the cached
+        # history has been refreshed since, so the result does not change
+        initial_price = checkpoint['initial_price']
+        params = checkpoint['parameters']
+        summary = PartialSummary.from_dict(checkpoint['summary'])
+        rng.bit_generator.state = checkpoint['rng_state']
+        paths_done = checkpoint['paths_done']
+        print(f"  Resuming chunk {chunk_index + 1}/{chunk_count} from checkpoint: {paths_done}/{paths} paths done")
+    else:
+        if fit is None:
+            fit = fit_parameters(historical_data)
+        initial_price = float(fit['initial_price'])
+        params = {key: float(value) for key, value in fit['parameters'].items()}
+        summary = PartialSummary.for_parameters(initial_price, params['daily_drift'],
+                                                params['daily_volatility'], days)
+        paths_done = 0
+
+    def save_checkpoint():
+        checkpoint_store.save(checkpoint_key(identity), {
+            'run': identity,
+            'initial_price': initial_price,
+            'parameters': params,
+            'paths_done': paths_done,
+            'rng_state': rng.bit_generator.state,
+            'summary': summary.to_dict(),
+            'saved_at': datetime.now().isoformat()
+        })
+
+    last_saved = time.monotonic()
+    for block in final_price_blocks(initial_price, params['daily_drift'], params['daily_volatility'],
+                                    days, paths, rng, start=paths_done):
+        summary.add(block)
+        paths_done += len(block)
+        if checkpoint_store is not None and time.monotonic() - last_saved >= checkpoint_interval:
+            save_checkpoint()
+            last_saved = time.monotonic()
+
+    if checkpoint_store is not None and (checkpoint is None or checkpoint['paths_done'] < paths):
+        # A finished chunk is saved too: a reschedule before the upload
+        # completes only has to rewrite the partial
+        save_checkpoint()
+
+    return {
+        'ticker': ticker,
+        'days': int(days),
+        'simulations': int(simulations),
+        'seed': int(seed),
+        'chunk_index': int(chunk_index),
+        'chunk_count': int(chunk_count),
+        'initial_price': initial_price,
+        'parameters': params,
+        'confidence_levels': [float(level) for level in confidence_levels],
+        'summary': summary.to_dict(),
+        'generated_at': datetime.now().isoformat()
+    }
+
+
+def reduce_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge the partial summaries of every chunk of one run
+
+    Returns:
+    dict: summary in the format of MonteCarloSimulator.summarize_results
+    """
+    if not partials:
+        raise ValueError("No partial summaries to reduce")
+
+    first = partials[0]
+    run = {key: first[key] for key in ('ticker', 'days', 'simulations', 'seed', 'chunk_count')}
+    by_index = {}
+    for partial in partials:
+        other = {key: partial[key] for key in run}
+        if other != run:
+            raise ValueError(f"Partial summaries belong to different runs: {run} and {other}")
+        if partial['initial_price'] != first['initial_price'] or partial['parameters'] != first['parameters']:
+            raise ValueError(f"Chunks of {run['ticker']} were fitted on different price histories")
+        by_index[partial['chunk_index']] = partial
+
+    missing = sorted(set(range(run['chunk_count'])) - set(by_index))
+    if missing:
+        raise ValueError(f"Missing chunks of {run['ticker']}: {missing} of {run['chunk_count']}")
+
+    merged = PartialSummary.from_dict(by_index[0]['summary'])
+    for index in range(1, run['chunk_count']):
+        merged.merge(PartialSummary.from_dict(by_index[index]['summary']))
+
+    if merged.n != run['simulations']:
+        raise ValueError(f"Chunks of {run['ticker']} cover {merged.n} of {run['simulations']} paths")
+
+    return {
+        'ticker': run['ticker'],
+        'days': run['days'],
+        'simulations': merged.n,
+        'initial_price': first['initial_price'],
+        'parameters': first['parameters'],
+        'statistics': {key: float(value) for key, value in merged.statistics().items()},
+        'var': {str(level): float(value) for level, value in merged.var(first['confidence_levels']).items()},
+        'seed': run['seed'],
+        'chunks': run['chunk_count'],
+        'generated_at': max(partial['generated_at'] for partial in partials)
+    }
+
+
+def load_partials(source: str) -> Iterator[Dict[str, Any]]:
+    """Partial summaries under a gs:// URL (via upload manifests) or a local directory"""
+    if source.startswith('gs://'):
+        # google-cloud-storage is only needed when reading from a bucket
+        from aggregate import ResultsAggregator
+        from gcs_uploader import GCSUploader
+
+        aggregator = ResultsAggregator(GCSUploader())
+        bucket_name, prefix = aggregator.uploader.parse_gcs_url(source)
+        yield from aggregator.iter_summaries(bucket_name, prefix, suffix=PARTIAL_SUFFIX)
+        if aggregator.errors:
+            raise Exception(f"Failed to read {len(aggregator.errors)} objects under {source}")
+        return
+
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"Partials directory not found: {source}")
+    for path in sorted(Path(source).rglob(f"*{PARTIAL_SUFFIX}")):
+        with open(path, 'r') as f:
+            yield json.load(f)
+
+
+def reduce_runs(partials: Iterator[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Group partials by run and reduce each
+
+    Returns:
+    tuple: (summaries of complete runs, error messages for the others)
+    """
+    runs: Dict[Tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for partial in partials:
+        runs[(partial['ticker'], partial['days'], partial['seed'], partial['chunk_count'])].append(partial)
+
+    summaries, errors = [], []
+    for key in sorted(runs):
+        try:
+            summaries.append(reduce_partials(runs[key]))
+        except ValueError as e:
+            errors.append(str(e))
+    return summaries, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reduce chunked Monte Carlo runs into per-ticker summaries')
+
+    parser.add_argument('source',
+                       help='GCS URL or local directory holding the chunk partial summaries')
+    parser.add_argument('--output-dir', '-o', default='./reduced',
+                       help='Directory for the reduced summaries (default: ./reduced)')
+    parser.add_argument('--gcs-bucket',
+                       help='Also upload the reduced summaries here, where aggregate.py finds them')
+    parser.add_argument('--gcs-prefix', default='reduced',
+                       help='GCS object prefix for uploaded summaries (default: reduced)')
+
+    args = parser.parse_args()
+
+    print(f"Reducing chunk summaries under: {args.source}")
+
+    try:
+        summaries, errors = reduce_runs(load_partials(args.source))
+    except Exception as e:
+        print(f"Error during reduction: {e}")
+        sys.exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for summary in summaries:
+        summary_file = os.path.join(args.output_dir, f"{summary['ticker']}_summary.json")
+        with open(summary_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        stats = summary['statistics']
+        print(f"  {summary['ticker']} ({summary['days']} days): {summary['simulations']} paths "
+              f"in {summary['chunks']} chunks, mean ${stats['mean']:.2f}, median ${stats['median']:.2f}")
+        for level, var_value in summary['var'].items():
+            print(f"    VaR ({float(level)*100:.0f}%): ${var_value:.2f}")
+
+    for error in errors:
+        print(f"  Error: {error}")
+
+    if args.gcs_bucket and summaries:
+        try:
+            from gcs_uploader import GCSUploader
+            _, success = GCSUploader().upload_results_directory(args.output_dir, args.gcs_bucket,
+                                                                prefix=args.gcs_prefix)
+        except Exception as e:
+            print(f"Error: Failed to upload reduced summaries: {e}")
+            success = False
+        if not success:
+            sys.exit(1)
+
+    print(f"\nReduced {len(summaries)} runs into: {args.output_dir}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
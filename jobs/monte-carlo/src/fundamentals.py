@@ -0,0 +1,104 @@
+"""
+Long-lived store of company fundamentals for DataFetcher
+
+A company overview (name, sector, industry, exchange) changes far less
+often than prices, yet every get_ticker_info call used to spend one of the
+day's 25 Alpha Vantage calls on it. FundamentalsStore keeps overviews in a
+SQLite table next to the price cache with their own TTL, measured in weeks
+rather than days. Symbols the API has no overview for (ETFs, indices) are
+remembered as well, so they do not cost a call on every run.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class FundamentalsStore:
+    """SQLite table of company overviews keyed by symbol"""
+
+    def __init__(self, path: str, ttl_days: float = 90):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_days = ttl_days
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fundamentals (
+                symbol TEXT PRIMARY KEY,
+                fetched_at TEXT NOT NULL,
+                info TEXT,
+                error TEXT
+            )
+        """)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        if entry is None:
+            return False
+        age = datetime.now() - datetime.fromisoformat(entry['fetched_at'])
+        return age < timedelta(days=self.ttl_days)
+
+    @staticmethod
+    def _to_entry(row: tuple) -> Dict[str, Any]:
+        symbol, fetched_at, info, error = row
+        return {
+            'symbol': symbol,
+            'fetched_at': fetched_at,
+            'info': json.loads(info) if info else None,
+            'error': error
+        }
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for a symbol (fresh or not), or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM fundamentals WHERE symbol = ?", (symbol,)).fetchone()
+        return self._to_entry(row) if row else None
+
+    def get_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored entries for many symbols in one query; unknown symbols are omitted"""
+        if not symbols:
+            return {}
+
+        placeholders = ",".join("?" * len(symbols))
+        with self.lock:
+            rows = self.conn.execute(f"SELECT * FROM fundamentals WHERE symbol IN ({placeholders})",
+                                     tuple(symbols)).fetchall()
+        return {row[0]: self._to_entry(row) for row in rows}
+
+    def put(self, symbol: str, info: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Store an overview, or the reason there is none"""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO fundamentals (symbol, fetched_at, info, error) "
+                              "VALUES (?, ?, ?, ?)",
+                              (symbol, datetime.now().isoformat(),
+                               json.dumps(info) if info is not None else None, error))
+
+    def needs_refresh(self, symbols: List[str]) -> List[str]:
+        """
+        Symbols that are missing or past the TTL
+
+        Returns:
+        list: missing symbols first, then stale ones oldest first
+        """
+        entries = self.get_many(symbols)
+        missing = [symbol for symbol in symbols if symbol not in entries]
+        stale = sorted((entry for entry in entries.values() if not self.is_fresh(entry)),
+                       key=lambda entry: entry['fetched_at'])
+        return missing + [entry['symbol'] for entry in stale]
+
+    def stats(self) -> Dict[str, Any]:
+        cutoff = (datetime.now() - timedelta(days=self.ttl_days)).isoformat()
+        with self.lock:
+            total, fresh = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(fetched_at >= ?), 0) FROM fundamentals", (cutoff,)).fetchone()
+        return {'symbols': total, 'fresh': fresh, 'ttl_days': self.ttl_days}
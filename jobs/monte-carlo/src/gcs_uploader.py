@@ -1,8 +1,15 @@
+import io
 import os
 import json
+import gzip
+import time
+import random
+import shutil
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import mimetypes
 
 try:
@@ -14,22 +21,128 @@ except ImportError:
     storage = None
     GoogleCloudError = Exception
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+# Content types that compress well and are safe to serve with
+# Content-Encoding: gzip (GCS transcodes them transparently on download)
+COMPRESSIBLE_CONTENT_TYPES = {
+    'application/json',
+    'application/x-yaml',
+    'application/yaml',
+}
+
+# Chunk size used when streaming files through the gzip compressor
+GZIP_CHUNK_SIZE = 1024 * 1024
+
+# HTTP status codes GCS documents as safe to retry
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# GCS compose accepts at most 32 source objects per request
+MAX_COMPOSE_SOURCES = 32
+
+# Object fields requested when listing; projecting away the rest of the
+# resource (ACLs, owner, checksums, ...) shrinks every listing page
+LIST_FIELDS = 'items(name,size,updated),nextPageToken'
+
+# Resumable chunk size for slice uploads (must be a multiple of 256 KiB);
+# bounds the memory each upload thread buffers
+SLICE_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _FileSlice(io.RawIOBase):
+    """
+    Read-only window onto a byte range of an open file
+
+    Reads use os.pread on the shared file descriptor, so several slices of
+    the same file can be read concurrently from different threads without
+    sharing a file position.
+    """
+
+    def __init__(self, fd: int, offset: int, length: int):
+        super().__init__()
+        self.fd = fd
+        self.offset = offset
+        self.length = length
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = pos
+        elif whence == io.SEEK_CUR:
+            self.position += pos
+        elif whence == io.SEEK_END:
+            self.position = self.length + pos
+        self.position = max(0, min(self.position, self.length))
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        remaining = self.length - self.position
+        if remaining <= 0:
+            return 0
+        data = os.pread(self.fd, min(len(buffer), remaining), self.offset + self.position)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
 
 class GCSUploader:
     """Handles uploading simulation results to Google Cloud Storage"""
 
-    def __init__(self, credentials_path: Optional[str] = None):
+    def __init__(self, credentials_path: Optional[str] = None,
+                 compress_text: bool = False, max_retries: int = 5,
+                 initial_backoff: float = 1.0, max_backoff: float = 30.0,
+                 retry_deadline: float = 120.0, slice_threshold: Optional[int] = None,
+                 slice_size: int = 64 * 1024 * 1024, slice_workers: int = 8):
         """
         Initialize GCS uploader
 
         Parameters:
         credentials_path: Path to service account JSON file (optional)
                          If not provided, uses Application Default Credentials
+        compress_text: Gzip text-like files (CSV, JSON, YAML, ...) on the fly
+                       and store them with Content-Encoding: gzip
+        max_retries: Maximum retries per object for transient errors
+        initial_backoff: Upper bound in seconds of the first retry delay
+        max_backoff: Cap in seconds on any single retry delay
+        retry_deadline: Total time budget in seconds for retries of one object
+        slice_threshold: Upload files of at least this many bytes as parallel
+                         slices composed server-side (None disables)
+        slice_size: Target slice size in bytes (raised as needed to stay
+                    within the 32-source compose limit)
+        slice_workers: Maximum concurrent slice uploads per file
         """
         if not GCS_AVAILABLE:
             raise ImportError("google-cloud-storage library is required for GCS functionality")
 
         self.credentials_path = credentials_path
+        self.compress_text = compress_text
+
+        # Retry policy for transient failures
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retry_deadline = retry_deadline
+
+        # Sliced (parallel composite) upload settings
+        self.slice_threshold = slice_threshold
+        self.slice_size = slice_size
+        self.slice_workers = slice_workers
+
+        # Raw and stored byte counts per uploaded GCS URL
+        self.transfer_stats: Dict[str, Dict] = {}
 
         # Initialize the client
         if credentials_path and os.path.exists(credentials_path):
@@ -83,8 +196,135 @@ class GCSUploader:
 
         return content_type
 
+    @staticmethod
+    def is_compressible(content_type: str) -> bool:
+        """Check if content type is text-like and worth compressing"""
+        return content_type.startswith('text/') or content_type in COMPRESSIBLE_CONTENT_TYPES
+
+    @staticmethod
+    def _gzip_to_tempfile(file_obj):
+        """
+        Stream a file through gzip into an anonymous temporary file
+
+        The source is read in fixed-size chunks so memory use stays constant
+        regardless of file size. The returned file is positioned at offset 0.
+        """
+        compressed = tempfile.TemporaryFile()
+        # mtime=0 keeps the output deterministic for identical inputs
+        with gzip.GzipFile(fileobj=compressed, mode='wb', mtime=0) as gz:
+            shutil.copyfileobj(file_obj, gz, GZIP_CHUNK_SIZE)
+        compressed.seek(0)
+        return compressed
+
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        """Classify whether an error is transient and the request can be retried"""
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+
+        if requests is not None and isinstance(
+                error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+
+        # google.api_core exceptions carry the HTTP status as an int code
+        code = getattr(error, 'code', None)
+        return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+    def _call_with_retry(self, func, description: str):
+        """
+        Call func, retrying transient errors with capped exponential backoff
+
+        Delays use full jitter: a uniform draw between 0 and
+        min(max_backoff, initial_backoff * 2^attempt). Retrying stops after
+        max_retries attempts or once the next delay would overrun
+        retry_deadline, at which point the last error is re-raised.
+        """
+        deadline = time.monotonic() + self.retry_deadline
+        attempt = 0
+
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                if not self.is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+
+                delay = random.uniform(0, min(self.max_backoff, self.initial_backoff * (2 ** attempt)))
+                if time.monotonic() + delay > deadline:
+                    raise
+
+                attempt += 1
+                clean_error = self._extract_error_message(str(e))
+                print(f"  Transient error on {description} ({clean_error}), "
+                      f"retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _upload_from_file(self, blob, file_obj, description: str, **kwargs):
+        """Upload an open file to a blob, rewinding it before each attempt"""
+        def attempt():
+            file_obj.seek(0)
+            blob.upload_from_file(file_obj, **kwargs)
+
+        self._call_with_retry(attempt, description)
+
+    def _plan_slices(self, size: int) -> List[tuple]:
+        """Split size bytes into at most MAX_COMPOSE_SOURCES (offset, length) ranges"""
+        slice_size = max(self.slice_size, -(-size // MAX_COMPOSE_SOURCES))
+        return [(offset, min(slice_size, size - offset))
+                for offset in range(0, size, slice_size)]
+
+    def _upload_sliced(self, bucket, blob, file_obj, size: int,
+                       content_type: str, description: str):
+        """
+        Upload a file as concurrent slices and compose them into blob
+
+        Each slice is written to a temporary object next to the destination,
+        the slices are composed server-side in order, and the temporaries are
+        deleted whether or not the compose succeeded. Composite objects carry
+        a CRC32C checksum but no MD5 hash.
+        """
+        slices = self._plan_slices(size)
+        fd = file_obj.fileno()
+        slice_blobs = [bucket.blob(f"{blob.name}.__slice_{index:02d}", chunk_size=SLICE_CHUNK_SIZE)
+                       for index in range(len(slices))]
+
+        def upload_slice(index):
+            offset, length = slices[index]
+            with _FileSlice(fd, offset, length) as slice_obj:
+                self._upload_from_file(slice_blobs[index], slice_obj,
+                                       f"{description} (slice {index + 1}/{len(slices)})",
+                                       content_type=content_type, size=length)
+
+        print(f"  Uploading {len(slices)} slices in parallel ({size / (1024 * 1024):.1f} MB)")
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.slice_workers, len(slices))) as executor:
+                # list() re-raises the first slice failure
+                list(executor.map(upload_slice, range(len(slices))))
+
+            # The destination blob's content type, encoding and metadata
+            # become the properties of the composed object
+            blob.content_type = content_type
+            self._call_with_retry(lambda: blob.compose(slice_blobs), f"{description} (compose)")
+        finally:
+            for slice_blob in slice_blobs:
+                try:
+                    slice_blob.delete()
+                except Exception:
+                    # Slice may not exist if its upload failed
+                    pass
+
+    def _upload_stream(self, bucket, blob, file_obj, size: int,
+                       content_type: str, description: str):
+        """Upload an open file in one stream, or sliced when above slice_threshold"""
+        if self.slice_threshold is not None and size >= self.slice_threshold:
+            self._upload_sliced(bucket, blob, file_obj, size, content_type, description)
+        else:
+            self._upload_from_file(blob, file_obj, description, content_type=content_type, size=size)
+
     def upload_file(self, local_file_path: str, bucket_name: str,
-                   object_name: str, metadata: Optional[Dict] = None) -> str:
+                   object_name: str, metadata: Optional[Dict] = None,
+                   compress: Optional[bool] = None) -> str:
         """
         Upload a single file to GCS
 
@@ -93,6 +333,7 @@ class GCSUploader:
         bucket_name: GCS bucket name
         object_name: Object name in bucket (key/path)
         metadata: Optional metadata dictionary
+        compress: Gzip text-like content before upload (defaults to compress_text)
 
         Returns:
         GCS URL of uploaded file
@@ -100,6 +341,9 @@ class GCSUploader:
         if not os.path.exists(local_file_path):
             raise FileNotFoundError(f"Local file not found: {local_file_path}")
 
+        if compress is None:
+            compress = self.compress_text
+
         try:
             # Get bucket
             bucket = self.client.bucket(bucket_name)
@@ -109,19 +353,42 @@ class GCSUploader:
 
             # Set content type
             content_type = self.get_content_type(local_file_path)
+            use_gzip = compress and self.is_compressible(content_type)
 
             # Set metadata
             if metadata:
                 blob.metadata = metadata
 
             # Upload file
-            print(f"  Uploading {local_file_path} -> gs://{bucket_name}/{object_name}")
+            print(f"  Uploading {local_file_path} -> gs://{bucket_name}/{object_name}"
+                  f"{' (gzip)' if use_gzip else ''}")
 
-            with open(local_file_path, 'rb') as file_obj:
-                blob.upload_from_file(file_obj, content_type=content_type)
+            raw_bytes = os.path.getsize(local_file_path)
+            stored_bytes = raw_bytes
 
             # Return GCS URL
             gcs_url = f"gs://{bucket_name}/{object_name}"
+
+            with open(local_file_path, 'rb') as file_obj:
+                if use_gzip:
+                    # Consumers get the original bytes back through
+                    # decompressive transcoding. Slicing the compressed
+                    # stream is safe: compose concatenates the bytes back.
+                    blob.content_encoding = 'gzip'
+                    with self._gzip_to_tempfile(file_obj) as compressed:
+                        stored_bytes = os.fstat(compressed.fileno()).st_size
+                        self._upload_stream(bucket, blob, compressed, stored_bytes,
+                                            content_type, gcs_url)
+                else:
+                    self._upload_stream(bucket, blob, file_obj, raw_bytes,
+                                        content_type, gcs_url)
+
+            self.transfer_stats[gcs_url] = {
+                'raw_bytes': raw_bytes,
+                'stored_bytes': stored_bytes,
+                'content_encoding': 'gzip' if use_gzip else None
+            }
+
             return gcs_url
 
         except GoogleCloudError as e:
@@ -130,7 +397,8 @@ class GCSUploader:
             raise Exception(f"Failed to upload {local_file_path} to GCS: {error_msg}")
 
     def upload_results_directory(self, local_dir: str, bucket_url: str,
-                               prefix: str = "monte-carlo-results") -> tuple[Dict[str, str], bool]:
+                               prefix: str = "monte-carlo-results",
+                               linked_files: Optional[Dict[str, str]] = None) -> tuple[Dict[str, str], bool]:
         """
         Upload entire results directory to GCS
 
@@ -138,6 +406,8 @@ class GCSUploader:
         local_dir: Local directory containing results
         bucket_url: GCS bucket URL (gs://bucket/path)
         prefix: Object prefix for uploaded files
+        linked_files: Results already stored in GCS (name -> GCS URL), listed
+                      in the manifest without being uploaded again
 
         Returns:
         Dictionary mapping local file paths to GCS URLs
@@ -195,6 +465,13 @@ class GCSUploader:
                     failed_uploads.append(str(relative_path))
                     continue
 
+        # Summarise raw vs stored bytes for everything uploaded so far
+        transfer = {}
+        for relative_name, gcs_url in uploaded_files.items():
+            stats = self.transfer_stats.get(gcs_url)
+            if stats:
+                transfer[relative_name] = stats
+
         # Create and upload a manifest file
         manifest = {
             'upload_info': {
@@ -202,10 +479,15 @@ class GCSUploader:
                 'local_directory': str(local_path.absolute()),
                 'gcs_bucket': bucket_name,
                 'gcs_prefix': full_prefix,
-                'total_files': len(uploaded_files)
+                'total_files': len(uploaded_files),
+                'total_raw_bytes': sum(t['raw_bytes'] for t in transfer.values()),
+                'total_stored_bytes': sum(t['stored_bytes'] for t in transfer.values())
             },
-            'files': uploaded_files
+            'files': dict(linked_files or {}, **uploaded_files),
+            'transfer': transfer
         }
+        if linked_files:
+            manifest['linked_files'] = sorted(linked_files)
 
         # Save manifest locally and upload
         manifest_file = local_path / 'upload_manifest.json'
@@ -242,6 +524,157 @@ class GCSUploader:
         except GoogleCloudError as e:
             raise Exception(f"Failed to list bucket contents: {e}")
 
+    def iter_bucket_contents(self, bucket_name: str, prefix: str = "",
+                             delimiter: Optional[str] = None,
+                             fields: Optional[str] = LIST_FIELDS,
+                             page_size: int = 1000) -> Iterator:
+        """
+        Lazily iterate over blobs under a prefix, one listing page at a time
+
+        Parameters:
+        bucket_name: GCS bucket name
+        prefix: Only yield objects whose name starts with this prefix
+        delimiter: Group names at this delimiter (e.g. '/') instead of
+                   recursing; grouped prefixes are available via list_prefixes
+        fields: Partial-response field projection for each page (None for all)
+        page_size: Maximum objects per listing request
+
+        Yields:
+        Blob objects with (at least) name, size and updated populated
+        """
+        try:
+            iterator = self.client.list_blobs(bucket_name, prefix=prefix, delimiter=delimiter,
+                                              fields=fields, page_size=page_size)
+            for page in iterator.pages:
+                yield from page
+        except GoogleCloudError as e:
+            raise Exception(f"Failed to list bucket contents: {e}")
+
+    def list_prefixes(self, bucket_name: str, prefix: str = "",
+                      delimiter: str = '/') -> Iterator[str]:
+        """
+        Lazily iterate over the immediate sub-prefixes of a prefix
+
+        For example, with one prefix per Nomad allocation, listing
+        'monte-carlo-results/' yields 'monte-carlo-results/<alloc-id>/'
+        without enumerating any of the objects below them.
+        """
+        try:
+            iterator = self.client.list_blobs(bucket_name, prefix=prefix, delimiter=delimiter,
+                                              fields='prefixes,nextPageToken')
+            seen = set()
+            for _ in iterator.pages:
+                # iterator.prefixes accumulates across pages
+                for sub_prefix in sorted(iterator.prefixes - seen):
+                    seen.add(sub_prefix)
+                    yield sub_prefix
+        except GoogleCloudError as e:
+            raise Exception(f"Failed to list bucket prefixes: {e}")
+
+    def download_prefix(self, bucket_name: str, prefix: str, local_dir: str,
+                        max_workers: int = 8, name_filter=None) -> tuple[Dict[str, str], bool]:
+        """
+        Download every object under a prefix into a local directory concurrently
+
+        Objects are streamed from the listing into a bounded worker pool, so
+        at most a couple of pages of pending downloads exist at any time
+        regardless of how many objects live under the prefix.
+
+        Parameters:
+        bucket_name: GCS bucket name
+        prefix: Object prefix to download
+        local_dir: Destination directory; object paths below prefix are kept
+        max_workers: Maximum concurrent downloads
+        name_filter: Optional callable(object_name) -> bool selecting objects
+
+        Returns:
+        Tuple of (mapping of object name to local path, success flag)
+        """
+        local_root = Path(local_dir).resolve()
+        local_root.mkdir(parents=True, exist_ok=True)
+
+        downloaded = {}
+        failed_downloads = []
+        max_pending = max_workers * 2
+
+        def download(blob, target):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._call_with_retry(lambda: blob.download_to_filename(str(target)),
+                                  f"gs://{bucket_name}/{blob.name}")
+            return blob.name, str(target)
+
+        def collect(done):
+            for future in done:
+                object_name = futures.pop(future)
+                try:
+                    name, target = future.result()
+                    downloaded[name] = target
+                except Exception as e:
+                    clean_error = self._extract_error_message(str(e))
+                    print(f"  Error: Failed to download {object_name}: {clean_error}")
+                    failed_downloads.append(object_name)
+
+        print(f"  Downloading gs://{bucket_name}/{prefix} -> {local_root}")
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for blob in self.iter_bucket_contents(bucket_name, prefix=prefix):
+                # Skip folder placeholder objects
+                if blob.name.endswith('/'):
+                    continue
+                if name_filter is not None and not name_filter(blob.name):
+                    continue
+
+                relative_name = blob.name[len(prefix):].lstrip('/')
+                target = (local_root / relative_name).resolve()
+                if not target.is_relative_to(local_root):
+                    print(f"  Warning: Skipping {blob.name} (path escapes {local_root})")
+                    continue
+
+                if len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                futures[executor.submit(download, blob, target)] = blob.name
+
+            collect(list(futures))
+
+        success = len(failed_downloads) == 0
+        print(f"  Downloaded {len(downloaded)} files"
+              f"{f', {len(failed_downloads)} failed' if failed_downloads else ''}")
+
+        return downloaded, success
+
+    def get_blob(self, bucket_name: str, object_name: str):
+        """An object's blob with its metadata loaded, or None if it does not exist"""
+        try:
+            bucket = self.client.bucket(bucket_name)
+            return self._call_with_retry(lambda: bucket.get_blob(object_name),
+                                         f"gs://{bucket_name}/{object_name}")
+        except GoogleCloudError as e:
+            raise Exception(f"Failed to read metadata of {object_name}: {e}")
+
+    def delete_object(self, bucket_name: str, object_name: str) -> bool:
+        """Delete an object if it exists; returns whether there was one"""
+        blob = self.get_blob(bucket_name, object_name)
+        if blob is None:
+            return False
+
+        try:
+            self._call_with_retry(blob.delete, f"gs://{bucket_name}/{object_name}")
+        except GoogleCloudError as e:
+            raise Exception(f"Failed to delete {object_name}: {e}")
+        return True
+
+    def read_object(self, bucket_name: str, object_name: str) -> bytes:
+        """Read a (small) object's content into memory"""
+        try:
+            blob = self.client.bucket(bucket_name).blob(object_name)
+            return self._call_with_retry(blob.download_as_bytes,
+                                         f"gs://{bucket_name}/{object_name}")
+        except GoogleCloudError as e:
+            raise Exception(f"Failed to read {object_name}: {e}")
+
     def download_file(self, bucket_name: str, object_name: str,
                      local_file_path: str) -> None:
         """Download a file from GCS to local filesystem"""
@@ -254,7 +687,8 @@ class GCSUploader:
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
             print(f"  Downloading gs://{bucket_name}/{object_name} -> {local_file_path}")
-            blob.download_to_filename(local_file_path)
+            self._call_with_retry(lambda: blob.download_to_filename(local_file_path),
+                                  f"gs://{bucket_name}/{object_name}")
 
         except GoogleCloudError as e:
             raise Exception(f"Failed to download {object_name}: {e}")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+
+"""
+Follow dispatched monte-carlo-batch jobs through Nomad's event stream
+
+dispatch-batch-jobs.sh --monitor runs `nomad job status -short` for every
+dispatched job every 10 seconds. This monitor instead lists the parent's
+children once, then subscribes to the Job and Allocation topics of
+/v1/event/stream from the index of that listing: one connection covers every
+child, and a completion shows up as soon as Nomad records it. If the stream
+drops, it resumes from the last index it saw, so no event is missed.
+
+Allocation events drive the per-job state (pending, running, complete,
+failed, lost); a new allocation pointing at a PreviousAllocation counts as a
+reschedule. A child is finished once an allocation completes or Nomad marks
+the job dead.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from nomad_dispatcher import DEFAULT_JOB_NAME, NomadClient, NomadError
+
+
+EVENT_TOPICS = ['Job:*', 'Allocation:*']
+
+# Terminal outcomes of a child job
+OUTCOMES = ('complete', 'failed', 'lost', 'stopped')
+
+
+class ChildJob:
+    """State of one dispatched child job"""
+
+    def __init__(self, job_id: str, tickers: str = ''):
+        self.job_id = job_id
+        self.tickers = tickers
+        self.status = 'pending'
+        self.finished = False
+        self.allocations: Dict[str, str] = {}
+        self.reschedules = 0
+        self.updated_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'tickers': self.tickers,
+            'status': self.status,
+            'finished': self.finished,
+            'allocations': len(self.allocations),
+            'reschedules': self.reschedules,
+            'updated_at': self.updated_at
+        }
+
+
+class JobMonitor:
+    """
+    Tracks the children of a parameterized job from a listing plus events
+
+    Parameters:
+    parent_job: Parameterized job whose dispatches are followed
+    job_ids: Only follow these children (default: every child seen)
+    """
+
+    def __init__(self, parent_job: str = DEFAULT_JOB_NAME, job_ids: Optional[List[str]] = None):
+        self.parent_job = parent_job
+        self.prefix = f"{parent_job}/dispatch-"
+        self.job_ids = set(job_ids) if job_ids else None
+        self.jobs: Dict[str, ChildJob] = {}
+        self.index = 0
+        self.events_seen = 0
+
+        for job_id in job_ids or []:
+            self.jobs[job_id] = ChildJob(job_id)
+
+    def _watched(self, job_id: Optional[str]) -> bool:
+        if not job_id:
+            return False
+        if self.job_ids is not None:
+            return job_id in self.job_ids
+        return job_id.startswith(self.prefix)
+
+    def _job(self, job_id: str) -> ChildJob:
+        if job_id not in self.jobs:
+            self.jobs[job_id] = ChildJob(job_id)
+        return self.jobs[job_id]
+
+    def seed(self, stubs: List[Dict[str, Any]], index: int):
+        """Initial state from /v1/jobs stubs taken at index"""
+        for stub in stubs:
+            if not self._watched(stub.get('ID')):
+                continue
+
+            job = self._job(stub['ID'])
+            job.tickers = job.tickers or (stub.get('Meta') or {}).get('TICKER', '')
+
+            summary = {}
+            for group in ((stub.get('JobSummary') or {}).get('Summary') or {}).values():
+                for key, value in group.items():
+                    summary[key] = summary.get(key, 0) + value
+
+            if summary.get('Running') or summary.get('Starting'):
+                job.status = 'running'
+            if stub.get('Status') == 'dead':
+                self._finish(job, 'complete' if summary.get('Complete') else
+                             'stopped' if stub.get('Stop') else
+                             'lost' if summary.get('Lost') else 'failed')
+
+        self.index = max(self.index, index)
+
+    def _finish(self, job: ChildJob, outcome: str):
+        job.status = outcome
+        job.finished = True
+
+    def apply(self, event: Dict[str, Any]) -> Optional[ChildJob]:
+        """
+        Fold one event into the state
+
+        Returns:
+        ChildJob: the job whose status changed, or None
+        """
+        topic = event.get('Topic')
+        payload = event.get('Payload') or {}
+        self.index = max(self.index, event.get('Index', 0))
+
+        if topic == 'Allocation':
+            alloc = payload.get('Allocation') or {}
+            job_id = alloc.get('JobID')
+            if not self._watched(job_id):
+                return None
+            job = self._job(job_id)
+            before = job.status
+
+            alloc_id = alloc.get('ID')
+            if alloc_id not in job.allocations and alloc.get('PreviousAllocation'):
+                job.reschedules += 1
+            client_status = alloc.get('ClientStatus', 'pending')
+            job.allocations[alloc_id] = client_status
+
+            if not job.finished:
+                if client_status == 'complete':
+                    # A batch allocation that completed is never rescheduled
+                    self._finish(job, 'complete')
+                elif client_status in ('pending', 'running', 'failed', 'lost'):
+                    # failed/lost may still be rescheduled; the job event decides
+                    job.status = client_status
+
+        elif topic == 'Job':
+            job_data = payload.get('Job') or {}
+            job_id = job_data.get('ID')
+            if not self._watched(job_id):
+                return None
+            job = self._job(job_id)
+            before = job.status
+            job.tickers = job.tickers or (job_data.get('Meta') or {}).get('TICKER', '')
+
+            if job_data.get('Status') == 'dead' and not job.finished:
+                if job_data.get('Stop'):
+                    self._finish(job, 'stopped')
+                elif job.status in ('failed', 'lost'):
+                    self._finish(job, job.status)
+                elif 'complete' in job.allocations.values():
+                    self._finish(job, 'complete')
+                else:
+                    self._finish(job, 'failed')
+        else:
+            return None
+
+        self.events_seen += 1
+        job.updated_at = datetime.now().isoformat()
+        return job if job.status != before else None
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in ('pending', 'running') + OUTCOMES}
+        for job in self.jobs.values():
+            if job.status in ('failed', 'lost') and not job.finished:
+                # Awaiting a reschedule decision
+                counts['running'] += 1
+            else:
+                counts[job.status] += 1
+        counts['rescheduled'] = sum(job.reschedules for job in self.jobs.values())
+        return counts
+
+    @property
+    def done(self) -> bool:
+        """True once every followed job has finished"""
+        return bool(self.jobs) and all(job.finished for job in self.jobs.values())
+
+    def run(self, client: NomadClient, timeout: Optional[float] = None,
+            on_change: Optional[Callable[[ChildJob], None]] = None,
+            reconnect_delay: float = 1.0) -> bool:
+        """
+        Follow events until every job has finished or timeout passes
+
+        Returns:
+        bool: True if every job finished
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stubs, index = client.list_jobs_indexed(self.prefix)
+        self.seed(stubs, index)
+
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+            # Heartbeat frames (every 10s) let the deadline be checked on a
+            # quiet stream; the read timeout covers a stream that goes silent
+            read_timeout = 60.0
+            if deadline is not None:
+                read_timeout = min(read_timeout, max(deadline - time.monotonic(), 0.0) + 1.0)
+
+            try:
+                # Resume after the last index seen; events at that index
+                # were already applied
+                for frame in client.stream_events(EVENT_TOPICS, index=self.index + 1,
+                                                  read_timeout=read_timeout):
+                    for event in frame['Events']:
+                        event.setdefault('Index', frame.get('Index', 0))
+                        job = self.apply(event)
+                        if job is not None and on_change is not None:
+                            on_change(job)
+                    if self.done or (deadline is not None and time.monotonic() >= deadline):
+                        break
+            except NomadError as e:
+                print(f"  Warning: {e}; reconnecting from index {self.index}")
+
+            if not self.done:
+                time.sleep(reconnect_delay)
+
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'parent_job': self.parent_job,
+            'index': self.index,
+            'counts': self.counts(),
+            'jobs': [job.to_dict() for job in sorted(self.jobs.values(), key=lambda job: job.job_id)]
+        }
+
+
+def load_dispatch_record(path: str) -> List[str]:
+    """Job IDs from a nomad_dispatcher.py --output record"""
+    with open(path, 'r') as f:
+        record = json.load(f)
+    return [entry['job_id'] for entry in record.get('dispatched', []) if entry.get('job_id')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Follow dispatched Monte Carlo jobs through the Nomad event stream')
+
+    parser.add_argument('--job-name', '-j', default=DEFAULT_JOB_NAME,
+                       help=f'Parent parameterized job (default: {DEFAULT_JOB_NAME})')
+    parser.add_argument('--dispatch-record', '-r',
+                       help='Follow only the jobs in a nomad_dispatcher.py --output file')
+    parser.add_argument('--timeout', type=float,
+                       help='Stop following after this many seconds')
+    parser.add_argument('--nomad-addr',
+                       help='Nomad API address (default: $NOMAD_ADDR or http://127.0.0.1:4646)')
+    parser.add_argument('--report', '-o',
+                       help='Write the final per-job state as JSON to this path')
+
+    args = parser.parse_args()
+
+    job_ids = load_dispatch_record(args.dispatch_record) if args.dispatch_record else None
+    monitor = JobMonitor(args.job_name, job_ids)
+
+    def on_change(job: ChildJob):
+        counts = monitor.counts()
+        print(f"  {job.job_id} ({job.tickers or '?'}): {job.status}"
+              f"{f' after {job.reschedules} reschedules' if job.reschedules and job.finished else ''}")
+        print(f"  Job Status: Running={counts['running']}, Completed={counts['complete']}, "
+              f"Failed={counts['failed'] + counts['lost']}, Rescheduled={counts['rescheduled']}")
+
+    try:
+        client = NomadClient(address=args.nomad_addr)
+        finished = monitor.run(client, timeout=args.timeout, on_change=on_change)
+    except NomadError as e:
+        print(f"Error: Failed to follow {args.job_name}: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nMonitoring stopped. Jobs are still running in the background.")
+        finished = False
+
+    counts = monitor.counts()
+    print(f"\nFollowed {len(monitor.jobs)} jobs: {counts['complete']} completed, "
+          f"{counts['failed'] + counts['lost']} failed, {counts['stopped']} stopped, "
+          f"{counts['rescheduled']} reschedules")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(monitor.report(), f, indent=2)
+        print(f"Report saved to: {args.report}")
+
+    if not finished:
+        print("Warning: some jobs were still running when monitoring stopped")
+        sys.exit(2)
+    if counts['failed'] or counts['lost']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
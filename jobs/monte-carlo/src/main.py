@@ -1,50 +1,92 @@
 #!/usr/bin/env python3
 
+import time
+_IMPORTS_STARTED = time.perf_counter()
+
 import argparse
-import yaml
+import json
 import sys
 import os
-from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict
 
+# Only what every run needs is imported here; plotting (matplotlib), GCS
+# (google-cloud-storage) and the Alpha Vantage clients load on the code
+# paths that use them
+from config import load_config, get_default_dirs
 from monte_carlo import MonteCarloSimulator
 from data_fetcher import DataFetcher
-from visualizer import Visualizer
-from gcs_uploader import GCSUploader
 
+_IMPORTS_FINISHED = time.perf_counter()
 
-def load_config(config_path):
-    """Load configuration from YAML file"""
-    try:
-        with open(config_path, 'r') as file:
-            return yaml.safe_load(file)
-    except FileNotFoundError:
-        print(f"Config file not found: {config_path}")
-        return {}
-    except yaml.YAMLError as e:
-        print(f"Error parsing config file: {e}")
-        return {}
-
-
-def get_default_dirs():
-    """Get default directories based on execution environment"""
-    # Check if we're running in Docker container
-    if os.path.exists('/app') and os.path.exists('/app/config'):
-        # Running in Docker container
-        return {
-            'config': '/app/config/simulation.yaml',
-            'output': '/app/results',
-            'cache': '/app/data'
-        }
-    else:
-        # Running locally - use current directory subfolders
-        current_dir = Path.cwd()
+# Modules that are slow to import and needed only by some runs; --timings
+# reports which of them a run actually loaded
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'scipy', 'google.cloud.storage', 'alpha_vantage', 'requests',
+                 'pyarrow', 'pyarrow.dataset')
+
+
+class StartupTimer:
+    """Wall-clock time per phase of a run, reported by --timings"""
+
+    def __init__(self):
+        self.phases = {'imports': _IMPORTS_FINISHED - _IMPORTS_STARTED}
+        self.last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def report(self) -> Dict[str, Any]:
         return {
-            'config': str(current_dir / 'config' / 'simulation.yaml'),
-            'output': str(current_dir / 'results'),
-            'cache': str(current_dir / 'data')
+            'phases': {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            'total_seconds': round(sum(self.phases.values()), 4),
+            'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in sys.modules]
         }
 
 
+def optional_int(value: str):
+    """argparse type for Nomad meta that may be unset (interpolated as '')"""
+    return int(value) if value.strip() else None
+
+
+def optional_json(value: str):
+    """argparse type for JSON-valued Nomad meta that may be unset ('')"""
+    return json.loads(value) if value.strip() else None
+
+
+def optional_flag(value: str) -> bool:
+    """argparse type for a flag set from Nomad meta ('', 'true', '1', ...)"""
+    return value.strip().lower() in ('1', 'true', 'yes')
+
+
+def print_statistics(simulation_results: Dict[str, Any]):
+    """Print final price statistics and VaR of one ticker"""
+    stats = simulation_results['statistics']
+    print(f"Final Price Statistics:")
+    print(f"  Mean: ${stats['mean']:.2f}")
+    print(f"  Median: ${stats['median']:.2f}")
+    print(f"  Std Dev: ${stats['std']:.2f}")
+
+    var_stats = simulation_results['var']
+    for level, var_value in var_stats.items():
+        print(f"  VaR ({level*100:.0f}%): ${var_value:.2f}")
+
+
+def report_timings(report: Dict[str, Any], path: str = None):
+    """Print the --timings report and optionally save it as JSON"""
+    print("\nTimings:")
+    for phase, seconds in report['phases'].items():
+        print(f"  {phase}: {seconds * 1000:.0f}ms")
+    print(f"  total: {report['total_seconds'] * 1000:.0f}ms")
+    print(f"  Heavy modules loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}")
+
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
 def main():
     # Get environment-appropriate default directories
     defaults = get_default_dirs()
@@ -52,7 +94,10 @@ def main():
     parser = argparse.ArgumentParser(description='Monte Carlo Stock Price Simulation')
 
     parser.add_argument('--tickers', '-t', nargs='+',
-                       help='Stock ticker symbols (e.g., AAPL MSFT GOOGL)')
+                       help='Stock ticker symbols, space or comma separated (e.g., AAPL MSFT,GOOGL)')
+    parser.add_argument('--tickers-file',
+                       help='File with more tickers, one per line; ignored if missing '
+                            '(Nomad writes it only for dispatches with a payload)')
     parser.add_argument('--days', '-d', type=int, default=252,
                        help='Number of days to simulate (default: 252)')
     parser.add_argument('--simulations', '-s', type=int, default=10000,
@@ -75,15 +120,50 @@ def main():
                        help='Google Cloud Storage bucket URL (e.g., gs://bucket/path)')
     parser.add_argument('--gcs-prefix', default='monte-carlo-results',
                        help='GCS object prefix for uploaded files')
+    parser.add_argument('--gcs-gzip', action='store_true',
+                       help='Gzip text results (CSV/JSON) on upload with Content-Encoding: gzip')
+    parser.add_argument('--gcs-slice-threshold-mb', type=int,
+                       help='Upload files of at least this size (MB) as parallel composite slices')
+    parser.add_argument('--remote-cache',
+                       help='Shared cache tier behind --cache-dir (gs://bucket/prefix or a directory)')
+    parser.add_argument('--chunk-index', type=optional_int,
+                       help='Run only this path chunk of a distributed run (0-based)')
+    parser.add_argument('--chunk-count', type=optional_int,
+                       help='Number of path chunks the run is split into')
+    parser.add_argument('--seed', type=optional_int,
+                       help='Seed of the distributed run; each chunk spawns its own from it')
+    parser.add_argument('--parameters', type=optional_json,
+                       help='Initial price and fitted parameters shared by every chunk (JSON, set by the dispatcher)')
+    parser.add_argument('--checkpoint',
+                       help='Save chunk progress here and resume from it (directory or gs://bucket/prefix)')
+    parser.add_argument('--checkpoint-interval', type=float, default=60.0,
+                       help='Minimum seconds between chunk checkpoints (default: 60)')
+    parser.add_argument('--result-cache',
+                       help='Reuse results of identical runs stored here (directory or gs://bucket/prefix)')
+    parser.add_argument('--force-recompute', nargs='?', const=True, default=False, type=optional_flag,
+                       help='Simulate even when the result cache has this run (results are still stored)')
+    parser.add_argument('--refresh-fundamentals', action='store_true',
+                       help='Refresh missing or expired company info in the background from spare API quota '
+                            '(worthwhile only with a persistent --cache-dir)')
+    parser.add_argument('--refresh-wait', type=float, default=300.0,
+                       help='Seconds to wait at exit for background cache refreshes; 0 exits at once (default: 300)')
+    parser.add_argument('--timings', nargs='?', const='-', metavar='PATH',
+                       help='Report time per phase and heavy modules loaded (optionally also as JSON to PATH)')
 
     args = parser.parse_args()
+    timer = StartupTimer()
 
     # Load configuration file
     config = load_config(args.config)
 
-    # Override config with command line arguments
-    if args.tickers:
-        config['tickers'] = args.tickers
+    # Override config with command line arguments. Packed dispatches pass
+    # several tickers in one comma-separated TICKER meta value
+    tickers = [ticker for arg in args.tickers or [] for ticker in arg.split(',') if ticker.strip()]
+    if args.tickers_file and os.path.exists(args.tickers_file):
+        with open(args.tickers_file, 'r') as f:
+            tickers.extend(line.strip() for line in f if line.strip())
+    if tickers:
+        config['tickers'] = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers))
     if not config.get('tickers'):
         print("Error: No ticker symbols provided. Use --tickers or specify in config file.")
         sys.exit(1)
@@ -93,6 +173,16 @@ def main():
     config['output_dir'] = args.output_dir
     config['cache_dir'] = args.cache_dir
     config['confidence_levels'] = args.confidence_levels
+    if args.remote_cache:
+        config.setdefault('data', {})['remote_cache'] = args.remote_cache
+
+    chunked = args.chunk_count is not None or args.chunk_index is not None
+    if chunked and (args.chunk_count is None or args.chunk_index is None or args.seed is None):
+        print("Error: Chunked runs need --chunk-index, --chunk-count and --seed together.")
+        sys.exit(1)
+    if args.parameters is not None and (not chunked or len(config['tickers']) != 1):
+        print("Error: --parameters applies to a chunked run of a single ticker.")
+        sys.exit(1)
 
     # Ensure output directories exist
     os.makedirs(args.output_dir, exist_ok=True)
@@ -106,17 +196,127 @@ def main():
         data_fetcher = DataFetcher(cache_dir=args.cache_dir, config=config)
         simulator = MonteCarloSimulator()
 
-        results = {}
+        # Chunks with a checkpoint resume with the parameters fitted by the
+        # previous allocation and need no price history
+        checkpoint_store = None
+        resumed = set()
+        if chunked and args.checkpoint:
+            from checkpoint import create_checkpoint_store, checkpoint_key
+            from distributed import chunk_identity, find_checkpoint
+            checkpoint_store = create_checkpoint_store(args.checkpoint)
+            identities = {ticker: chunk_identity(ticker, config['days'], config['simulations'],
+                                                 config['confidence_levels'], args.chunk_index,
+                                                 args.chunk_count, args.seed)
+                          for ticker in config['tickers']}
+            resumed = {ticker for ticker, identity in identities.items()
+                       if find_checkpoint(checkpoint_store, identity) is not None}
+
+        # Identical runs (same price series, parameters and generator state)
+        # are served from the result cache instead of being recomputed
+        result_cache = None
+        if args.result_cache and not chunked:
+            from result_cache import (create_result_cache, latest_name, result_key,
+                                      rng_state_from_dict, rng_state_to_dict)
+            result_cache = create_result_cache(args.result_cache)
+        cached_results = {}
+        fresh_results = {}
+        linked_files = {}
+        timer.mark('setup')
 
-        for ticker in config['tickers']:
+        results = {}
+        missing_chunks = []
+
+        # Fetch historical data for all tickers up front; cache misses are
+        # fetched concurrently under the rate limiter.
+        # Only closing prices feed the simulation
+        print("\nFetching historical data...")
+        # Chunks given the run's fitted parameters need no history either
+        fetch_tickers = [ticker for ticker in config['tickers']
+                         if ticker not in resumed and args.parameters is None]
+        ticker_data = data_fetcher.fetch_many(fetch_tickers, period="2y", columns=['Close']) if fetch_tickers else {}
+        ticker_data = {ticker: ticker_data.get(ticker, (None, True)) for ticker in config['tickers']}
+
+        # Sector and industry come from the fundamentals store at no API
+        # cost; missing entries are refreshed from spare quota only on request,
+        # since an ephemeral cache directory would throw the results away
+        ticker_info = data_fetcher.get_ticker_info_many(config['tickers'], refresh=args.refresh_fundamentals)
+        timer.mark('fetch')
+
+        for ticker, (historical_data, is_from_cache) in ticker_data.items():
             print(f"\nProcessing {ticker}...")
 
-            # Fetch historical data
-            historical_data, is_from_cache = data_fetcher.fetch_ticker_data(ticker, period="2y")
-            if historical_data.empty:
+            if historical_data is not None and historical_data.empty:
+                if chunked:
+                    # The reducer needs every chunk, so a missing partial
+                    # fails the allocation rather than the reduce step
+                    print(f"Error: No data found for {ticker}, chunk {args.chunk_index + 1}/{args.chunk_count} "
+                          f"cannot be written")
+                    missing_chunks.append(ticker)
+                    continue
                 print(f"Warning: No data found for {ticker}, skipping...")
                 continue
 
+            if chunked:
+                # One path chunk of a distributed run: only the mergeable
+                # partial summary is kept, src/distributed.py reduces them
+                from distributed import run_chunk, partial_filename
+                partial = run_chunk(ticker, historical_data, config['days'], config['simulations'],
+                                    config['confidence_levels'], args.chunk_index, args.chunk_count, args.seed,
+                                    checkpoint_store=checkpoint_store,
+                                    checkpoint_interval=args.checkpoint_interval, fit=args.parameters)
+                partial_file = os.path.join(args.output_dir,
+                                            partial_filename(ticker, args.chunk_index, args.chunk_count))
+                with open(partial_file, 'w') as f:
+                    json.dump(partial, f)
+                print(f"Chunk {args.chunk_index + 1}/{args.chunk_count} "
+                      f"({partial['summary']['n']} paths) saved to: {partial_file}")
+                results[ticker] = partial
+                continue
+
+            output_file = os.path.join(args.output_dir, f"{ticker}_simulation.csv")
+            summary_file = os.path.join(args.output_dir, f"{ticker}_summary.json")
+            info = ticker_info.get(ticker.upper(), {})
+
+            cache_key = None
+            if result_cache is not None:
+                cache_key = result_key(historical_data['Close'].dropna(), config['days'], config['simulations'],
+                                       config['confidence_levels'], simulator.random_state)
+                entry = None if args.force_recompute else result_cache.get(cache_key)
+                if entry is not None:
+                    print(f"  Result cache hit: {cache_key[:16]}")
+                    # Continue from the generator state the run ended with, so
+                    # later tickers match an uncached run
+                    simulator.random_state.set_state(rng_state_from_dict(entry['rng_state_after']))
+
+                    csv_name = os.path.basename(output_file)
+                    csv_url = result_cache.artifact_url(entry, csv_name)
+                    if csv_url and args.gcs_bucket:
+                        linked_files[csv_name] = csv_url
+                        print(f"Results linked from: {csv_url}")
+                    else:
+                        result_cache.restore(entry, csv_name, output_file)
+                        print(f"Results restored to: {output_file}")
+
+                    summary = dict(entry['summary'], generated_at=datetime.now().isoformat(), result_key=cache_key)
+                    if 'sector' in info:
+                        summary['sector'] = info['sector']
+                        summary['industry'] = info['industry']
+                    with open(summary_file, 'w') as f:
+                        json.dump(summary, f, indent=2)
+
+                    simulation_results = {
+                        'statistics': summary['statistics'],
+                        'var': {float(level): value for level, value in summary['var'].items()},
+                        'parameters': summary['parameters'],
+                        'initial_price': summary['initial_price'],
+                        'simulations': summary['simulations'],
+                        'days': summary['days']
+                    }
+                    results[ticker] = simulation_results
+                    cached_results[ticker] = entry
+                    print_statistics(simulation_results)
+                    continue
+
             # Run Monte Carlo simulation
             simulation_results = simulator.run_simulation(
                 historical_data=historical_data,
@@ -128,44 +328,84 @@ def main():
             results[ticker] = simulation_results
 
             # Save results to CSV
-            output_file = os.path.join(args.output_dir, f"{ticker}_simulation.csv")
             simulation_results['paths'].to_csv(output_file, index=False)
             print(f"Results saved to: {output_file}")
 
+            # Save compact summary for cross-run aggregation
+            summary = MonteCarloSimulator.summarize_results(ticker, simulation_results)
+            if cache_key is not None:
+                fresh_results[ticker] = (cache_key, {
+                    'key': cache_key,
+                    'ticker': ticker,
+                    'created_at': datetime.now().isoformat(),
+                    'summary': dict(summary),
+                    'rng_state_after': rng_state_to_dict(simulator.random_state)
+                }, {os.path.basename(output_file): output_file})
+
+            summary['generated_at'] = datetime.now().isoformat()
+            if 'sector' in info:
+                summary['sector'] = info['sector']
+                summary['industry'] = info['industry']
+            with open(summary_file, 'w') as f:
+                json.dump(summary, f, indent=2)
+
             # Print summary statistics
-            stats = simulation_results['statistics']
-            print(f"Final Price Statistics:")
-            print(f"  Mean: ${stats['mean']:.2f}")
-            print(f"  Median: ${stats['median']:.2f}")
-            print(f"  Std Dev: ${stats['std']:.2f}")
+            print_statistics(simulation_results)
 
-            var_stats = simulation_results['var']
-            for level, var_value in var_stats.items():
-                print(f"  VaR ({level*100:.0f}%): ${var_value:.2f}")
+        timer.mark('simulate')
 
         # Generate visualizations
-        if not args.no_plots and results:
+        if not args.no_plots and results and not chunked:
             print("\nGenerating visualizations...")
+            # matplotlib is only needed here; service.py reuses this module without it
+            from visualizer import Visualizer
             visualizer = Visualizer()
 
             for ticker, result in results.items():
+                if 'paths' not in result:
+                    # Cached result: plot from the stored path CSV
+                    import pandas as pd
+                    output_file = os.path.join(args.output_dir, f"{ticker}_simulation.csv")
+                    if not os.path.exists(output_file):
+                        result_cache.restore(cached_results[ticker], os.path.basename(output_file), output_file)
+                        linked_files.pop(os.path.basename(output_file), None)
+                    result['paths'] = pd.read_csv(output_file)
+                    result['final_prices'] = result['paths'].iloc[-1].to_numpy()
+
                 print(f"Creating plots for {ticker}...")
                 visualizer.create_simulation_plots(
                     ticker=ticker,
                     results=result,
                     output_dir=args.output_dir
                 )
+            timer.mark('plots')
+
+        # Let stale-cache refreshes finish writing before the process exits;
+        # batch jobs pass --refresh-wait 0 rather than hold their allocation
+        if args.refresh_wait > 0 and not data_fetcher.wait_for_background_refreshes(timeout=args.refresh_wait):
+            print("Warning: background cache refreshes still running at exit")
+        timer.mark('background_refresh')
 
         # Upload results to Google Cloud Storage if bucket is specified
         gcs_upload_success = True
+        uploaded_files = {}
         if args.gcs_bucket and results:
             print(f"\nUploading results to GCS bucket: {args.gcs_bucket}")
             try:
-                gcs_uploader = GCSUploader()
+                slice_threshold = None
+                if args.gcs_slice_threshold_mb:
+                    slice_threshold = args.gcs_slice_threshold_mb * 1024 * 1024
+
+                from gcs_uploader import GCSUploader
+                gcs_uploader = GCSUploader(
+                    compress_text=args.gcs_gzip,
+                    slice_threshold=slice_threshold
+                )
                 uploaded_files, gcs_upload_success = gcs_uploader.upload_results_directory(
                     local_dir=args.output_dir,
                     bucket_url=args.gcs_bucket,
-                    prefix=args.gcs_prefix
+                    prefix=args.gcs_prefix,
+                    linked_files=linked_files
                 )
 
                 if gcs_upload_success:
@@ -179,6 +419,34 @@ def main():
                 print(f"\nError: Failed to upload results to GCS: {gcs_error}")
                 print("Results are still available locally.")
                 gcs_upload_success = False
+            timer.mark('upload')
+
+        # Store new results, referencing the uploaded copies of their
+        # artifacts where there are any, and mark every result as latest
+        if result_cache is not None:
+            for ticker, (cache_key, record, files) in fresh_results.items():
+                try:
+                    urls = {name: uploaded_files[name] for name in files if name in uploaded_files}
+                    result_cache.put(cache_key, record, files, urls=urls)
+                except Exception as e:
+                    print(f"Warning: Failed to store {ticker} in the result cache: {e}")
+                    continue
+                cached_results[ticker] = record
+
+            for ticker, entry in cached_results.items():
+                try:
+                    result_cache.write_latest(latest_name(ticker, config['days'], config['simulations']), {
+                        'key': entry['key'],
+                        'created_at': datetime.now().isoformat(),
+                        'confidence_levels': config['confidence_levels']
+                    })
+                except Exception as e:
+                    print(f"Warning: Failed to update the latest result of {ticker}: {e}")
+
+        # Checkpoints are only needed until the partials are safely stored
+        if checkpoint_store is not None and gcs_upload_success:
+            for ticker in results:
+                checkpoint_store.delete(checkpoint_key(identities[ticker]))
 
         print(f"\nSimulation completed successfully!")
         if args.gcs_bucket:
@@ -188,11 +456,18 @@ def main():
                 print(f"Warning: GCS upload had errors. Check logs above.")
         print(f"Local results available in: {args.output_dir}")
 
+        if args.timings:
+            report_timings(timer.report(), None if args.timings == '-' else args.timings)
+
         # Exit with error code if GCS upload failed
         if args.gcs_bucket and not gcs_upload_success:
             print("\nExiting with error code due to GCS upload failures.")
             sys.exit(1)
 
+        if missing_chunks:
+            print(f"\nExiting with error code: no partial summary for {', '.join(missing_chunks)}.")
+            sys.exit(1)
+
     except Exception as e:
         print(f"Error during simulation: {e}")
         sys.exit(1)
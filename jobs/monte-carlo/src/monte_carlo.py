@@ -163,3 +163,22 @@ class MonteCarloSimulator:
             'simulations': simulations,
             'days': days
         }
+
+    @staticmethod
+    def summarize_results(ticker: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a small JSON-serialisable summary of simulation results
+
+        The summary carries everything needed to report on a run (statistics,
+        VaR, fitted parameters) without the full path matrix, so downstream
+        tools can combine many runs cheaply.
+        """
+        return {
+            'ticker': ticker,
+            'days': int(results['days']),
+            'simulations': int(results['simulations']),
+            'initial_price': float(results['initial_price']),
+            'parameters': {key: float(value) for key, value in results['parameters'].items()},
+            'statistics': {key: float(value) for key, value in results['statistics'].items()},
+            'var': {str(level): float(value) for level, value in results['var'].items()}
+        }
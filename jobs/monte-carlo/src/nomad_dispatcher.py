@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+
+"""
+Dispatch monte-carlo-batch jobs through the Nomad HTTP API
+
+dispatch-batch-jobs.sh shells out to `nomad job dispatch` once per ticker
+and sleeps a second between calls, so a large universe takes minutes before
+any simulation starts. This dispatcher calls the dispatch endpoint directly
+from a bounded pool of threads sharing one keep-alive session, paced to a
+maximum request rate rather than a fixed sleep.
+
+Tickers can be packed several to a dispatch, so one container start serves
+many of them:
+
+- meta: TICKER carries a comma-separated list (main.py splits it)
+- payload: TICKER names the first ticker and the full list travels as the
+  dispatch payload, which the job writes to local/tickers.txt
+
+With --result-cache, tickers whose latest result (same days and simulations)
+is younger than --max-result-age are not dispatched at all; --force-recompute
+dispatches them anyway and tells the jobs to bypass the cache.
+
+A single large run can instead be split into --chunks path-chunk jobs per
+ticker (see distributed.py for the reduce step). The dispatcher fits each
+ticker's initial price, drift and volatility once from --cache-dir (or the
+API) and sends them to every chunk, so the chunks make no API calls and
+always agree on the parameters.
+
+Every dispatch carries an idempotency token, so retries after a timeout or a
+5xx response cannot start the same shard twice.
+"""
+
+import argparse
+import base64
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+DEFAULT_JOB_NAME = 'monte-carlo-batch'
+
+# Nomad rejects dispatch payloads larger than 16 KiB
+MAX_PAYLOAD_BYTES = 16 * 1024
+
+# Responses worth retrying: throttling and transient server errors
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+PACK_MODES = ('meta', 'payload')
+
+
+class NomadError(Exception):
+    """Error response from the Nomad HTTP API"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class NomadClient:
+    """Minimal Nomad HTTP API client over one pooled keep-alive session"""
+
+    def __init__(self, address: Optional[str] = None, token: Optional[str] = None,
+                 namespace: Optional[str] = None, region: Optional[str] = None,
+                 timeout: float = 10.0, pool_size: int = 16):
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests library is required for the Nomad dispatcher")
+
+        address = address or os.getenv('NOMAD_ADDR', 'http://127.0.0.1:4646')
+        if not address.startswith(('http://', 'https://')):
+            address = f"http://{address}"
+
+        self.address = address.rstrip('/')
+        self.timeout = timeout
+        self.params = {}
+        namespace = namespace or os.getenv('NOMAD_NAMESPACE')
+        region = region or os.getenv('NOMAD_REGION')
+        if namespace:
+            self.params['namespace'] = namespace
+        if region:
+            self.params['region'] = region
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        token = token or os.getenv('NOMAD_TOKEN')
+        if token:
+            self.session.headers['X-Nomad-Token'] = token
+
+    def close(self):
+        self.session.close()
+
+    def _send(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+              **kwargs) -> 'requests.Response':
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = self.session.request(method, f"{self.address}{path}",
+                                            params=dict(self.params, **(params or {})), **kwargs)
+        except requests.RequestException as e:
+            raise NomadError(f"{method} {path} failed: {e}")
+
+        if response.status_code >= 400:
+            raise NomadError(f"{method} {path} returned {response.status_code}: {response.text.strip()}",
+                             response.status_code)
+        return response
+
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        response = self._send(method, path, params, **kwargs)
+        return response.json() if response.content else None
+
+    def read_job(self, job_id: str) -> Dict[str, Any]:
+        return self._request('GET', f"/v1/job/{job_id}")
+
+    def dispatch(self, job_name: str, meta: Dict[str, str], payload: Optional[bytes] = None,
+                 idempotency_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dispatch a parameterized job
+
+        Returns:
+        dict: Nomad's response (DispatchedJobID, EvalID, ...)
+        """
+        body: Dict[str, Any] = {'Meta': meta}
+        if payload is not None:
+            body['Payload'] = base64.b64encode(payload).decode('ascii')
+        if idempotency_token:
+            body['IdempotencyToken'] = idempotency_token
+        return self._request('POST', f"/v1/job/{job_name}/dispatch", json=body)
+
+    def list_jobs(self, prefix: str = "") -> List[Dict[str, Any]]:
+        """Job stubs whose ID starts with prefix (e.g. 'monte-carlo-batch/dispatch-')"""
+        return self._request('GET', "/v1/jobs", params={'prefix': prefix} if prefix else None)
+
+    def list_jobs_indexed(self, prefix: str = "") -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Job stubs under prefix together with the Raft index they reflect
+
+        Returns:
+        tuple: (job stubs, X-Nomad-Index), the index to resume events from
+        """
+        response = self._send('GET', "/v1/jobs", params={'prefix': prefix} if prefix else None)
+        return response.json(), int(response.headers.get('X-Nomad-Index', 0))
+
+    def stop_job(self, job_id: str, purge: bool = False) -> Dict[str, Any]:
+        return self._request('DELETE', f"/v1/job/{job_id}", params={'purge': 'true'} if purge else None)
+
+    def stream_events(self, topics: List[str], index: int = 0,
+                      read_timeout: float = 60.0) -> Iterator[Dict[str, Any]]:
+        """
+        Follow the event stream from index
+
+        Yields one frame ({'Index': ..., 'Events': [...]}) per line of the
+        newline-delimited JSON stream; heartbeats are yielded as frames with
+        no events, so callers can check deadlines while the stream is quiet.
+        Returns when the server closes the stream.
+
+        Parameters:
+        topics: Topic filters such as 'Job:*' or 'Allocation:*'
+        index: Raft index to start streaming from
+        read_timeout: Seconds without any line (Nomad sends heartbeats every 10s)
+        """
+        params = {'topic': topics, 'index': index}
+        response = self._send('GET', "/v1/event/stream", params=params, stream=True,
+                              timeout=(self.timeout, read_timeout))
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                frame = json.loads(line)
+                frame.setdefault('Events', [])
+                yield frame
+        except requests.RequestException as e:
+            raise NomadError(f"Event stream interrupted: {e}")
+        finally:
+            response.close()
+
+
+class RatePacer:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def shard_tickers(tickers: List[str], per_dispatch: int) -> List[List[str]]:
+    """Split tickers into consecutive groups of at most per_dispatch"""
+    if per_dispatch < 1:
+        raise ValueError(f"Tickers per dispatch must be at least 1: {per_dispatch}")
+    return [tickers[i:i + per_dispatch] for i in range(0, len(tickers), per_dispatch)]
+
+
+class Dispatcher:
+    """Dispatches ticker shards concurrently at a bounded rate"""
+
+    def __init__(self, client: NomadClient, job_name: str = DEFAULT_JOB_NAME,
+                 rate: float = 20.0, concurrency: int = 8, max_retries: int = 3,
+                 backoff: float = 0.5):
+        """
+        Parameters:
+        client: Nomad API client
+        job_name: Parameterized job to dispatch
+        rate: Maximum dispatch requests per second (0 for unlimited)
+        concurrency: Maximum dispatch requests in flight
+        max_retries: Retries per shard for throttling, 5xx and connection errors
+        backoff: First retry delay in seconds, doubled on each retry
+        """
+        self.client = client
+        self.job_name = job_name
+        self.pacer = RatePacer(rate)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def build_request(self, shard: List[str], pack: str = 'meta',
+                      meta: Optional[Dict[str, str]] = None) -> tuple:
+        """
+        Meta and payload for one shard
+
+        Returns:
+        tuple: (meta dict, payload bytes or None)
+        """
+        if pack not in PACK_MODES:
+            raise ValueError(f"Unsupported pack mode: {pack}. Expected meta or payload")
+
+        request_meta = dict(meta or {})
+        if pack == 'meta' or len(shard) == 1:
+            request_meta['TICKER'] = ','.join(shard)
+            return request_meta, None
+
+        payload = '\n'.join(shard).encode('utf-8') + b'\n'
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"Payload for {len(shard)} tickers exceeds {MAX_PAYLOAD_BYTES} bytes")
+        request_meta['TICKER'] = shard[0]
+        return request_meta, payload
+
+    def _dispatch_shard(self, shard: List[str], pack: str, meta: Dict[str, str]) -> Dict[str, Any]:
+        result = {'tickers': shard, 'job_id': None, 'eval_id': None, 'attempts': 0, 'error': None}
+        try:
+            request_meta, payload = self.build_request(shard, pack, meta)
+        except ValueError as e:
+            result['error'] = str(e)
+            return result
+
+        # One token per shard: a retry of a dispatch Nomad already accepted
+        # returns the existing job instead of starting a second one
+        token = uuid.uuid4().hex
+
+        for attempt in range(self.max_retries + 1):
+            self.pacer.wait()
+            result['attempts'] = attempt + 1
+            try:
+                response = self.client.dispatch(self.job_name, request_meta, payload, idempotency_token=token)
+                result['job_id'] = response.get('DispatchedJobID')
+                result['eval_id'] = response.get('EvalID')
+                result['error'] = None
+                return result
+            except NomadError as e:
+                result['error'] = str(e)
+                if e.status is not None and e.status not in RETRYABLE_STATUS:
+                    return result
+
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+
+        return result
+
+    def _dispatch_tasks(self, tasks: List[tuple], pack: str) -> List[Dict[str, Any]]:
+        """Dispatch (shard, meta) pairs concurrently, results in task order"""
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(tasks) or 1)) as executor:
+            futures = [executor.submit(self._dispatch_shard, shard, pack, meta) for shard, meta in tasks]
+            results = []
+            for future, (_, meta) in zip(futures, tasks):
+                result = future.result()
+                label = ','.join(result['tickers'])
+                if 'CHUNK_INDEX' in meta:
+                    result['chunk_index'] = int(meta['CHUNK_INDEX'])
+                    label += f" chunk {meta['CHUNK_INDEX']}/{meta['CHUNK_COUNT']}"
+                if result['error'] is None:
+                    print(f"  Dispatched {label} -> {result['job_id']}")
+                else:
+                    print(f"  Error: Failed to dispatch {label}: {result['error']}")
+                results.append(result)
+
+        return results
+
+    def dispatch_all(self, tickers: List[str], per_dispatch: int = 1, pack: str = 'meta',
+                     meta: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Dispatch every ticker, per_dispatch tickers to a job
+
+        Returns:
+        list: one result per shard, in ticker order, with tickers, job_id,
+              eval_id, attempts and error (None on success)
+        """
+        shards = shard_tickers(tickers, per_dispatch)
+        return self._dispatch_tasks([(shard, meta or {}) for shard in shards], pack)
+
+    def dispatch_chunks(self, tickers: List[str], chunk_count: int, seed: int,
+                        meta: Optional[Dict[str, str]] = None,
+                        fits: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Split each ticker's run into chunk_count path-chunk jobs
+
+        Every chunk gets the same SIMULATIONS (the run's total), SEED,
+        CHUNK_COUNT and, from fits (see distributed.fit_parameters), the same
+        PARAMETERS, and its own CHUNK_INDEX; distributed.py reduces the
+        partial summaries they upload.
+
+        Returns:
+        list: one result per chunk, as dispatch_all, plus chunk_index
+        """
+        if chunk_count < 1:
+            raise ValueError(f"Chunk count must be at least 1: {chunk_count}")
+
+        tasks = []
+        for ticker in tickers:
+            for index in range(chunk_count):
+                chunk_meta = dict(meta or {}, CHUNK_INDEX=str(index), CHUNK_COUNT=str(chunk_count),
+                                  SEED=str(seed))
+                if fits and ticker in fits:
+                    chunk_meta['PARAMETERS'] = json.dumps(fits[ticker], separators=(',', ':'))
+                tasks.append(([ticker], chunk_meta))
+        return self._dispatch_tasks(tasks, 'meta')
+
+
+def fit_chunked_runs(tickers: List[str], data_fetcher) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Fit each ticker's parameters once, for all of its chunks
+
+    Returns:
+    tuple: (ticker -> fit_parameters result, failure records for tickers
+            that could not be fitted and so are not dispatched)
+    """
+    from distributed import fit_parameters
+
+    fits, failed = {}, []
+    for ticker, (data, _) in data_fetcher.fetch_many(tickers, period="2y", columns=['Close']).items():
+        try:
+            fits[ticker] = fit_parameters(data)
+        except ValueError as e:
+            print(f"  Error: Cannot fit {ticker}: {e}")
+            failed.append({'tickers': [ticker], 'job_id': None, 'eval_id': None, 'attempts': 0,
+                           'error': f"Failed to fit parameters: {e}"})
+    return fits, failed
+
+
+def parse_meta(items: List[str]) -> Dict[str, str]:
+    """Parse KEY=VALUE items"""
+    meta = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep or not key:
+            raise ValueError(f"Expected KEY=VALUE: {item}")
+        meta[key] = value
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dispatch Monte Carlo batch jobs through the Nomad API')
+
+    parser.add_argument('tickers', nargs='*',
+                       help='Ticker symbols to dispatch')
+    parser.add_argument('--tickers-file', '-f',
+                       help='File with one ticker per line (# comments allowed)')
+    parser.add_argument('--job-name', '-j', default=DEFAULT_JOB_NAME,
+                       help=f'Parameterized job to dispatch (default: {DEFAULT_JOB_NAME})')
+    parser.add_argument('--days', '-d', type=int, default=252,
+                       help='Number of trading days to simulate (default: 252)')
+    parser.add_argument('--simulations', '-s', type=int, default=10000,
+                       help='Number of Monte Carlo paths (default: 10000)')
+    parser.add_argument('--per-dispatch', '-n', type=int, default=1,
+                       help='Tickers packed into each dispatch (default: 1)')
+    parser.add_argument('--pack', choices=PACK_MODES, default='meta',
+                       help='How packed tickers are passed: comma-separated TICKER meta or payload (default: meta)')
+    parser.add_argument('--chunks', type=int, default=1,
+                       help='Split each ticker into this many path-chunk jobs (default: 1, no split)')
+    parser.add_argument('--seed', type=int,
+                       help='Seed of a chunked run (default: random, recorded in --output)')
+    parser.add_argument('--config', default='config/simulation.yaml',
+                       help='Configuration file for fetching the history chunked runs are fitted on')
+    parser.add_argument('--cache-dir', default='./data',
+                       help='Data cache for fitting chunked runs (default: ./data)')
+    parser.add_argument('--remote-cache',
+                       help='Shared cache tier behind --cache-dir (gs://bucket/prefix or a directory)')
+    parser.add_argument('--result-cache',
+                       help='Skip tickers with a recent result in this result cache (directory or gs://bucket/prefix)')
+    parser.add_argument('--max-result-age', type=float, default=24.0,
+                       help='Hours a cached result counts as recent (default: 24)')
+    parser.add_argument('--force-recompute', action='store_true',
+                       help='Dispatch every ticker and have the jobs ignore cached results')
+    parser.add_argument('--meta', action='append', default=[], metavar='KEY=VALUE',
+                       help='Extra dispatch meta (repeatable)')
+    parser.add_argument('--rate', type=float, default=20.0,
+                       help='Maximum dispatch requests per second (default: 20)')
+    parser.add_argument('--concurrency', '-c', type=int, default=8,
+                       help='Maximum dispatch requests in flight (default: 8)')
+    parser.add_argument('--retries', type=int, default=3,
+                       help='Retries per dispatch for throttling and server errors (default: 3)')
+    parser.add_argument('--nomad-addr',
+                       help='Nomad API address (default: $NOMAD_ADDR or http://127.0.0.1:4646)')
+    parser.add_argument('--output', '-o',
+                       help='Write dispatched job IDs and failures as JSON to this path')
+
+    args = parser.parse_args()
+
+    tickers = [ticker.upper() for ticker in args.tickers]
+    if args.tickers_file:
+        with open(args.tickers_file, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    tickers.append(line.split()[0].upper())
+    tickers = list(dict.fromkeys(tickers))
+
+    if not tickers:
+        print("Error: No tickers specified. Pass tickers or --tickers-file")
+        sys.exit(1)
+
+    try:
+        meta = parse_meta(args.meta)
+        meta.update({'DAYS': str(args.days), 'SIMULATIONS': str(args.simulations)})
+
+        client = NomadClient(address=args.nomad_addr, pool_size=max(args.concurrency, 1))
+        client.read_job(args.job_name)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except NomadError as e:
+        print(f"Error: Job '{args.job_name}' not available: {e}")
+        print("  nomad job run monte-carlo-batch.nomad")
+        sys.exit(1)
+
+    # Tickers with a recent identical result need no job. Only the latest
+    # pointer is read: the full key depends on the price series, which the
+    # jobs check again themselves
+    cached = []
+    if args.result_cache and args.chunks <= 1 and not args.force_recompute:
+        from result_cache import create_result_cache, is_recent, latest_name
+        try:
+            result_cache = create_result_cache(args.result_cache)
+            for ticker in tickers:
+                pointer = result_cache.read_latest(latest_name(ticker, args.days, args.simulations))
+                if is_recent(pointer, args.max_result_age):
+                    cached.append({'ticker': ticker, 'result_key': pointer['key'],
+                                   'created_at': pointer['created_at']})
+        except Exception as e:
+            print(f"Warning: Result cache unavailable, dispatching every ticker: {e}")
+            cached = []
+        if cached:
+            print(f"Skipping {len(cached)} tickers with results from the last {args.max_result_age:g}h")
+            skipped = {entry['ticker'] for entry in cached}
+            tickers = [ticker for ticker in tickers if ticker not in skipped]
+    if args.force_recompute:
+        meta['FORCE_RECOMPUTE'] = 'true'
+
+    if args.chunks > 1 and args.per_dispatch > 1:
+        print("Error: --chunks splits single tickers and cannot be combined with --per-dispatch")
+        sys.exit(1)
+    seed = args.seed if args.seed is not None else secrets.randbits(63)
+
+    if args.chunks > 1:
+        jobs = len(tickers) * args.chunks
+    else:
+        jobs = -(-len(tickers) // max(args.per_dispatch, 1))
+    print(f"Dispatching {len(tickers)} tickers as {jobs} jobs of {args.job_name} "
+          f"(rate {args.rate:g}/s, concurrency {args.concurrency})")
+
+    # Chunked runs are fitted here once, rather than by each chunk
+    fits, unfitted = {}, []
+    if args.chunks > 1 and tickers:
+        from config import load_config
+        from data_fetcher import DataFetcher
+
+        print(f"Fitting parameters for {len(tickers)} chunked runs")
+        config = load_config(args.config) or {}
+        if args.remote_cache:
+            config.setdefault('data', {})['remote_cache'] = args.remote_cache
+        try:
+            fits, unfitted = fit_chunked_runs(tickers, DataFetcher(cache_dir=args.cache_dir, config=config))
+        except Exception as e:
+            print(f"Error: Failed to fit parameters: {e}")
+            sys.exit(1)
+        tickers = [ticker for ticker in tickers if ticker in fits]
+
+    started = time.monotonic()
+    dispatcher = Dispatcher(client, args.job_name, rate=args.rate, concurrency=args.concurrency,
+                            max_retries=args.retries)
+    try:
+        if not tickers:
+            results = []
+        elif args.chunks > 1:
+            print(f"  {args.chunks} chunks per ticker, seed {seed}")
+            results = dispatcher.dispatch_chunks(tickers, args.chunks, seed, meta=meta, fits=fits)
+        else:
+            results = dispatcher.dispatch_all(tickers, per_dispatch=args.per_dispatch, pack=args.pack,
+                                              meta=meta)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    elapsed = time.monotonic() - started
+
+    dispatched = [result for result in results if result['error'] is None]
+    failed = unfitted + [result for result in results if result['error'] is not None]
+    print(f"\nDispatched {len(dispatched)} of {len(results)} jobs in {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'job_name': args.job_name,
+                'chunks': args.chunks,
+                'seed': seed if args.chunks > 1 else None,
+                'cached': cached,
+                'dispatched': dispatched,
+                'failed': failed
+            }, f, indent=2)
+        print(f"Dispatch record saved to: {args.output}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+Prewarm the data cache for a ticker universe within the daily API quota
+
+Alpha Vantage's free tier allows 25 calls a day, far fewer than a universe
+of tickers needs if every dispatch starts cold. This tool ranks tickers by
+how stale their cache entry is, weighted by priority, and spends whatever
+is left of today's quota on the most valuable refreshes. Tickers it cannot
+afford are carried over in a state file so the next run (typically the next
+day) picks up where this one stopped.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from data_fetcher import DataFetcher
+
+
+# Age assigned to tickers with no cache entry at all, so they rank ahead of
+# any stale entry of the same priority
+MISSING_AGE_DAYS = 365.0
+
+# Tickers whose refresh failed this many runs in a row are skipped until the
+# state file is reset, so a delisted symbol cannot burn quota every day
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+def parse_ticker_list(lines: List[str]) -> Dict[str, float]:
+    """
+    Parse 'TICKER [priority]' entries; blank lines and # comments are ignored
+
+    Returns:
+    dict: ticker -> priority (default 1.0), in input order
+    """
+    tickers = {}
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+
+        parts = line.replace(',', ' ').split()
+        priority = float(parts[1]) if len(parts) > 1 else 1.0
+        if priority <= 0:
+            raise ValueError(f"Priority must be positive: {line}")
+        tickers[parts[0].upper()] = priority
+
+    return tickers
+
+
+class CachePrewarmer:
+    """Ranks a ticker universe by refresh value and refreshes within the quota"""
+
+    def __init__(self, fetcher: DataFetcher, state_path: str, period: str = "2y",
+                 max_calls: Optional[int] = None):
+        if fetcher.rate_limiter is None:
+            raise ValueError("Prewarming needs an Alpha Vantage API key")
+
+        self.fetcher = fetcher
+        self.state_path = Path(state_path)
+        self.period = period
+        self.max_calls = max_calls
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_path.exists():
+            return {'pending': [], 'failures': {}}
+
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"  Warning: ignoring unreadable prewarm state {self.state_path}: {e}")
+            return {'pending': [], 'failures': {}}
+
+        if state.get('period') != self.period:
+            # Carry-over from a different period does not apply to this cache
+            return {'pending': [], 'failures': {}}
+
+        state.setdefault('pending', [])
+        state.setdefault('failures', {})
+        return state
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state['period'] = self.period
+        self.state['updated_at'] = datetime.now().isoformat()
+
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def rank(self, tickers: Dict[str, float]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split tickers into refresh candidates (most valuable first) and skips
+
+        The value of a refresh is the entry's age in days times the ticker's
+        priority. Entries that are still fresh are skipped; tickers carried
+        over from an earlier run win ties.
+
+        Returns:
+        tuple: (candidates, skipped)
+        """
+        carried_over = set(self.state['pending'])
+        candidates = []
+        skipped = []
+
+        for ticker, priority in tickers.items():
+            status = self.fetcher.cache_status(ticker, self.period)
+            entry = {
+                'ticker': ticker,
+                'priority': priority,
+                'state': status['state'],
+                'age_days': status['age_days'],
+                'carried_over': ticker in carried_over
+            }
+
+            if status['state'] == 'fresh':
+                skipped.append(dict(entry, reason='fresh'))
+                continue
+
+            if self.state['failures'].get(ticker, 0) >= MAX_CONSECUTIVE_FAILURES:
+                skipped.append(dict(entry, reason='repeated_failures'))
+                continue
+
+            age_days = MISSING_AGE_DAYS if status['age_days'] is None else status['age_days']
+            entry['score'] = age_days * priority
+            candidates.append(entry)
+
+        candidates.sort(key=lambda entry: (entry['score'], entry['carried_over']), reverse=True)
+        return candidates, skipped
+
+    def run(self, tickers: Dict[str, float]) -> Dict[str, Any]:
+        """Refresh the highest-value tickers until the quota runs out"""
+        limiter = self.fetcher.rate_limiter
+        candidates, skipped = self.rank(tickers)
+        refreshed = []
+        failed = []
+        calls_spent = 0
+
+        print(f"Prewarming {len(candidates)} of {len(tickers)} tickers "
+              f"({limiter.remaining_today()} API calls left today)")
+
+        for position, entry in enumerate(candidates):
+            budget = limiter.remaining_today()
+            if self.max_calls is not None:
+                budget = min(budget, self.max_calls - calls_spent)
+
+            if budget <= 0:
+                skipped.extend(dict(rest, reason='quota_exhausted') for rest in candidates[position:])
+                break
+
+            ticker = entry['ticker']
+            calls_before = limiter.daily_calls
+            print(f"\nRefreshing {ticker} ({entry['state']}, score {entry['score']:.1f})")
+
+            try:
+                data, _ = self.fetcher.refresh_ticker_data(ticker, self.period)
+                error = None if not data.empty else 'no data returned'
+            except Exception as e:
+                error = str(e)
+
+            # The RateLimiter paces the calls; count what this refresh used
+            # (0 when the remote cache tier already had a fresh copy)
+            calls = max(0, limiter.daily_calls - calls_before)
+            calls_spent += calls
+            entry['calls'] = calls
+
+            if error is None and self.fetcher.cache_status(ticker, self.period)['state'] == 'fresh':
+                self.state['failures'].pop(ticker, None)
+                refreshed.append(entry)
+            else:
+                self.state['failures'][ticker] = self.state['failures'].get(ticker, 0) + 1
+                failed.append(dict(entry, error=error or 'refresh did not update the cache'))
+
+        # Whatever could not be afforded is carried over to the next run
+        self.state['pending'] = [entry['ticker'] for entry in skipped
+                                 if entry['reason'] == 'quota_exhausted']
+        self._save_state()
+
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'period': self.period,
+            'calls_spent': calls_spent,
+            'calls_remaining': limiter.remaining_today(),
+            'refreshed': refreshed,
+            'failed': failed,
+            'skipped': skipped,
+            'pending': self.state['pending']
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prewarm the ticker data cache within the daily API quota')
+
+    parser.add_argument('--tickers', '-t', nargs='+', default=[],
+                       help='Ticker symbols, optionally as TICKER:PRIORITY (e.g., AAPL:3 MSFT)')
+    parser.add_argument('--tickers-file', '-f',
+                       help='File with one "TICKER [priority]" entry per line')
+    parser.add_argument('--config', '-c', default='config/simulation.yaml',
+                       help='Path to configuration file')
+    parser.add_argument('--cache-dir', default='./data',
+                       help='Directory for data cache (default: ./data)')
+    parser.add_argument('--remote-cache',
+                       help='Shared cache tier to prewarm as well (gs://bucket/prefix or a directory)')
+    parser.add_argument('--period', default='2y',
+                       help='Cached period to prewarm (default: 2y)')
+    parser.add_argument('--max-calls', type=int,
+                       help='Spend at most this many API calls (default: all remaining today)')
+    parser.add_argument('--state-file',
+                       help='Resume state (default: <cache-dir>/.prewarm/state.json)')
+    parser.add_argument('--report', '-o',
+                       help='Report path (default: <cache-dir>/.prewarm/report.json)')
+
+    args = parser.parse_args()
+
+    lines = [ticker.replace(':', ' ') for ticker in args.tickers]
+    if args.tickers_file:
+        with open(args.tickers_file, 'r') as f:
+            lines.extend(f.read().splitlines())
+
+    try:
+        tickers = parse_ticker_list(lines)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not tickers:
+        print("Error: No tickers specified. Use --tickers or --tickers-file")
+        sys.exit(1)
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, 'r') as f:
+            config = yaml.safe_load(f) or {}
+
+    if args.remote_cache:
+        config.setdefault('data', {})['remote_cache'] = args.remote_cache
+
+    prewarm_dir = Path(args.cache_dir) / '.prewarm'
+    state_path = args.state_file or prewarm_dir / 'state.json'
+    report_path = Path(args.report or prewarm_dir / 'report.json')
+
+    try:
+        fetcher = DataFetcher(cache_dir=args.cache_dir, config=config)
+        prewarmer = CachePrewarmer(fetcher, state_path, period=args.period, max_calls=args.max_calls)
+        report = prewarmer.run(tickers)
+    except Exception as e:
+        print(f"Error during prewarm: {e}")
+        sys.exit(1)
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nRefreshed {len(report['refreshed'])} tickers using {report['calls_spent']} API calls")
+    for entry in report['failed']:
+        print(f"  Failed: {entry['ticker']} ({entry['error']})")
+    if report['pending']:
+        print(f"  Carried over to next run: {', '.join(report['pending'])}")
+    print(f"\nReport saved to: {report_path}")
+
+    if report['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Shared API quota stores for RateLimiter
+
+Each Nomad dispatch runs its own DataFetcher, so per-process counters let
+concurrent allocations sharing one ALPHA_VANTAGE_API_KEY overrun the
+provider's per-minute and daily limits together. A QuotaStore holds the call
+history in one place every worker can see and reserves slots atomically:
+
+- InMemoryQuotaStore: process-local (the default)
+- SQLiteQuotaStore: SQLite database guarded by a file lock, for workers
+  sharing a host volume
+- KVQuotaStore: compare-and-set over a KV store such as Consul, with
+  InMemoryKV as a local stand-in
+"""
+
+import base64
+import fcntl
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+WINDOW_SECONDS = 60
+
+
+def _seconds_until_midnight(now: float) -> float:
+    today = datetime.fromtimestamp(now).date()
+    midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    return midnight.timestamp() - now
+
+
+def _evaluate(call_times: List[float], daily_calls: int, now: float,
+              calls_per_minute: int, daily_limit: int) -> Tuple[float, bool]:
+    """
+    Decide whether a call may proceed given the calls in the current window
+
+    Returns:
+    tuple: (wait, daily_exhausted) - wait is 0.0 if a call may be made now
+    """
+    if daily_calls >= daily_limit:
+        return _seconds_until_midnight(now), True
+
+    if len(call_times) >= calls_per_minute:
+        return min(call_times) + WINDOW_SECONDS - now, False
+
+    return 0.0, False
+
+
+class QuotaStore:
+    """Base class for stores that reserve API call slots against a shared budget"""
+
+    def reserve(self, now: float, calls_per_minute: int, daily_limit: int) -> Tuple[float, bool]:
+        """
+        Atomically record a call at time now if the limits allow it
+
+        Returns:
+        tuple: (wait, daily_exhausted) - wait is 0.0 if the call was recorded,
+               otherwise the seconds until the next slot frees up
+        """
+        raise NotImplementedError
+
+    def daily_calls(self, now: float) -> int:
+        """Number of calls recorded so far on now's calendar day"""
+        raise NotImplementedError
+
+
+class InMemoryQuotaStore(QuotaStore):
+    """Process-local quota store"""
+
+    def __init__(self):
+        self.call_times = deque()
+        self.day = None
+        self.calls_today = 0
+        self.lock = threading.Lock()
+
+    def _roll(self, now: float):
+        today = datetime.fromtimestamp(now).date()
+        if today != self.day:
+            self.day = today
+            self.calls_today = 0
+
+        # Drop calls that have left the one-minute window
+        while self.call_times and self.call_times[0] <= now - WINDOW_SECONDS:
+            self.call_times.popleft()
+
+    def reserve(self, now: float, calls_per_minute: int, daily_limit: int) -> Tuple[float, bool]:
+        with self.lock:
+            self._roll(now)
+            wait, daily_exhausted = _evaluate(self.call_times, self.calls_today, now,
+                                              calls_per_minute, daily_limit)
+            if wait <= 0:
+                self.call_times.append(now)
+                self.calls_today += 1
+            return wait, daily_exhausted
+
+    def daily_calls(self, now: float) -> int:
+        with self.lock:
+            self._roll(now)
+            return self.calls_today
+
+
+class SQLiteQuotaStore(QuotaStore):
+    """
+    Quota store in a SQLite database shared between processes
+
+    Every reservation takes an exclusive flock on a sidecar lock file before
+    opening a write transaction: SQLite's own locking is unreliable on some
+    shared volumes, and the flock makes the read-decide-write step atomic
+    across processes on the same host.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.thread_lock = threading.Lock()
+
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS calls (ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS calls_ts ON calls (ts)")
+            conn.execute("CREATE TABLE IF NOT EXISTS daily (day TEXT PRIMARY KEY, calls INTEGER NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        with self.thread_lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    yield conn
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                finally:
+                    conn.close()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _day(now: float) -> str:
+        return datetime.fromtimestamp(now).date().isoformat()
+
+    def reserve(self, now: float, calls_per_minute: int, daily_limit: int) -> Tuple[float, bool]:
+        day = self._day(now)
+
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM calls WHERE ts <= ?", (now - WINDOW_SECONDS,))
+            call_times = [row[0] for row in conn.execute("SELECT ts FROM calls")]
+            row = conn.execute("SELECT calls FROM daily WHERE day = ?", (day,)).fetchone()
+            calls_today = row[0] if row else 0
+
+            wait, daily_exhausted = _evaluate(call_times, calls_today, now,
+                                              calls_per_minute, daily_limit)
+            if wait <= 0:
+                conn.execute("INSERT INTO calls (ts) VALUES (?)", (now,))
+                conn.execute("INSERT INTO daily (day, calls) VALUES (?, 1) "
+                             "ON CONFLICT(day) DO UPDATE SET calls = calls + 1", (day,))
+                conn.execute("DELETE FROM daily WHERE day < ?", (day,))
+
+            return wait, daily_exhausted
+
+    def daily_calls(self, now: float) -> int:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT calls FROM daily WHERE day = ?", (self._day(now),)).fetchone()
+            return row[0] if row else 0
+
+
+class InMemoryKV:
+    """In-process KV store with Consul-style modify indexes, for tests and local runs"""
+
+    def __init__(self):
+        self.data: Dict[str, Tuple[str, int]] = {}
+        self.index = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[Optional[str], int]:
+        """Return (value, modify_index); (None, 0) if the key does not exist"""
+        with self.lock:
+            return self.data.get(key, (None, 0))
+
+    def cas(self, key: str, value: str, index: int) -> bool:
+        """Set key only if its modify index still equals index (0 = must not exist)"""
+        with self.lock:
+            _, current_index = self.data.get(key, (None, 0))
+            if current_index != index:
+                return False
+            self.index += 1
+            self.data[key] = (value, self.index)
+            return True
+
+
+class ConsulKV:
+    """Minimal Consul KV client supporting get and check-and-set"""
+
+    def __init__(self, address: Optional[str] = None, token: Optional[str] = None,
+                 timeout: float = 5.0):
+        # Imported here so the default backends do not pay for requests
+        try:
+            import requests
+        except ImportError:
+            raise ImportError("requests library is required for the Consul quota backend")
+
+        address = address or os.getenv('CONSUL_HTTP_ADDR', 'http://127.0.0.1:8500')
+        if not address.startswith(('http://', 'https://')):
+            address = f"http://{address}"
+
+        self.address = address.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        # CONSUL_TOKEN is set by Nomad for tasks with a consul block
+        token = token or os.getenv('CONSUL_HTTP_TOKEN') or os.getenv('CONSUL_TOKEN')
+        if token:
+            self.session.headers['X-Consul-Token'] = token
+
+    def get(self, key: str) -> Tuple[Optional[str], int]:
+        response = self.session.get(f"{self.address}/v1/kv/{key}", timeout=self.timeout)
+        if response.status_code == 404:
+            return None, 0
+        response.raise_for_status()
+
+        entry = response.json()[0]
+        value = base64.b64decode(entry['Value']).decode() if entry.get('Value') else None
+        return value, entry['ModifyIndex']
+
+    def cas(self, key: str, value: str, index: int) -> bool:
+        response = self.session.put(f"{self.address}/v1/kv/{key}", params={'cas': index},
+                                    data=value.encode(), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json() is True
+
+
+class KVQuotaStore(QuotaStore):
+    """
+    Quota store kept as one JSON document in a KV store
+
+    Reservations are optimistic: read the document and its modify index,
+    decide, then write back with check-and-set. A lost race simply re-reads
+    and decides again, so no slot is ever granted twice.
+    """
+
+    def __init__(self, kv, key: str = 'monte-carlo/alpha-vantage-quota', max_attempts: int = 50):
+        self.kv = kv
+        self.key = key
+        self.max_attempts = max_attempts
+
+    def _load(self, raw: Optional[str], now: float) -> Dict[str, Any]:
+        day = datetime.fromtimestamp(now).date().isoformat()
+        state = json.loads(raw) if raw else {}
+
+        if state.get('day') != day:
+            state = {'day': day, 'daily_calls': 0, 'calls': state.get('calls', [])}
+
+        state['calls'] = [ts for ts in state['calls'] if ts > now - WINDOW_SECONDS]
+        return state
+
+    def reserve(self, now: float, calls_per_minute: int, daily_limit: int) -> Tuple[float, bool]:
+        for _ in range(self.max_attempts):
+            raw, index = self.kv.get(self.key)
+            state = self._load(raw, now)
+
+            wait, daily_exhausted = _evaluate(state['calls'], state['daily_calls'], now,
+                                              calls_per_minute, daily_limit)
+            if wait > 0:
+                return wait, daily_exhausted
+
+            state['calls'].append(now)
+            state['daily_calls'] += 1
+            if self.kv.cas(self.key, json.dumps(state), index):
+                return 0.0, False
+
+            # Another worker won the race; back off briefly and re-read
+            time.sleep(random.uniform(0, 0.05))
+
+        raise RuntimeError(f"Could not reserve API quota in {self.key} after {self.max_attempts} attempts")
+
+    def daily_calls(self, now: float) -> int:
+        raw, _ = self.kv.get(self.key)
+        return self._load(raw, now)['daily_calls']
+
+
+def create_quota_store(data_config: Dict[str, Any], cache_dir: Path) -> QuotaStore:
+    """
+    Build the quota store selected by the data configuration
+
+    data.quota_backend: 'memory' (default), 'sqlite' or 'consul'
+    data.quota_path: SQLite database path (default: <cache_dir>/.quota/api_quota.db)
+    data.quota_key: KV key for the consul backend
+    data.quota_consul_addr: Consul address (default: CONSUL_HTTP_ADDR)
+    """
+    backend = data_config.get('quota_backend', 'memory')
+
+    if backend == 'memory':
+        return InMemoryQuotaStore()
+
+    if backend == 'sqlite':
+        path = data_config.get('quota_path') or Path(cache_dir) / '.quota' / 'api_quota.db'
+        return SQLiteQuotaStore(str(path))
+
+    if backend == 'consul':
+        kv = ConsulKV(address=data_config.get('quota_consul_addr'))
+        return KVQuotaStore(kv, key=data_config.get('quota_key', 'monte-carlo/alpha-vantage-quota'))
+
+    raise ValueError(f"Unsupported quota backend: {backend}. Expected memory, sqlite or consul")
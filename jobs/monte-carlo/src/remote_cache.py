@@ -0,0 +1,118 @@
+"""
+Remote cache tier for DataFetcher
+
+Each Nomad allocation starts with an empty /app/data, so the local cache
+alone cannot stop one dispatch from re-fetching what another fetched minutes
+earlier. A RemoteCache holds cache files plus their metadata in shared
+storage; DataFetcher reads through it on a local miss and writes back after
+every fresh fetch. Freshness is decided from the metadata alone, so stale
+entries are never downloaded just to be discarded.
+
+- GCSRemoteCache: objects in a bucket, cache metadata as object metadata
+- LocalDirectoryCache: a directory (e.g. a shared volume), used in tests
+"""
+
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from stores import GCSStore, create_store
+
+
+class RemoteCache(ABC):
+    """Base class for shared stores of cache files keyed by name"""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cache metadata stored with key, or None if absent"""
+
+    @abstractmethod
+    def get(self, key: str, local_path: str):
+        """Download the file stored under key to local_path"""
+
+    @abstractmethod
+    def put(self, key: str, local_path: str, meta: Dict[str, Any]):
+        """Store local_path under key together with its cache metadata"""
+
+
+class LocalDirectoryCache(RemoteCache):
+    """Remote tier backed by a directory; metadata lives in a JSON sidecar"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.meta.json"
+
+    def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path = self._meta_path(key)
+        if not meta_path.exists() or not (self.root / key).exists():
+            return None
+
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def get(self, key: str, local_path: str):
+        shutil.copyfile(self.root / key, local_path)
+
+    def put(self, key: str, local_path: str, meta: Dict[str, Any]):
+        # Data first, metadata last: a reader that sees the new metadata
+        # always finds the matching file
+        tmp_path = self.root / f"{key}.tmp"
+        shutil.copyfile(local_path, tmp_path)
+        os.replace(tmp_path, self.root / key)
+
+        tmp_meta = self.root / f"{key}.meta.json.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, self._meta_path(key))
+
+
+class GCSRemoteCache(GCSStore, RemoteCache):
+    """
+    Remote tier in a GCS bucket, using an existing GCSUploader client
+
+    The cache metadata is stored as custom object metadata, so stat is a
+    single metadata request and never transfers the object body.
+    """
+
+    def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        blob = self.uploader.get_blob(self.bucket_name, self._object_name(key))
+        if blob is None or not blob.metadata or 'cache_meta' not in blob.metadata:
+            return None
+
+        try:
+            return json.loads(blob.metadata['cache_meta'])
+        except json.JSONDecodeError:
+            return None
+
+    def get(self, key: str, local_path: str):
+        self.uploader.download_file(self.bucket_name, self._object_name(key), local_path)
+
+    def put(self, key: str, local_path: str, meta: Dict[str, Any]):
+        # Object metadata values must be strings; cached_at is repeated at
+        # the top level so it shows up in the console and gsutil
+        metadata = {
+            'cached_at': meta.get('cached_at', ''),
+            'cache_meta': json.dumps(meta)
+        }
+        self.uploader.upload_file(local_path, self.bucket_name, self._object_name(key),
+                                  metadata=metadata, compress=False)
+
+
+def create_remote_cache(location: str, uploader=None) -> RemoteCache:
+    """
+    Build the remote cache tier for a location
+
+    Parameters:
+    location: gs://bucket/prefix for GCS, otherwise a directory path
+    uploader: Optional GCSUploader to reuse for gs:// locations
+    """
+    return create_store(location, LocalDirectoryCache, GCSRemoteCache, uploader)
@@ -0,0 +1,256 @@
+"""
+Content-addressed cache of simulation results
+
+A simulation is a pure function of its closing-price series, its parameters
+(days, simulations, confidence levels) and the generator state it starts
+from, so identical dispatches - same ticker, same cached history - produce
+identical results. The result cache keys each run by a SHA-256 over all of
+these and stores the summary plus its artifacts (the path CSV); main.py
+short-circuits to the stored results on a hit instead of recomputing and
+re-uploading them.
+
+Each entry also records the generator state after the run, which main.py
+restores on a hit so later tickers of the same run draw exactly what they
+would have drawn without the cache.
+
+A "latest" pointer per ticker, days and simulations lets the dispatcher skip
+tickers with a recent result without knowing the price series.
+
+- LocalResultCache: a directory; artifacts are copied into the entry
+- GCSResultCache: objects in a bucket; artifacts already uploaded with the
+  run's results are referenced by URL instead of being stored twice
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from stores import GCSStore, create_store
+
+
+# Part of every key; bump when the simulation model changes so old entries
+# stop matching
+RESULT_CACHE_VERSION = 1
+
+RECORD_NAME = 'record.json'
+
+
+def series_fingerprint(prices: pd.Series) -> str:
+    """SHA-256 over the dates and values of a price series"""
+    hashes = pd.util.hash_pandas_object(prices, index=True).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def rng_fingerprint(random_state: np.random.RandomState) -> str:
+    """SHA-256 over a RandomState's full state"""
+    name, keys, pos, has_gauss, cached_gaussian = random_state.get_state()
+    state = f"{name}:{pos}:{has_gauss}:{cached_gaussian!r}".encode('utf-8')
+    return hashlib.sha256(keys.tobytes() + state).hexdigest()
+
+
+def rng_state_to_dict(random_state: np.random.RandomState) -> Dict[str, Any]:
+    name, keys, pos, has_gauss, cached_gaussian = random_state.get_state()
+    return {'name': name, 'keys': keys.tolist(), 'pos': int(pos),
+            'has_gauss': int(has_gauss), 'cached_gaussian': float(cached_gaussian)}
+
+
+def rng_state_from_dict(state: Dict[str, Any]) -> tuple:
+    return (state['name'], np.array(state['keys'], dtype=np.uint32), state['pos'],
+            state['has_gauss'], state['cached_gaussian'])
+
+
+def result_key(prices: pd.Series, days: int, simulations: int, confidence_levels,
+               random_state: np.random.RandomState) -> str:
+    """Content address of one simulation run"""
+    inputs = {
+        'version': RESULT_CACHE_VERSION,
+        'series': series_fingerprint(prices),
+        'days': int(days),
+        'simulations': int(simulations),
+        'confidence_levels': [float(level) for level in confidence_levels],
+        'rng': rng_fingerprint(random_state)
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def latest_name(ticker: str, days: int, simulations: int) -> str:
+    """Name of the pointer to the newest result for a ticker and horizon"""
+    return f"latest/{ticker.upper()}_{int(days)}d_{int(simulations)}.json"
+
+
+def is_recent(pointer: Optional[Dict[str, Any]], max_age_hours: float) -> bool:
+    """True if a latest pointer was written within max_age_hours"""
+    if not pointer or 'created_at' not in pointer:
+        return False
+    try:
+        created_at = datetime.fromisoformat(pointer['created_at'])
+    except ValueError:
+        return False
+    return datetime.now() - created_at <= timedelta(hours=max_age_hours)
+
+
+class ResultCache(ABC):
+    """Base class for stores of simulation results keyed by result_key"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry record for key if it and its artifacts exist"""
+
+    @abstractmethod
+    def put(self, key: str, record: Dict[str, Any], files: Dict[str, str],
+            urls: Optional[Dict[str, str]] = None):
+        """
+        Store an entry
+
+        Parameters:
+        key: result_key of the run
+        record: JSON-serialisable entry (summary, inputs, generator state)
+        files: Artifact name -> local path
+        urls: Artifact name -> GCS URL for artifacts already uploaded
+        """
+
+    @abstractmethod
+    def restore(self, record: Dict[str, Any], name: str, local_path: str):
+        """Copy or download an entry's artifact to local_path"""
+
+    def artifact_url(self, record: Dict[str, Any], name: str) -> Optional[str]:
+        """GCS URL of an artifact, if it is stored in a bucket"""
+        return None
+
+    @abstractmethod
+    def read_latest(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the latest pointer stored under name, or None if absent"""
+
+    @abstractmethod
+    def write_latest(self, name: str, pointer: Dict[str, Any]):
+        """Replace the latest pointer stored under name"""
+
+
+class LocalResultCache(ResultCache):
+    """Entries as directories: <root>/<key>/record.json plus artifact copies"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _write_json(self, path: Path, data: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _read_json(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self._read_json(self.root / key / RECORD_NAME)
+        if record is None:
+            return None
+        if not all((self.root / key / name).exists() for name in record.get('artifacts', {})):
+            return None
+        return record
+
+    def put(self, key: str, record: Dict[str, Any], files: Dict[str, str],
+            urls: Optional[Dict[str, str]] = None):
+        entry_dir = self.root / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        for name, local_path in files.items():
+            shutil.copyfile(local_path, entry_dir / name)
+        # Record last: an entry is only visible once its artifacts are complete
+        self._write_json(entry_dir / RECORD_NAME, dict(record, artifacts={name: name for name in files}))
+
+    def restore(self, record: Dict[str, Any], name: str, local_path: str):
+        shutil.copyfile(self.root / record['key'] / name, local_path)
+
+    def read_latest(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self.root / name)
+
+    def write_latest(self, name: str, pointer: Dict[str, Any]):
+        self._write_json(self.root / name, pointer)
+
+
+class GCSResultCache(GCSStore, ResultCache):
+    """
+    Entries in a GCS bucket, using an existing GCSUploader client
+
+    <prefix>/<key>/record.json lists each artifact's URL: either an object
+    written under <prefix>/<key>/ or one the run uploaded with its results.
+    """
+
+    def _exists(self, bucket_name: str, object_name: str) -> bool:
+        return self.uploader.get_blob(bucket_name, object_name) is not None
+
+    def _read_json(self, object_name: str) -> Optional[Dict[str, Any]]:
+        if not self._exists(self.bucket_name, object_name):
+            return None
+        try:
+            return json.loads(self.uploader.read_object(self.bucket_name, object_name))
+        except json.JSONDecodeError:
+            return None
+
+    def _write_json(self, object_name: str, data: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            self.uploader.upload_file(tmp_path, self.bucket_name, object_name, compress=False)
+        finally:
+            os.remove(tmp_path)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self._read_json(self._object_name(f"{key}/{RECORD_NAME}"))
+        if record is None:
+            return None
+        # Artifacts referenced from a run's upload may have been deleted since
+        for url in record.get('artifacts', {}).values():
+            if not self._exists(*self.uploader.parse_gcs_url(url)):
+                return None
+        return record
+
+    def put(self, key: str, record: Dict[str, Any], files: Dict[str, str],
+            urls: Optional[Dict[str, str]] = None):
+        artifacts = {}
+        for name, local_path in files.items():
+            if urls and name in urls:
+                artifacts[name] = urls[name]
+            else:
+                artifacts[name] = self.uploader.upload_file(local_path, self.bucket_name,
+                                                            self._object_name(f"{key}/{name}"))
+        self._write_json(self._object_name(f"{key}/{RECORD_NAME}"), dict(record, artifacts=artifacts))
+
+    def restore(self, record: Dict[str, Any], name: str, local_path: str):
+        self.uploader.download_file(*self.uploader.parse_gcs_url(record['artifacts'][name]), local_path)
+
+    def artifact_url(self, record: Dict[str, Any], name: str) -> Optional[str]:
+        return record['artifacts'].get(name)
+
+    def read_latest(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self._object_name(name))
+
+    def write_latest(self, name: str, pointer: Dict[str, Any]):
+        self._write_json(self._object_name(name), pointer)
+
+
+def create_result_cache(location: str, uploader=None) -> ResultCache:
+    """
+    Build the result cache for a location
+
+    Parameters:
+    location: gs://bucket/prefix for GCS, otherwise a directory path
+    uploader: Optional GCSUploader to reuse for gs:// locations
+    """
+    return create_store(location, LocalResultCache, GCSResultCache, uploader)
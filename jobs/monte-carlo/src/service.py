@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+
+"""
+Long-running Monte Carlo simulation service
+
+Each monte-carlo-batch dispatch starts a container, a Python interpreter and
+imports numpy, pandas, the Alpha Vantage and GCS clients before running a
+few hundred milliseconds of math. This entry point keeps all of that warm:
+one process holds the DataFetcher (with its in-memory cache tier), the GCS
+client and the imported simulation code, and accepts simulation requests
+over HTTP.
+
+Concurrent requests are micro-batched: the first request opens a short
+collection window, everything that arrives within it shares one
+DataFetcher.fetch_many call (so duplicate tickers cost a single load), and
+the simulations then run on a bounded worker pool. Tickers the cache can
+serve are loaded on the batching thread; misses, which may wait on the API
+rate limiter, are fetched on a separate pool so they never hold up the
+batches behind them.
+
+    POST /simulate   {"ticker": "AAPL", "days": 252, "simulations": 10000,
+                      "confidence_levels": [0.95, 0.99], "upload": false}
+    GET  /health     liveness and queue depth
+    GET  /stats      request, batch and cache counters
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from config import load_config, get_default_dirs
+from data_fetcher import DataFetcher
+from monte_carlo import MonteCarloSimulator
+
+
+# Bounds on a single request, so one caller cannot tie up a worker for minutes
+MAX_DAYS = 2520
+MAX_SIMULATIONS = 100000
+
+
+class RequestError(ValueError):
+    """Invalid simulation request (HTTP 400)"""
+
+
+class ServiceBusy(Exception):
+    """The request queue is full (HTTP 503)"""
+
+
+class SimulationRequest:
+    """One queued simulation request and, once done, its outcome"""
+
+    def __init__(self, ticker: str, days: int, simulations: int,
+                 confidence_levels: List[float], upload: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.ticker = ticker
+        self.days = days
+        self.simulations = simulations
+        self.confidence_levels = confidence_levels
+        self.upload = upload
+        self.received = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+
+    @classmethod
+    def from_json(cls, payload: Any, defaults: Dict[str, Any]) -> 'SimulationRequest':
+        """Validate a request body"""
+        if not isinstance(payload, dict):
+            raise RequestError("Request body must be a JSON object")
+
+        ticker = payload.get('ticker')
+        if not isinstance(ticker, str) or not ticker.strip():
+            raise RequestError("'ticker' is required")
+
+        try:
+            days = int(payload.get('days', defaults['days']))
+            simulations = int(payload.get('simulations', defaults['simulations']))
+            confidence_levels = [float(level) for level in
+                                 payload.get('confidence_levels', defaults['confidence_levels'])]
+        except (TypeError, ValueError) as e:
+            raise RequestError(f"Invalid simulation parameters: {e}")
+
+        if not 1 <= days <= MAX_DAYS:
+            raise RequestError(f"'days' must be between 1 and {MAX_DAYS}")
+        if not 1 <= simulations <= MAX_SIMULATIONS:
+            raise RequestError(f"'simulations' must be between 1 and {MAX_SIMULATIONS}")
+        if not confidence_levels or not all(0 < level < 1 for level in confidence_levels):
+            raise RequestError("'confidence_levels' must be values between 0 and 1")
+
+        # bool("false") is True, so only JSON booleans are accepted
+        upload = payload.get('upload', False)
+        if not isinstance(upload, bool):
+            raise RequestError("'upload' must be true or false")
+
+        return cls(ticker.strip().upper(), days, simulations, confidence_levels, upload=upload)
+
+
+class SimulationService:
+    """Warm simulation engine fed by a micro-batching request queue"""
+
+    def __init__(self, data_fetcher: DataFetcher, workers: int = 4, batch_window: float = 0.02,
+                 max_batch: int = 32, max_queue: int = 256, period: str = "2y",
+                 defaults: Optional[Dict[str, Any]] = None, uploader=None,
+                 gcs_bucket: Optional[str] = None, gcs_prefix: str = "monte-carlo-service",
+                 refresh_fundamentals: bool = False):
+        """
+        Parameters:
+        data_fetcher: Long-lived fetcher shared by every request
+        workers: Concurrent simulations
+        batch_window: Seconds to collect further requests after the first
+        max_batch: Most requests per batch
+        max_queue: Requests waiting beyond this are rejected as busy
+        period: Historical data period used to fit the model
+        defaults: Default days, simulations and confidence_levels
+        uploader: Optional GCSUploader for requests with upload=true
+        gcs_bucket: Bucket URL for uploads
+        gcs_prefix: Object prefix for uploads (one sub-prefix per request)
+        refresh_fundamentals: Refresh missing or expired company info in the
+                              background from spare API quota
+        """
+        self.data_fetcher = data_fetcher
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.period = period
+        self.defaults = defaults or {'days': 252, 'simulations': 10000, 'confidence_levels': [0.95, 0.99]}
+        self.uploader = uploader
+        self.gcs_bucket = gcs_bucket
+        self.gcs_prefix = gcs_prefix
+        self.refresh_fundamentals = refresh_fundamentals
+
+        self.queue: 'queue.Queue[Optional[SimulationRequest]]' = queue.Queue(maxsize=max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulate")
+        self.fetch_executor = ThreadPoolExecutor(max_workers=max(1, data_fetcher.fetch_workers),
+                                                 thread_name_prefix="fetch")
+        self._stopping = threading.Event()
+        self.started_at = datetime.now().isoformat()
+        self.stats_lock = threading.Lock()
+        self.counters = {'requests': 0, 'completed': 0, 'failed': 0, 'rejected': 0,
+                         'batches': 0, 'batched_requests': 0}
+
+        self._batcher = threading.Thread(target=self._batch_loop, name="batcher", daemon=True)
+        self._batcher.start()
+
+    def _count(self, **increments):
+        with self.stats_lock:
+            for key, value in increments.items():
+                self.counters[key] += value
+
+    def submit(self, request: SimulationRequest) -> SimulationRequest:
+        """Queue a request without waiting for it"""
+        if request.upload and (self.uploader is None or not self.gcs_bucket):
+            raise RequestError("Uploads are not configured on this service (--gcs-bucket)")
+        if self._stopping.is_set():
+            raise ServiceBusy("Service is shutting down")
+
+        try:
+            self.queue.put_nowait(request)
+        except queue.Full:
+            self._count(rejected=1)
+            raise ServiceBusy(f"Request queue full ({self.queue.maxsize} waiting)")
+        self._count(requests=1)
+        return request
+
+    def simulate(self, request: SimulationRequest, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Queue a request and wait for its result"""
+        self.submit(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError(f"Simulation of {request.ticker} did not finish within {timeout}s")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect_batch(self, first: SimulationRequest) -> List[SimulationRequest]:
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                # Shutdown wake-up: finish this batch; the loop drains the rest
+                break
+            batch.append(request)
+
+        return batch
+
+    def _batch_loop(self):
+        # Runs until close() has been called and the queue is empty
+        while True:
+            try:
+                first = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            if first is None:
+                continue
+
+            batch = self._collect_batch(first)
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # Never let one bad batch stop the loop
+                for request in batch:
+                    if not request.done.is_set():
+                        self._finish(request, error=Exception(f"Failed to run batch: {e}"))
+
+    def _run_batch(self, batch: List[SimulationRequest]):
+        self._count(batches=1, batched_requests=len(batch))
+
+        # One load for every distinct ticker in the batch; the fetcher
+        # serves repeats from memory and coalesces concurrent API calls.
+        # Cached tickers are loaded here, misses on the fetch pool
+        tickers = list(dict.fromkeys(request.ticker for request in batch))
+        cached = [ticker for ticker in tickers
+                  if self.data_fetcher.cache_status(ticker, self.period)['state'] in ('fresh', 'stale')]
+        missing = [ticker for ticker in tickers if ticker not in cached]
+
+        if cached:
+            self._fetch_and_simulate([request for request in batch if request.ticker in cached],
+                                     cached, len(batch))
+        if missing:
+            self.fetch_executor.submit(self._fetch_and_simulate,
+                                       [request for request in batch if request.ticker in missing],
+                                       missing, len(batch))
+
+    def _fetch_and_simulate(self, requests: List[SimulationRequest], tickers: List[str], batch_size: int):
+        """Load tickers, then queue a simulation for each request"""
+        try:
+            ticker_data = self.data_fetcher.fetch_many(tickers, period=self.period, columns=['Close'])
+            ticker_info = self.data_fetcher.get_ticker_info_many(tickers, refresh=self.refresh_fundamentals)
+        except Exception as e:
+            for request in requests:
+                self._finish(request, error=Exception(f"Failed to fetch data for {request.ticker}: {e}"))
+            return
+
+        for request in requests:
+            historical_data, _ = ticker_data.get(request.ticker, (None, False))
+            if historical_data is None or historical_data.empty:
+                self._finish(request, error=LookupError(f"No data found for {request.ticker}"))
+                continue
+
+            self.executor.submit(self._simulate_one, request, historical_data,
+                                 ticker_info.get(request.ticker, {}), batch_size)
+
+    def _simulate_one(self, request: SimulationRequest, historical_data, info: Dict[str, Any],
+                      batch_size: int):
+        started = time.monotonic()
+        try:
+            # A simulator per request: the RandomState is not thread safe,
+            # and a fresh seed keeps results identical to the batch job's
+            simulator = MonteCarloSimulator()
+            results = simulator.run_simulation(
+                historical_data=historical_data,
+                days=request.days,
+                simulations=request.simulations,
+                confidence_levels=request.confidence_levels
+            )
+
+            summary = MonteCarloSimulator.summarize_results(request.ticker, results)
+            summary['generated_at'] = datetime.now().isoformat()
+            if 'sector' in info:
+                summary['sector'] = info['sector']
+                summary['industry'] = info['industry']
+
+            if request.upload:
+                summary['uploaded_to'] = self._upload(request, summary)
+
+            summary['request'] = {
+                'id': request.id,
+                'batch_size': batch_size,
+                'queued_seconds': round(started - request.received, 4),
+                'simulation_seconds': round(time.monotonic() - started, 4)
+            }
+            self._finish(request, result=summary)
+
+        except Exception as e:
+            self._finish(request, error=e)
+
+    def _upload(self, request: SimulationRequest, summary: Dict[str, Any]) -> str:
+        """Upload a summary where the aggregator finds it (one manifest per request)"""
+        local_dir = tempfile.mkdtemp(prefix=f"mc-{request.id}-")
+        try:
+            with open(os.path.join(local_dir, f"{request.ticker}_summary.json"), 'w') as f:
+                json.dump(summary, f, indent=2)
+
+            prefix = f"{self.gcs_prefix}/{request.id}"
+            _, success = self.uploader.upload_results_directory(local_dir, self.gcs_bucket, prefix=prefix)
+            if not success:
+                raise Exception(f"Failed to upload results for {request.ticker}")
+            return f"{self.gcs_bucket.rstrip('/')}/{prefix}"
+        finally:
+            shutil.rmtree(local_dir, ignore_errors=True)
+
+    def _finish(self, request: SimulationRequest, result: Optional[Dict[str, Any]] = None,
+                error: Optional[Exception] = None):
+        request.result = result
+        request.error = error
+        self._count(completed=1 if error is None else 0, failed=0 if error is None else 1)
+        request.done.set()
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok' if self._batcher.is_alive() else 'stopped',
+            'queued': self.queue.qsize(),
+            'workers': self.workers,
+            'started_at': self.started_at
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self.stats_lock:
+            counters = dict(self.counters)
+        counters['mean_batch_size'] = (round(counters['batched_requests'] / counters['batches'], 2)
+                                       if counters['batches'] else 0.0)
+        return {
+            'service': counters,
+            'cache': self.data_fetcher.get_cache_info()
+        }
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop taking requests, finish queued ones and wait for background work"""
+        self._stopping.set()
+        # Wake the batcher if it is idle; a full queue needs no wake-up
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._batcher.join(timeout)
+        self.fetch_executor.shutdown(wait=True)
+        self.executor.shutdown(wait=True)
+        self.data_fetcher.wait_for_background_refreshes(timeout=timeout)
+
+
+class SimulationHandler(BaseHTTPRequestHandler):
+    """JSON API over a SimulationService (set as server.service)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    # Seconds a request may wait for its simulation before 504
+    request_timeout = 300
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            health = service.health()
+            self._send_json(200 if health['status'] == 'ok' else 503, health)
+        elif self.path == '/stats':
+            self._send_json(200, service.stats())
+        else:
+            self._send_json(404, {'error': f"Not found: {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/simulate':
+            self._send_json(404, {'error': f"Not found: {self.path}"})
+            return
+
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            request = SimulationRequest.from_json(payload, service.defaults)
+            result = service.simulate(request, timeout=self.request_timeout)
+        except json.JSONDecodeError as e:
+            self._send_json(400, {'error': f"Invalid JSON: {e}"})
+        except RequestError as e:
+            self._send_json(400, {'error': str(e)})
+        except LookupError as e:
+            self._send_json(404, {'error': str(e)})
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)})
+        except TimeoutError as e:
+            self._send_json(504, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+        else:
+            self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        print(f"  {self.address_string()} - {format % args}")
+
+
+def create_server(service: SimulationService, host: str = '0.0.0.0', port: int = 8080) -> ThreadingHTTPServer:
+    """HTTP server bound to host:port (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), SimulationHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    defaults = get_default_dirs()
+
+    parser = argparse.ArgumentParser(description='Monte Carlo simulation service (HTTP API)')
+
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Address to listen on (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('NOMAD_PORT_http', 8080)),
+                       help='Port to listen on (default: $NOMAD_PORT_http or 8080)')
+    parser.add_argument('--config', '-c', default=defaults['config'],
+                       help='Path to configuration file')
+    parser.add_argument('--cache-dir', default=defaults['cache'],
+                       help='Directory for data cache')
+    parser.add_argument('--remote-cache',
+                       help='Shared cache tier behind --cache-dir (gs://bucket/prefix or a directory)')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                       help='Concurrent simulations (default: 4)')
+    parser.add_argument('--batch-window-ms', type=float, default=20,
+                       help='Milliseconds to collect concurrent requests into one batch (default: 20)')
+    parser.add_argument('--max-batch', type=int, default=32,
+                       help='Most requests per batch (default: 32)')
+    parser.add_argument('--gcs-bucket',
+                       help='Google Cloud Storage bucket URL for requests with "upload": true')
+    parser.add_argument('--gcs-prefix', default='monte-carlo-service',
+                       help='GCS object prefix for uploaded results')
+    parser.add_argument('--refresh-fundamentals', action='store_true',
+                       help='Refresh missing or expired company info in the background from spare API quota')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config) or {}
+    if args.remote_cache:
+        config.setdefault('data', {})['remote_cache'] = args.remote_cache
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    try:
+        data_fetcher = DataFetcher(cache_dir=args.cache_dir, config=config)
+
+        uploader = None
+        if args.gcs_bucket:
+            from gcs_uploader import GCSUploader
+            uploader = GCSUploader(compress_text=True)
+
+        service = SimulationService(
+            data_fetcher,
+            workers=args.workers,
+            batch_window=args.batch_window_ms / 1000,
+            max_batch=args.max_batch,
+            defaults={
+                'days': config.get('days', 252),
+                'simulations': config.get('simulations', 10000),
+                'confidence_levels': config.get('confidence_levels', [0.95, 0.99])
+            },
+            uploader=uploader,
+            gcs_bucket=args.gcs_bucket,
+            gcs_prefix=args.gcs_prefix,
+            refresh_fundamentals=args.refresh_fundamentals
+        )
+        server = create_server(service, args.host, args.port)
+    except Exception as e:
+        print(f"Error starting service: {e}")
+        sys.exit(1)
+
+    print(f"Monte Carlo service listening on {args.host}:{server.server_address[1]} "
+          f"({args.workers} workers, {args.batch_window_ms:g}ms batch window)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.close(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
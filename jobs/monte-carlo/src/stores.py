@@ -0,0 +1,48 @@
+"""
+Locations of the shared stores
+
+The remote cache tier (remote_cache.py), chunk checkpoints (checkpoint.py)
+and the result cache (result_cache.py) each come as a directory store and a
+GCS store, chosen from a location string:
+
+- gs://bucket/prefix: the GCS store, through a (possibly shared) GCSUploader
+- file:///path or a plain path: the directory store
+"""
+
+from typing import Callable, Optional
+
+
+class GCSStore:
+    """Base of stores kept under a prefix of a GCS bucket, using an existing GCSUploader client"""
+
+    def __init__(self, uploader, bucket_name: str, prefix: str = ""):
+        self.uploader = uploader
+        self.bucket_name = bucket_name
+        self.prefix = prefix.rstrip('/') + '/' if prefix else ''
+
+    def _object_name(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+
+def create_store(location: str, local_store: Callable, gcs_store: Callable, uploader=None):
+    """
+    Build the store for a location
+
+    Parameters:
+    location: gs://bucket/prefix for GCS, otherwise a directory path
+    local_store: Directory store class, called with the path
+    gcs_store: GCS store class, called with (uploader, bucket_name, prefix)
+    uploader: Optional GCSUploader to reuse for gs:// locations
+    """
+    if location.startswith('gs://'):
+        if uploader is None:
+            # google-cloud-storage is only needed for gs:// locations
+            from gcs_uploader import GCSUploader
+            uploader = GCSUploader()
+        bucket_name, prefix = uploader.parse_gcs_url(location)
+        return gcs_store(uploader, bucket_name, prefix)
+
+    if location.startswith('file://'):
+        location = location[len('file://'):]
+
+    return local_store(location)
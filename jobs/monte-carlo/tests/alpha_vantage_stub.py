@@ -0,0 +1,93 @@
+"""Local HTTP server replaying recorded Alpha Vantage responses"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'alpha_vantage'
+
+FUNCTION_PREFIXES = {'TIME_SERIES_DAILY': 'daily', 'OVERVIEW': 'overview'}
+
+
+class AlphaVantageStub:
+    """
+    Serves fixtures/alpha_vantage/<daily|overview>_<SYMBOL>.<csv|json> at /query
+
+    Unknown symbols get an empty JSON object, like the real API. Requests and
+    TCP connections are counted so tests can check keep-alive reuse.
+    """
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.requests = []
+        self.connections = 0
+        self.gzip_responses = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.requests.append(params)
+
+                body, content_type = stub.response_for(params)
+                headers = {'Content-Type': content_type}
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    headers['Content-Encoding'] = 'gzip'
+                    with stub.lock:
+                        stub.gzip_responses += 1
+
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                       daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/query"
+
+    def response_for(self, params):
+        prefix = FUNCTION_PREFIXES.get(params.get('function'), 'unknown')
+        symbol = params.get('symbol', '')
+
+        csv_path = self.fixtures_dir / f"{prefix}_{symbol}.csv"
+        if params.get('datatype') == 'csv' and csv_path.exists():
+            return csv_path.read_bytes(), 'application/x-download'
+
+        json_path = self.fixtures_dir / f"{prefix}_{symbol}.json"
+        if json_path.exists():
+            return json_path.read_bytes(), 'application/json'
+
+        return b'{}', 'application/json'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,172 @@
+"""In-memory stand-in for the subset of google-cloud-storage used by the uploader"""
+
+import threading
+from pathlib import Path
+
+
+class FakeBlob:
+
+    def __init__(self, store, bucket_name, name, chunk_size=None):
+        self.store = store
+        self.bucket_name = bucket_name
+        self.name = name
+        self.chunk_size = chunk_size
+        self.metadata = None
+        self.content_type = None
+        self.content_encoding = None
+        self.size = None
+        self.updated = None
+
+    def _key(self):
+        return (self.bucket_name, self.name)
+
+    def upload_from_file(self, file_obj, content_type=None, size=None):
+        data = file_obj.read() if size is None else file_obj.read(size)
+        self.store.put(self._key(), data, {
+            'content_type': content_type,
+            'content_encoding': self.content_encoding,
+            'metadata': dict(self.metadata) if self.metadata else None
+        })
+        self.size = len(data)
+
+    def upload_from_string(self, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode()
+        self.store.put(self._key(), data, {
+            'content_type': content_type,
+            'content_encoding': self.content_encoding,
+            'metadata': dict(self.metadata) if self.metadata else None
+        })
+        self.size = len(data)
+
+    def compose(self, sources):
+        data = b''.join(self.store.get((source.bucket_name, source.name))[0] for source in sources)
+        self.store.put(self._key(), data, {
+            'content_type': self.content_type,
+            'content_encoding': self.content_encoding,
+            'metadata': dict(self.metadata) if self.metadata else None
+        })
+        self.store.compose_calls.append((self.name, [source.name for source in sources]))
+        self.size = len(data)
+
+    def exists(self):
+        return self.store.contains(self._key())
+
+    def reload(self):
+        data, properties = self.store.get(self._key())
+        self.size = len(data)
+        self.metadata = properties['metadata']
+        self.content_type = properties['content_type']
+        self.content_encoding = properties['content_encoding']
+
+    def delete(self):
+        self.store.delete(self._key())
+
+    def download_as_bytes(self):
+        self.store.downloads.append(self.name)
+        return self.store.get(self._key())[0]
+
+    def download_to_filename(self, filename):
+        Path(filename).write_bytes(self.download_as_bytes())
+
+
+class FakeBucket:
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self.store, self.name, name, chunk_size=chunk_size)
+
+    def get_blob(self, name):
+        if not self.store.contains((self.name, name)):
+            return None
+        blob = FakeBlob(self.store, self.name, name)
+        blob.reload()
+        return blob
+
+
+class FakeBlobIterator:
+    """Mimics google.api_core page iterators, including delimiter prefixes"""
+
+    def __init__(self, blobs, prefixes, page_size):
+        self.blobs = blobs
+        self.page_size = page_size or 1000
+        self.all_prefixes = sorted(prefixes)
+        self.prefixes = set()
+        self.num_pages = 0
+
+    @property
+    def pages(self):
+        # Spread blobs and prefixes over pages the way the API does
+        entries = [('blob', blob) for blob in self.blobs] + [('prefix', p) for p in self.all_prefixes]
+        for start in range(0, max(len(entries), 1), self.page_size):
+            page = entries[start:start + self.page_size]
+            self.num_pages += 1
+            self.prefixes.update(value for kind, value in page if kind == 'prefix')
+            yield iter([value for kind, value in page if kind == 'blob'])
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+
+class FakeStorageClient:
+    """Thread-safe in-memory object store with a storage.Client-like interface"""
+
+    def __init__(self):
+        self.objects = {}
+        self.compose_calls = []
+        self.list_calls = []
+        self.downloads = []
+        self.lock = threading.Lock()
+
+    def put(self, key, data, properties):
+        with self.lock:
+            self.objects[key] = (data, properties)
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.objects:
+                raise FileNotFoundError(f"No such object: gs://{key[0]}/{key[1]}")
+            return self.objects[key]
+
+    def contains(self, key):
+        with self.lock:
+            return key in self.objects
+
+    def delete(self, key):
+        with self.lock:
+            if key not in self.objects:
+                raise FileNotFoundError(f"No such object: gs://{key[0]}/{key[1]}")
+            del self.objects[key]
+
+    def names(self, bucket_name):
+        with self.lock:
+            return sorted(name for bucket, name in self.objects if bucket == bucket_name)
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+    def list_blobs(self, bucket_or_name, prefix=None, delimiter=None, fields=None,
+                   page_size=None):
+        bucket_name = getattr(bucket_or_name, 'name', bucket_or_name)
+        prefix = prefix or ''
+        self.list_calls.append({'prefix': prefix, 'delimiter': delimiter,
+                                'fields': fields, 'page_size': page_size})
+
+        blobs = []
+        prefixes = set()
+        for name in self.names(bucket_name):
+            if not name.startswith(prefix):
+                continue
+            remainder = name[len(prefix):]
+            if delimiter and delimiter in remainder:
+                prefixes.add(prefix + remainder.split(delimiter, 1)[0] + delimiter)
+                continue
+            blob = FakeBlob(self, bucket_name, name)
+            blob.reload()
+            blobs.append(blob)
+
+        return FakeBlobIterator(blobs, prefixes, page_size)
@@ -0,0 +1,227 @@
+"""Local HTTP server standing in for the Nomad job API"""
+
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeNomad:
+    """
+    Implements the job endpoints the dispatcher uses for one parameterized job
+
+    Dispatches are validated against meta_required/meta_optional like Nomad
+    does, honour IdempotencyToken, and are recorded with their decoded
+    payload. fail_next queues status codes to return before succeeding, and
+    latency delays every dispatch so tests can observe concurrency.
+
+    /v1/event/stream replays the frames in events (see load_events) from the
+    requested index and then closes the connection; stream_limit caps the
+    frames sent per connection so tests can exercise reconnects, and
+    heartbeats keeps the connection open afterwards with that many empty
+    frames, heartbeat_interval seconds apart, as Nomad does for a quiet stream.
+    """
+
+    def __init__(self, job_name: str = 'monte-carlo-batch', meta_required=('TICKER',),
+                 meta_optional=('DAYS', 'SIMULATIONS', 'ALPHA_VANTAGE_API_KEY', 'CHUNK_INDEX', 'CHUNK_COUNT', 'SEED',
+                                'PARAMETERS', 'FORCE_RECOMPUTE'), latency: float = 0.0):
+        self.job_name = job_name
+        self.meta_required = set(meta_required)
+        self.meta_optional = set(meta_optional)
+        self.latency = latency
+        self.dispatches = []
+        self.jobs = {}
+        self.tokens = {}
+        self.fail_next = []
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.index = 1
+        self.events = []
+        self.stream_limit = None
+        self.heartbeats = 0
+        self.heartbeat_interval = 0.1
+        self.streams = []
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode() if not isinstance(body, bytes) else body
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, query):
+                index = int(query.get('index', ['0'])[0])
+                topics = {topic.split(':')[0] for topic in query.get('topic', [])}
+                with fake.lock:
+                    fake.streams.append({'index': index, 'topics': sorted(topics)})
+                    frames = [frame for frame in fake.events if not frame.get('Events') or frame['Index'] >= index]
+
+                # Chunked like Nomad's stream, one chunk per line
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                def write_line(line: bytes):
+                    self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                    self.wfile.flush()
+
+                try:
+                    sent = 0
+                    for frame in frames:
+                        events = [event for event in frame.get('Events', []) if event['Topic'] in topics]
+                        if frame.get('Events') and not events:
+                            continue
+                        write_line(json.dumps(dict(frame, Events=events) if events else {}).encode() + b'\n')
+                        if events:
+                            sent += 1
+                            if fake.stream_limit is not None and sent >= fake.stream_limit:
+                                break
+                    else:
+                        for _ in range(fake.heartbeats):
+                            time.sleep(fake.heartbeat_interval)
+                            write_line(b'{}\n')
+
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == '/v1/jobs':
+                    prefix = parse_qs(url.query).get('prefix', [''])[0]
+                    with fake.lock:
+                        jobs = [{key: job[key] for key in ('ID', 'Status', 'Stop', 'Meta', 'JobSummary')
+                                 if key in job}
+                                for job_id, job in fake.jobs.items() if job_id.startswith(prefix)]
+                    self._send(200, jobs, {'X-Nomad-Index': str(fake.index)})
+                    return
+                if url.path == '/v1/event/stream':
+                    self._stream(parse_qs(url.query))
+                    return
+
+                job_id = url.path[len('/v1/job/'):]
+                if job_id == fake.job_name:
+                    self._send(200, {'ID': job_id, 'Type': 'batch', 'ParameterizedJob': {
+                        'MetaRequired': sorted(fake.meta_required),
+                        'MetaOptional': sorted(fake.meta_optional)}})
+                elif job_id in fake.jobs:
+                    self._send(200, fake.jobs[job_id])
+                else:
+                    self._send(404, b'job not found')
+
+            def do_DELETE(self):
+                job_id = urlparse(self.path).path[len('/v1/job/'):]
+                with fake.lock:
+                    job = fake.jobs.get(job_id)
+                    if job is not None:
+                        job['Status'] = 'dead'
+                        job['Stop'] = True
+                if job is None:
+                    self._send(404, b'job not found')
+                else:
+                    self._send(200, {'EvalID': uuid.uuid4().hex})
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+                with fake.lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    status, response = fake.dispatch(path, body)
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+                self._send(status, response)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                       daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def dispatch(self, path, body):
+        if path != f"/v1/job/{self.job_name}/dispatch":
+            return 404, b'job not found'
+
+        with self.lock:
+            if self.fail_next:
+                return self.fail_next.pop(0), b'injected failure'
+
+            token = body.get('IdempotencyToken')
+            if token and token in self.tokens:
+                return 200, self.tokens[token]
+
+            meta = body.get('Meta') or {}
+            missing = self.meta_required - set(meta)
+            unknown = set(meta) - self.meta_required - self.meta_optional
+            if missing or unknown:
+                return 400, f"invalid meta: missing {sorted(missing)}, unexpected {sorted(unknown)}".encode()
+
+            payload = base64.b64decode(body['Payload']) if body.get('Payload') else None
+            job_id = f"{self.job_name}/dispatch-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+            response = {'DispatchedJobID': job_id, 'EvalID': uuid.uuid4().hex, 'Index': len(self.dispatches) + 1}
+
+            self.index += 1
+            self.jobs[job_id] = {'ID': job_id, 'Status': 'pending', 'Meta': meta, 'ParentID': self.job_name}
+            self.dispatches.append({'job_id': job_id, 'meta': meta, 'payload': payload,
+                                    'time': time.monotonic()})
+            if token:
+                self.tokens[token] = response
+            return 200, response
+
+    def load_events(self, path):
+        """
+        Load recorded event stream frames, one JSON object per line
+
+        Heartbeats ({}) are kept in place; jobs named in Job events are
+        registered so /v1/jobs lists them, as Nomad would before emitting
+        their events.
+        """
+        with open(path, 'r') as f:
+            frames = [json.loads(line) for line in f if line.strip()]
+
+        with self.lock:
+            self.events.extend(frames)
+            for frame in frames:
+                for event in frame.get('Events', []):
+                    job = (event.get('Payload') or {}).get('Job')
+                    if job and job.get('ParentID') == self.job_name and job['ID'] not in self.jobs:
+                        self.jobs[job['ID']] = {'ID': job['ID'], 'Status': 'pending', 'Meta': job.get('Meta', {}),
+                                                'ParentID': self.job_name}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
@@ -0,0 +1,166 @@
+import pytest
+import json
+import math
+import tempfile
+import shutil
+import numpy as np
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from aggregate import ResultsAggregator, TickerAggregate, write_report
+from gcs_uploader import GCSUploader
+from tests.fake_gcs import FakeStorageClient
+
+
+class TestResultsAggregator:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def fake_client(self):
+        return FakeStorageClient()
+
+    @pytest.fixture
+    def uploader(self, fake_client):
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = fake_client
+            yield GCSUploader()
+
+    @staticmethod
+    def _put(fake_client, name, data):
+        if not isinstance(data, bytes):
+            data = json.dumps(data).encode()
+        fake_client.put(("bucket", name), data,
+                        {'content_type': None, 'content_encoding': None, 'metadata': None})
+
+    def _publish_run(self, fake_client, alloc_id, ticker, final_prices, generated_at, days=252):
+        prefix = f"runs/{alloc_id}/20240101_000000"
+        summary = {
+            'ticker': ticker,
+            'days': days,
+            'simulations': len(final_prices),
+            'initial_price': 100.0,
+            'generated_at': generated_at,
+            'parameters': {},
+            'statistics': {
+                'mean': float(np.mean(final_prices)),
+                'std': float(np.std(final_prices)),
+                'min': float(np.min(final_prices)),
+                'max': float(np.max(final_prices))
+            },
+            'var': {'0.95': float(np.percentile(final_prices, 5))}
+        }
+        self._put(fake_client, f"{prefix}/{ticker}_summary.json", summary)
+        self._put(fake_client, f"{prefix}/{ticker}_simulation.csv", b"large,path,data\n" * 100)
+        self._put(fake_client, f"{prefix}/upload_manifest.json", {
+            'upload_info': {'gcs_prefix': prefix},
+            'files': {
+                f"{ticker}_summary.json": f"gs://bucket/{prefix}/{ticker}_summary.json",
+                f"{ticker}_simulation.csv": f"gs://bucket/{prefix}/{ticker}_simulation.csv"
+            }
+        })
+
+    def test_ticker_aggregate_pools_exactly(self):
+        rng = np.random.default_rng(0)
+        first, second = rng.normal(110, 5, 400), rng.normal(95, 12, 600)
+
+        aggregate = TickerAggregate('AAPL', 252)
+        for prices, generated_at in [(first, '2024-01-01'), (second, '2024-01-02')]:
+            aggregate.add({
+                'simulations': len(prices),
+                'initial_price': 100.0,
+                'generated_at': generated_at,
+                'statistics': {'mean': prices.mean(), 'std': prices.std(),
+                               'min': prices.min(), 'max': prices.max()},
+                'var': {'0.95': 90.0}
+            })
+
+        combined = np.concatenate([first, second])
+        entry = aggregate.to_dict()
+        assert entry['runs'] == 2
+        assert entry['total_simulations'] == 1000
+        assert math.isclose(entry['pooled_mean'], combined.mean())
+        assert math.isclose(entry['pooled_std'], combined.std())
+        assert entry['min'] == combined.min()
+        assert entry['max'] == combined.max()
+        assert entry['latest_run']['generated_at'] == '2024-01-02'
+        assert math.isclose(entry['var_loss_pct']['0.95'], 0.1)
+
+    def test_ticker_aggregate_pools_returns_across_initial_prices(self):
+        """Runs from different dates are pooled as returns, not price levels"""
+        rng = np.random.default_rng(2)
+        first_returns, second_returns = rng.normal(1.10, 0.05, 400), rng.normal(0.95, 0.12, 600)
+
+        aggregate = TickerAggregate('AAPL', 252)
+        for returns, initial_price, generated_at in [(first_returns, 100.0, '2024-01-01'),
+                                                     (second_returns, 200.0, '2024-06-01')]:
+            prices = returns * initial_price
+            aggregate.add({
+                'simulations': len(prices),
+                'initial_price': initial_price,
+                'generated_at': generated_at,
+                'statistics': {'mean': prices.mean(), 'std': prices.std(),
+                               'min': prices.min(), 'max': prices.max()},
+                'var': {'0.95': 180.0}
+            })
+
+        combined = np.concatenate([first_returns, second_returns])
+        entry = aggregate.to_dict()
+        assert math.isclose(entry['expected_return'], combined.mean() - 1)
+        assert math.isclose(entry['return_std'], combined.std())
+        # Price figures are stated at the latest run's initial price
+        assert math.isclose(entry['pooled_mean'], combined.mean() * 200.0)
+        assert math.isclose(entry['pooled_std'], combined.std() * 200.0)
+        assert math.isclose(entry['min'], combined.min() * 200.0)
+
+    def test_aggregate_reads_only_manifests_and_summaries(self, fake_client, uploader):
+        rng = np.random.default_rng(1)
+        for i, ticker in enumerate(['AAPL', 'MSFT', 'AAPL', 'GOOG']):
+            self._publish_run(fake_client, f"alloc-{i}", ticker, rng.normal(105, 10, 200),
+                              f"2024-01-0{i + 1}T00:00:00")
+
+        aggregator = ResultsAggregator(uploader, max_workers=2)
+        report = aggregator.aggregate("gs://bucket/runs")
+
+        assert report['manifests_read'] == 4
+        assert report['summaries_read'] == 4
+        assert report['errors'] == []
+        assert not any(name.endswith('.csv') for name in fake_client.downloads)
+
+        by_ticker = {entry['ticker']: entry for entry in report['tickers']}
+        assert sorted(by_ticker) == ['AAPL', 'GOOG', 'MSFT']
+        assert by_ticker['AAPL']['runs'] == 2
+        assert by_ticker['AAPL']['total_simulations'] == 400
+        assert report['cross_ticker']['tickers'] == 3
+        assert report['cross_ticker']['total_runs'] == 4
+
+    def test_aggregate_separates_horizons_and_records_errors(self, fake_client, uploader):
+        self._publish_run(fake_client, "alloc-a", 'AAPL', np.full(10, 110.0), "2024-01-01", days=252)
+        self._publish_run(fake_client, "alloc-b", 'AAPL', np.full(10, 101.0), "2024-01-02", days=30)
+        self._put(fake_client, "runs/alloc-c/20240101_000000/upload_manifest.json", b"not json")
+
+        aggregator = ResultsAggregator(uploader)
+        report = aggregator.aggregate("gs://bucket/runs")
+
+        assert [(e['ticker'], e['days']) for e in report['tickers']] == [('AAPL', 30), ('AAPL', 252)]
+        assert report['errors'] == ["gs://bucket/runs/alloc-c/20240101_000000/upload_manifest.json"]
+
+    def test_write_report(self, fake_client, uploader, temp_dir):
+        self._publish_run(fake_client, "alloc-a", 'AAPL', np.full(10, 110.0), "2024-01-01")
+
+        report = ResultsAggregator(uploader).aggregate("gs://bucket/runs")
+        json_path, csv_path = write_report(report, temp_dir)
+
+        with open(json_path) as f:
+            assert json.load(f)['tickers'][0]['ticker'] == 'AAPL'
+        lines = Path(csv_path).read_text().splitlines()
+        assert lines[0].endswith('var_loss_pct_0.95')
+        assert lines[1].startswith('AAPL,252,1,10,110.0')
@@ -0,0 +1,106 @@
+import pytest
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from alpha_vantage_client import AlphaVantageClient, AlphaVantageError
+from data_fetcher import DataFetcher
+from tests.alpha_vantage_stub import AlphaVantageStub
+
+
+class TestAlphaVantageClient:
+
+    @pytest.fixture
+    def stub(self):
+        with AlphaVantageStub() as stub:
+            yield stub
+
+    @pytest.fixture
+    def client(self, stub):
+        client = AlphaVantageClient('TEST_API_KEY', base_url=stub.url)
+        yield client
+        client.close()
+
+    def test_get_daily_parses_csv_into_typed_columns(self, client, stub):
+        data, meta = client.get_daily(symbol='AAPL', outputsize='compact')
+
+        assert list(data.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert all(str(dtype) == 'float64' for dtype in data.dtypes)
+        assert str(data.index.dtype).startswith('datetime64')
+        assert len(data) == 40
+        assert data.index[0] > data.index[-1]  # newest first, as served
+        assert meta['rows'] == 40
+
+        request = stub.requests[0]
+        assert request['function'] == 'TIME_SERIES_DAILY'
+        assert request['datatype'] == 'csv'
+        assert request['apikey'] == 'TEST_API_KEY'
+
+    def test_session_reuses_one_gzip_connection(self, client, stub):
+        for _ in range(3):
+            client.get_daily(symbol='AAPL')
+        client.get_company_overview(symbol='AAPL')
+
+        assert len(stub.requests) == 4
+        assert stub.connections == 1
+        assert stub.gzip_responses == 4
+
+    def test_concurrent_calls_share_pool(self, stub):
+        client = AlphaVantageClient('TEST_API_KEY', base_url=stub.url, pool_size=4)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: client.get_daily(symbol='AAPL'), range(12)))
+        client.close()
+
+        assert all(len(data) == 40 for data, _ in results)
+        assert stub.connections <= 4
+
+    def test_api_errors_raise(self, client):
+        with pytest.raises(AlphaVantageError, match="Invalid API call"):
+            client.get_daily(symbol='INVALID')
+        with pytest.raises(AlphaVantageError, match="rate limit"):
+            client.get_daily(symbol='THROTTLED')
+        with pytest.raises(AlphaVantageError):
+            client.get_daily(symbol='UNKNOWN')
+
+    def test_company_overview(self, client):
+        overview, _ = client.get_company_overview(symbol='AAPL')
+        assert overview.iloc[0]['Name'] == 'Apple Inc'
+
+        overview, _ = client.get_company_overview(symbol='UNKNOWN')
+        assert overview.empty
+
+
+class TestDataFetcherPooledClient:
+
+    @pytest.fixture
+    def temp_cache_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_fetch_through_pooled_client(self, temp_cache_dir):
+        config = {'data': {'alpha_vantage_api_key': 'TEST_API_KEY', 'api_client': 'pooled',
+                           'api_rate_limit_per_minute': 100}}
+
+        with AlphaVantageStub() as stub:
+            fetcher = DataFetcher(cache_dir=temp_cache_dir, config=config)
+            fetcher.ts.base_url = stub.url
+
+            data, is_from_cache = fetcher.fetch_ticker_data("AAPL", period="max")
+            info = fetcher.get_ticker_info("AAPL")
+
+        assert not is_from_cache
+        assert list(data.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert data.index.is_monotonic_increasing
+        assert fetcher._load_from_cache("AAPL", "max") is not None
+        assert info['name'] == 'Apple Inc'
+
+    def test_unsupported_api_client(self, temp_cache_dir):
+        config = {'data': {'alpha_vantage_api_key': 'TEST_API_KEY', 'api_client': 'grpc'}}
+        with pytest.raises(ValueError, match="Unsupported api_client"):
+            DataFetcher(cache_dir=temp_cache_dir, config=config)
@@ -0,0 +1,139 @@
+import pytest
+import json
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import distributed
+from checkpoint import (CheckpointStore, LocalCheckpointStore, GCSCheckpointStore, checkpoint_key,
+                        create_checkpoint_store)
+from distributed import chunk_identity, find_checkpoint, run_chunk
+from gcs_uploader import GCSUploader
+from tests.fake_gcs import FakeStorageClient
+
+
+LEVELS = [0.95, 0.99]
+
+
+class Evicted(Exception):
+    pass
+
+
+class TestCheckpoint:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def historical_data(self):
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        close = 100 * np.exp(np.cumsum(np.random.RandomState(4).normal(0.0003, 0.015, 300)))
+        return pd.DataFrame({'Close': close}, index=dates)
+
+    @pytest.fixture
+    def small_blocks(self):
+        # 20 days per path -> 50 paths per block
+        with patch('distributed.MAX_BLOCK_VALUES', 1000):
+            yield
+
+    def _evict_after(self, blocks):
+        """Make final_price_blocks fail after yielding the given number of blocks"""
+        original = distributed.final_price_blocks
+
+        def interrupted(*args, **kwargs):
+            for count, block in enumerate(original(*args, **kwargs)):
+                if count == blocks:
+                    raise Evicted()
+                yield block
+
+        return patch('distributed.final_price_blocks', interrupted)
+
+    def test_local_store(self, temp_dir):
+        store = create_checkpoint_store(str(Path(temp_dir) / 'checkpoints'))
+        assert isinstance(store, LocalCheckpointStore)
+        assert store.load('missing.json') is None
+
+        store.save('run.json', {'paths_done': 10})
+        store.save('run.json', {'paths_done': 20})
+        assert store.load('run.json') == {'paths_done': 20}
+        assert [p.name for p in (Path(temp_dir) / 'checkpoints').iterdir()] == ['run.json']
+
+        (Path(temp_dir) / 'checkpoints' / 'bad.json').write_text('{"trunc')
+        assert store.load('bad.json') is None
+
+        store.delete('run.json')
+        store.delete('run.json')
+        assert store.load('run.json') is None
+
+    def test_gcs_store(self):
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = FakeStorageClient()
+            store = create_checkpoint_store('gs://bucket/checkpoints', GCSUploader())
+
+            assert isinstance(store, GCSCheckpointStore)
+            assert store.load('run.json') is None
+            store.save('run.json', {'rng_state': {'state': 2 ** 127 + 1}})
+            assert store.load('run.json') == {'rng_state': {'state': 2 ** 127 + 1}}
+            store.delete('run.json')
+            assert store.load('run.json') is None
+            # Deleting a checkpoint that is already gone is not an error
+            store.delete('run.json')
+
+        # Stores must implement every operation
+        with pytest.raises(TypeError):
+            CheckpointStore()
+
+    def test_key_depends_on_every_parameter(self):
+        identity = chunk_identity('AAPL', 252, 1000, LEVELS, 0, 4, 7)
+        assert checkpoint_key(identity) == checkpoint_key(chunk_identity('AAPL', 252, 1000, LEVELS, 0, 4, 7))
+        assert checkpoint_key(identity).startswith('AAPL_')
+        for other in (chunk_identity('AAPL', 252, 1000, LEVELS, 1, 4, 7),
+                      chunk_identity('AAPL', 252, 1000, LEVELS, 0, 4, 8),
+                      chunk_identity('AAPL', 252, 1000, [0.95], 0, 4, 7)):
+            assert checkpoint_key(other) != checkpoint_key(identity)
+
+    def test_resume_gives_identical_results(self, historical_data, temp_dir, small_blocks):
+        expected = run_chunk('AAPL', historical_data, 20, 2000, LEVELS, 1, 2, seed=9)
+
+        store = LocalCheckpointStore(temp_dir)
+        with self._evict_after(7), pytest.raises(Evicted):
+            run_chunk('AAPL', historical_data, 20, 2000, LEVELS, 1, 2, seed=9,
+                      checkpoint_store=store, checkpoint_interval=0)
+
+        identity = chunk_identity('AAPL', 20, 2000, LEVELS, 1, 2, 9)
+        checkpoint = find_checkpoint(store, identity)
+        assert checkpoint['paths_done'] == 7 * 50
+
+        # No price history needed: the fitted parameters are in the checkpoint
+        resumed = run_chunk('AAPL', None, 20, 2000, LEVELS, 1, 2, seed=9,
+                            checkpoint_store=store, checkpoint_interval=0)
+        assert resumed['summary'] == expected['summary']
+        assert resumed['parameters'] == expected['parameters']
+        assert find_checkpoint(store, identity)['paths_done'] == 1000
+
+    def test_checkpoints_are_periodic(self, historical_data, temp_dir, small_blocks):
+        store = LocalCheckpointStore(temp_dir)
+        with patch.object(store, 'save', wraps=store.save) as save:
+            run_chunk('AAPL', historical_data, 20, 1000, LEVELS, 0, 1, seed=9,
+                      checkpoint_store=store, checkpoint_interval=3600)
+        # Only the final checkpoint within the interval
+        assert save.call_count == 1
+
+    def test_checkpoint_of_other_run_is_ignored(self, historical_data, temp_dir):
+        store = LocalCheckpointStore(temp_dir)
+        identity = chunk_identity('AAPL', 20, 1000, LEVELS, 0, 1, 9)
+        store.save(checkpoint_key(identity), {'run': dict(identity, seed=10), 'paths_done': 500})
+
+        assert find_checkpoint(store, identity) is None
+        with pytest.raises(ValueError):
+            run_chunk('AAPL', None, 20, 1000, LEVELS, 0, 1, seed=9, checkpoint_store=store)
@@ -4,6 +4,10 @@ import numpy as np
 import tempfile
 import shutil
 import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock, patch
 import sys
@@ -11,7 +15,7 @@ import sys
 # Add src directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from data_fetcher import DataFetcher
+from data_fetcher import DataFetcher, RateLimiter, RateLimitExceeded, SingleFlight
 
 
 class TestDataFetcher:
@@ -90,9 +94,10 @@ class TestDataFetcher:
 
         # Check that cache files exist
         cache_path = data_fetcher._get_cache_path(ticker, period)
-        meta_path = data_fetcher._get_cache_meta_path(ticker, period)
         assert cache_path.exists()
-        assert meta_path.exists()
+        meta = data_fetcher._read_cache_meta(ticker, period)
+        assert meta['rows'] == len(sample_stock_data_renamed)
+        assert meta['bytes'] == cache_path.stat().st_size
 
         # Load from cache
         loaded_data = data_fetcher._load_from_cache(ticker, period)
@@ -253,16 +258,73 @@ class TestDataFetcher:
         data_fetcher._save_to_cache(ticker, period, sample_stock_data_renamed)
 
         cache_path = data_fetcher._get_cache_path(ticker, period)
-        meta_path = data_fetcher._get_cache_meta_path(ticker, period)
 
         assert cache_path.exists()
-        assert meta_path.exists()
+        assert data_fetcher._read_cache_meta(ticker, period) is not None
 
         # Clear specific cache
         data_fetcher.clear_cache(ticker, period)
 
         assert not cache_path.exists()
+        assert data_fetcher._read_cache_meta(ticker, period) is None
+
+    def test_clear_cache_older_than(self, data_fetcher, sample_stock_data_renamed):
+        """Bulk invalidation removes only entries cached before the cutoff"""
+        from datetime import datetime, timedelta
+        for ticker in ("AAPL", "MSFT", "GOOGL"):
+            data_fetcher._save_to_cache(ticker, "1y", sample_stock_data_renamed)
+        for ticker in ("AAPL", "MSFT"):
+            meta = data_fetcher._read_cache_meta(ticker, "1y")
+            meta['cached_at'] = (datetime.now() - timedelta(days=10)).isoformat()
+            data_fetcher._write_cache_meta(ticker, "1y", meta)
+
+        data_fetcher.clear_cache(older_than_days=7)
+
+        assert data_fetcher.get_cache_info()['cached_tickers'] == ['GOOGL']
+        assert not data_fetcher._get_cache_path("AAPL", "1y").exists()
+        assert data_fetcher._get_cache_path("GOOGL", "1y").exists()
+
+    def test_legacy_meta_files_imported_into_index(self, temp_cache_dir, mock_config,
+                                                   sample_stock_data_renamed):
+        """Sidecar metadata from older versions is moved into the index on startup"""
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+        fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+        meta = fetcher._read_cache_meta("AAPL", "1y")
+        fetcher.cache_index.close()
+        (Path(temp_cache_dir) / '.cache_index.db').unlink()
+
+        meta_path = Path(temp_cache_dir) / "AAPL_1y_meta.json"
+        meta_path.write_text(json.dumps({key: meta[key] for key in
+                                         ('ticker', 'period', 'cached_at', 'rows', 'format')}))
+
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
         assert not meta_path.exists()
+        assert fetcher._read_cache_meta("AAPL", "1y")['cached_at'] == meta['cached_at']
+        assert fetcher._is_cache_valid("AAPL", "1y")
+
+    def test_meta_files_only_scanned_when_index_rebuilt(self, temp_cache_dir, mock_config):
+        """An existing index of the current schema skips the sidecar scan"""
+        DataFetcher(cache_dir=temp_cache_dir, config=mock_config).cache_index.close()
+
+        with patch.object(DataFetcher, '_import_meta_files') as mock_import:
+            DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+            mock_import.assert_not_called()
+
+        # A schema change drops the old table and rebuilds from sidecars
+        conn = sqlite3.connect(Path(temp_cache_dir) / '.cache_index.db')
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+        with patch.object(DataFetcher, '_import_meta_files') as mock_import:
+            DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+            mock_import.assert_called_once()
+
+    def test_load_records_last_access(self, data_fetcher, sample_stock_data_renamed):
+        data_fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+        assert data_fetcher._read_cache_meta("AAPL", "1y")['last_access'] is None
+
+        data_fetcher._load_from_cache("AAPL", "1y")
+        assert data_fetcher._read_cache_meta("AAPL", "1y")['last_access'] is not None
 
     def test_get_cache_info(self, data_fetcher, sample_stock_data_renamed):
         """Test getting cache information"""
@@ -281,6 +343,59 @@ class TestDataFetcher:
         assert 'AAPL' in info['cached_tickers']
         assert 'MSFT' in info['cached_tickers']
 
+    def test_memory_cache_serves_repeat_reads(self, data_fetcher, sample_stock_data_renamed):
+        data_fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+
+        with patch.object(data_fetcher, '_read_cache_file', wraps=data_fetcher._read_cache_file) as reads:
+            first, _ = data_fetcher.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+            first['Close'] = 0.0  # callers get copies
+            second, is_from_cache = data_fetcher.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+
+        assert reads.call_count == 1
+        assert is_from_cache
+        assert (second['Close'] != 0.0).all()
+
+        stats = data_fetcher.get_cache_info()['memory_cache']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+        # A rewrite of the entry invalidates the in-memory copy
+        data_fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed * 2)
+        third, _ = data_fetcher.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+        np.testing.assert_allclose(third['Close'].values, sample_stock_data_renamed['Close'].values * 2)
+
+    def test_memory_cache_is_bounded(self):
+        from data_fetcher import MemoryLRU
+        lru = MemoryLRU(capacity=2)
+        frame = pd.DataFrame({'Close': [1.0]})
+
+        lru.put(('A', '1y', None), 't', frame)
+        lru.put(('B', '1y', None), 't', frame)
+        assert lru.get(('A', '1y', None), 't') is not None
+        lru.put(('C', '1y', None), 't', frame)
+
+        assert lru.get(('B', '1y', None), 't') is None
+        assert lru.get(('A', '1y', None), 't') is not None
+        assert lru.get(('A', '1y', None), 'newer') is None
+
+    def test_disk_quota_evicts_least_recently_used(self, temp_cache_dir, mock_config,
+                                                   sample_stock_data_renamed):
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+        fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+        entry_bytes = fetcher._read_cache_meta("AAPL", "1y")['bytes']
+
+        # Room for two entries
+        fetcher.cache_max_bytes = int(entry_bytes * 2.5)
+        fetcher._save_to_cache("MSFT", "1y", sample_stock_data_renamed)
+        fetcher._load_from_cache("AAPL", "1y")  # AAPL is now more recently used than MSFT
+        fetcher._save_to_cache("GOOGL", "1y", sample_stock_data_renamed)
+
+        info = fetcher.get_cache_info()
+        assert info['cached_tickers'] == ['AAPL', 'GOOGL']
+        assert info['evictions'] == 1
+        assert not fetcher._get_cache_path("MSFT", "1y").exists()
+        assert fetcher.cache_index.stats()['bytes'] <= fetcher.cache_max_bytes
+
     def test_api_key_from_config(self, temp_cache_dir):
         """Test API key loaded from config"""
         config = {
@@ -323,3 +438,476 @@ class TestDataFetcher:
 
             with pytest.raises(ValueError, match="No API key provided and no cached data available"):
                 fetcher.fetch_ticker_data('AAPL', '1y')
+
+    @pytest.mark.parametrize('cache_format', ['parquet', 'feather'])
+    def test_binary_cache_round_trip(self, temp_cache_dir, mock_config, sample_stock_data_renamed, cache_format):
+        """Binary cache formats keep a datetime index, float prices and integer volume"""
+        mock_config['data']['cache_format'] = cache_format
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+        fetcher._save_to_cache("TEST", "1y", sample_stock_data_renamed)
+
+        cache_path = fetcher._get_cache_path("TEST", "1y")
+        assert cache_path.suffix == f".{cache_format}"
+        assert cache_path.exists()
+
+        loaded = fetcher._load_from_cache("TEST", "1y")
+        assert isinstance(loaded.index, pd.DatetimeIndex)
+        assert list(loaded.columns) == list(sample_stock_data_renamed.columns)
+        assert all(loaded[col].dtype == np.float64 for col in ['Open', 'High', 'Low', 'Close'])
+        assert loaded['Volume'].dtype == np.int64
+        np.testing.assert_allclose(loaded['Close'].values, sample_stock_data_renamed['Close'].values)
+
+        # Column projection reads only Close
+        close_only = fetcher._load_from_cache("TEST", "1y", columns=['Close'])
+        assert list(close_only.columns) == ['Close']
+        assert isinstance(close_only.index, pd.DatetimeIndex)
+
+    def test_cache_float32_dtype(self, temp_cache_dir, mock_config, sample_stock_data_renamed):
+        mock_config['data']['cache_format'] = 'parquet'
+        mock_config['data']['cache_float_dtype'] = 'float32'
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+        fetcher._save_to_cache("TEST", "1y", sample_stock_data_renamed)
+        loaded = fetcher._load_from_cache("TEST", "1y", columns=['Close'])
+
+        assert loaded['Close'].dtype == np.float32
+
+    def test_cache_float32_keeps_volume_exact(self, temp_cache_dir, mock_config, sample_stock_data_renamed):
+        """Volumes above 2**24 survive a float32 cache unchanged"""
+        mock_config['data']['cache_format'] = 'parquet'
+        mock_config['data']['cache_float_dtype'] = 'float32'
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+        data = sample_stock_data_renamed.copy()
+        data['Volume'] = 123_456_789 + np.arange(len(data))
+        fetcher._save_to_cache("TEST", "1y", data)
+        loaded = fetcher._load_from_cache("TEST", "1y")
+
+        assert loaded['Volume'].dtype == np.int64
+        np.testing.assert_array_equal(loaded['Volume'].values, data['Volume'].values)
+
+    def test_csv_cache_migrates_to_binary(self, temp_cache_dir, mock_config, sample_stock_data_renamed):
+        """Existing CSV entries are converted on first load and keep their cached_at"""
+        csv_fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+        csv_fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+        original_meta = csv_fetcher._read_cache_meta("AAPL", "1y")
+
+        mock_config['data']['cache_format'] = 'parquet'
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+        with patch.object(fetcher, 'rate_limiter') as mock_limiter:
+            result, is_from_cache = fetcher.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+            mock_limiter.wait_if_needed.assert_not_called()
+
+        assert is_from_cache
+        assert list(result.columns) == ['Close']
+        assert len(result) == len(sample_stock_data_renamed)
+        assert fetcher._get_cache_path("AAPL", "1y").exists()
+        assert not fetcher._get_cache_path("AAPL", "1y", 'csv').exists()
+
+        meta = fetcher._read_cache_meta("AAPL", "1y")
+        assert meta['format'] == 'parquet'
+        assert meta['cached_at'] == original_meta['cached_at']
+
+    def test_unsupported_cache_format(self, temp_cache_dir, mock_config):
+        mock_config['data']['cache_format'] = 'xlsx'
+        with pytest.raises(ValueError, match="Unsupported cache format"):
+            DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+    def test_binary_cache_falls_back_without_pyarrow(self, temp_cache_dir, mock_config):
+        mock_config['data']['cache_format'] = 'parquet'
+        with patch('data_fetcher.PYARROW_AVAILABLE', False):
+            fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+        assert fetcher.cache_format == 'csv'
+
+    @patch('data_fetcher.TimeSeries')
+    def test_fetch_ticker_data_projects_columns(self, mock_ts_class, data_fetcher, sample_stock_data_alpha_vantage):
+        """Fresh fetches cache every column but return only the requested ones"""
+        mock_ts = Mock()
+        mock_ts.get_daily.return_value = (sample_stock_data_alpha_vantage, {})
+        data_fetcher.ts = mock_ts
+
+        result, is_from_cache = data_fetcher.fetch_ticker_data("AAPL", period="1y", columns=['Close'])
+
+        assert list(result.columns) == ['Close']
+        assert not is_from_cache
+        cached = data_fetcher._load_from_cache("AAPL", "1y")
+        assert list(cached.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def test_concurrent_fetches_share_one_api_call(self, data_fetcher, sample_stock_data_alpha_vantage):
+        """Callers arriving while a fetch is in flight wait for it instead of calling the API"""
+        release = threading.Event()
+
+        def slow_get_daily(symbol, outputsize):
+            release.wait(timeout=5)
+            return sample_stock_data_alpha_vantage, {}
+
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.side_effect = slow_get_daily
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(data_fetcher.fetch_ticker_data, "AAPL", "1y",
+                                       columns=['Close'] if i % 2 else None)
+                       for i in range(4)]
+            while data_fetcher.ts.get_daily.call_count == 0:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert data_fetcher.ts.get_daily.call_count == 1
+        assert all(not is_from_cache for _, is_from_cache in results)
+        assert list(results[0][0].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert list(results[1][0].columns) == ['Close']
+
+    def test_fetch_many_serves_cache_hits_and_fetches_misses(self, data_fetcher, sample_stock_data_renamed,
+                                                             sample_stock_data_alpha_vantage):
+        data_fetcher._save_to_cache("AAPL", "1y", sample_stock_data_renamed)
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.return_value = (sample_stock_data_alpha_vantage, {})
+
+        results = data_fetcher.fetch_many(["aapl", "MSFT", "msft"], period="1y", columns=['Close'])
+
+        assert list(results) == ["AAPL", "MSFT"]
+        assert results["AAPL"][1] is True
+        assert results["MSFT"][1] is False
+        assert list(results["MSFT"][0].columns) == ['Close']
+        data_fetcher.ts.get_daily.assert_called_once()
+        assert data_fetcher.ts.get_daily.call_args.kwargs['symbol'] == "MSFT"
+
+    def test_fetch_many_reports_failures_as_empty(self, temp_cache_dir):
+        with patch.dict('os.environ', {}, clear=True):
+            fetcher = DataFetcher(cache_dir=temp_cache_dir, config={})
+
+        results = fetcher.fetch_many(["AAPL"])
+
+        assert results["AAPL"][0].empty
+        assert results["AAPL"][1] is False
+
+    @staticmethod
+    def _daily_frame(start, periods, alpha_vantage_columns=False, base=100.0):
+        dates = pd.date_range(start, periods=periods, freq='D')
+        values = base + np.arange(periods, dtype=float)
+        columns = (['1. open', '2. high', '3. low', '4. close', '5. volume'] if alpha_vantage_columns
+                   else ['Open', 'High', 'Low', 'Close', 'Volume'])
+        return pd.DataFrame({column: values for column in columns}, index=dates)
+
+    @staticmethod
+    def _expire_cache(fetcher, ticker, period):
+        from datetime import datetime, timedelta
+        meta = fetcher._read_cache_meta(ticker, period)
+        meta['cached_at'] = (datetime.now() - timedelta(days=2)).isoformat()
+        fetcher._write_cache_meta(ticker, period, meta)
+
+    def test_incremental_refresh_appends_tail(self, data_fetcher):
+        """Expired cache entries are topped up with a compact fetch"""
+        today = pd.Timestamp.now().normalize()
+        cached = self._daily_frame(today - pd.Timedelta(days=59), 50)   # through 10 days ago
+        data_fetcher._save_to_cache("AAPL", "1y", cached)
+        self._expire_cache(data_fetcher, "AAPL", "1y")
+        cache_path = data_fetcher._get_cache_path("AAPL", "1y")
+        lines_before = cache_path.read_text().splitlines()
+
+        # Compact response overlaps the cache and adds 9 new days
+        compact = self._daily_frame(today - pd.Timedelta(days=99), 99, alpha_vantage_columns=True)
+        mock_ts = Mock()
+        mock_ts.get_daily.return_value = (compact, {})
+        data_fetcher.ts = mock_ts
+
+        result, is_from_cache = data_fetcher.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+
+        mock_ts.get_daily.assert_called_once_with(symbol="AAPL", outputsize="compact")
+        assert not is_from_cache
+        assert len(result) == 59
+        assert result.index.max() == compact.index.max()
+        assert result.index.is_monotonic_increasing
+
+        # Existing rows are untouched; only the new rows were appended
+        lines_after = cache_path.read_text().splitlines()
+        assert lines_after[:len(lines_before)] == lines_before
+        assert len(lines_after) == len(lines_before) + 9
+
+        meta = data_fetcher._read_cache_meta("AAPL", "1y")
+        assert meta['refresh'] == 'incremental'
+        assert meta['rows'] == 59
+        assert data_fetcher._is_cache_valid("AAPL", "1y")
+
+    def test_incremental_refresh_rewrites_binary_cache(self, temp_cache_dir, mock_config):
+        mock_config['data']['cache_format'] = 'parquet'
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+
+        today = pd.Timestamp.now().normalize()
+        fetcher._save_to_cache("AAPL", "1y", self._daily_frame(today - pd.Timedelta(days=40), 35))
+        self._expire_cache(fetcher, "AAPL", "1y")
+
+        compact = self._daily_frame(today - pd.Timedelta(days=99), 100, alpha_vantage_columns=True)
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.return_value = (compact, {})
+
+        result, _ = fetcher.fetch_ticker_data("AAPL", "1y")
+
+        assert len(result) == 41
+        cached = fetcher._load_from_cache("AAPL", "1y")
+        assert len(cached) == 41
+        assert cached.index.max() == today
+
+    def test_incremental_refresh_trims_stale_csv_rows(self, data_fetcher):
+        """Rows that age out of the period are hidden, then compacted away"""
+        today = pd.Timestamp.now().normalize()
+        # 1mo period: cache spans 40 days so 10 rows are already stale
+        data_fetcher._save_to_cache("AAPL", "1mo", self._daily_frame(today - pd.Timedelta(days=41), 40))
+        self._expire_cache(data_fetcher, "AAPL", "1mo")
+
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.return_value = (
+            self._daily_frame(today - pd.Timedelta(days=99), 100, alpha_vantage_columns=True), {})
+
+        result, _ = data_fetcher.fetch_ticker_data("AAPL", "1mo")
+        cached = data_fetcher._load_from_cache("AAPL", "1mo")
+
+        assert len(cached) == len(result)
+        assert cached.index.min() >= today - pd.Timedelta(days=31)
+        assert data_fetcher._read_cache_meta("AAPL", "1mo")['trim_before'] is not None
+
+    def test_repeated_incremental_refreshes_compact_csv(self, data_fetcher):
+        """Daily refreshes keep the CSV within INCREMENTAL_COMPACT_ROWS stale rows"""
+        from data_fetcher import INCREMENTAL_COMPACT_ROWS
+        start = pd.Timestamp('2024-01-01')
+        data_fetcher._save_to_cache("AAPL", "1y", self._daily_frame(start, 100))
+        cache_path = data_fetcher._get_cache_path("AAPL", "1y")
+
+        # Simulate 200 daily refreshes: each adds a day and moves the period
+        # cutoff forward by one
+        for day in range(1, 201):
+            cutoff = start + pd.Timedelta(days=day)
+            new_row = self._daily_frame(start + pd.Timedelta(days=99 + day), 1)
+            with patch.object(data_fetcher, '_period_cutoff', return_value=cutoff.to_pydatetime()):
+                cached = data_fetcher._load_from_cache("AAPL", "1y")
+                data_fetcher._append_to_cache("AAPL", "1y", cached, new_row)
+
+        visible = data_fetcher._load_from_cache("AAPL", "1y")
+        disk_rows = len(cache_path.read_text().splitlines()) - 1
+
+        assert len(visible) == 100
+        assert data_fetcher._read_cache_meta("AAPL", "1y")['rows'] == 100
+        assert disk_rows < len(visible) + INCREMENTAL_COMPACT_ROWS
+
+    def test_incremental_refresh_skipped_for_large_gap(self, data_fetcher, sample_stock_data_alpha_vantage):
+        """Cache too old for a compact fetch to bridge falls back to a full download"""
+        data_fetcher._save_to_cache("AAPL", "2y", self._daily_frame('2020-01-01', 50))
+        self._expire_cache(data_fetcher, "AAPL", "2y")
+
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.return_value = (sample_stock_data_alpha_vantage, {})
+
+        result, _ = data_fetcher.fetch_ticker_data("AAPL", "2y")
+
+        data_fetcher.ts.get_daily.assert_called_once_with(symbol="AAPL", outputsize="full")
+        assert len(result) == len(sample_stock_data_alpha_vantage)
+
+    def test_stale_cache_served_while_refreshing_in_background(self, data_fetcher):
+        """Entries within the hard expiry return immediately; the refresh runs on another thread"""
+        today = pd.Timestamp.now().normalize()
+        data_fetcher._save_to_cache("AAPL", "1y", self._daily_frame(today - pd.Timedelta(days=99), 95))
+        data_fetcher.cache_hard_expiry_days = 7
+        self._expire_cache(data_fetcher, "AAPL", "1y")
+
+        release = threading.Event()
+        compact = self._daily_frame(today - pd.Timedelta(days=99), 100, alpha_vantage_columns=True)
+
+        def slow_get_daily(symbol, outputsize):
+            release.wait(timeout=5)
+            return compact, {}
+
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.side_effect = slow_get_daily
+
+        result, is_from_cache = data_fetcher.fetch_ticker_data("AAPL", "1y")
+        assert is_from_cache
+        assert len(result) == 95
+        assert data_fetcher._cache_state("AAPL", "1y") == 'stale'
+
+        # A second stale read does not start another refresh
+        data_fetcher.fetch_ticker_data("AAPL", "1y")
+        assert len(data_fetcher._background_refreshes) == 1
+
+        release.set()
+        assert data_fetcher.wait_for_background_refreshes(timeout=5)
+
+        data_fetcher.ts.get_daily.assert_called_once()
+        assert data_fetcher._cache_state("AAPL", "1y") == 'fresh'
+        assert len(data_fetcher._load_from_cache("AAPL", "1y")) == 100
+
+    def test_hard_expired_cache_blocks_on_refresh(self, data_fetcher):
+        today = pd.Timestamp.now().normalize()
+        data_fetcher._save_to_cache("AAPL", "1y", self._daily_frame(today - pd.Timedelta(days=99), 95))
+        data_fetcher.cache_hard_expiry_days = 1.5
+        self._expire_cache(data_fetcher, "AAPL", "1y")
+
+        compact = self._daily_frame(today - pd.Timedelta(days=99), 100, alpha_vantage_columns=True)
+        data_fetcher.ts = Mock()
+        data_fetcher.ts.get_daily.return_value = (compact, {})
+
+        assert data_fetcher._cache_state("AAPL", "1y") == 'expired'
+        result, is_from_cache = data_fetcher.fetch_ticker_data("AAPL", "1y")
+
+        assert not is_from_cache
+        assert len(result) == 100
+        assert data_fetcher._background_refreshes == {}
+
+    def test_hard_expiry_never_shorter_than_cache_duration(self, temp_cache_dir, mock_config):
+        mock_config['data']['cache_duration_days'] = 3
+        mock_config['data']['cache_hard_expiry_days'] = 1
+        fetcher = DataFetcher(cache_dir=temp_cache_dir, config=mock_config)
+        assert fetcher.cache_hard_expiry_days == 3
+
+
+class TestRateLimiter:
+
+    @pytest.fixture
+    def clock(self):
+        """Controllable wall clock patched into the rate limiter"""
+        from datetime import datetime
+
+        class Clock:
+            now = datetime(2024, 1, 2, 12, 0, 0).timestamp()
+
+            def time(self):
+                return self.now
+
+            def sleep(self, seconds):
+                self.now += seconds
+
+        clock = Clock()
+        with patch('data_fetcher.time.time', side_effect=clock.time):
+            yield clock
+
+    def test_try_acquire_returns_wait_time(self, clock):
+        limiter = RateLimiter(calls_per_minute=2, daily_limit=10)
+
+        assert limiter.try_acquire() == 0.0
+        clock.now += 10
+        assert limiter.try_acquire() == 0.0
+        clock.now += 5
+
+        # Oldest call leaves the window 45 seconds from now
+        assert limiter.try_acquire() == pytest.approx(45.0)
+        assert limiter.daily_calls == 2
+
+        clock.now += 45
+        assert limiter.try_acquire() == 0.0
+
+    def test_try_acquire_does_not_raise_on_daily_limit(self, clock):
+        limiter = RateLimiter(calls_per_minute=100, daily_limit=2)
+
+        assert limiter.try_acquire() == 0.0
+        assert limiter.try_acquire() == 0.0
+        # 12:00 -> midnight is 12 hours away
+        assert limiter.try_acquire() == pytest.approx(12 * 3600)
+
+    def test_acquire_sleeps_outside_lock(self, clock):
+        limiter = RateLimiter(calls_per_minute=1, daily_limit=10)
+        limiter.acquire()
+
+        def sleep_without_lock(seconds):
+            # Another thread must be able to take the lock while we wait
+            assert limiter.lock.acquire(blocking=False)
+            limiter.lock.release()
+            clock.sleep(seconds)
+
+        with patch('data_fetcher.time.sleep', side_effect=sleep_without_lock) as mock_sleep:
+            limiter.acquire()
+
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args.args[0] == pytest.approx(60.0)
+        assert limiter.daily_calls == 2
+
+    def test_acquire_raises_on_daily_limit(self, clock):
+        limiter = RateLimiter(calls_per_minute=10, daily_limit=1)
+        limiter.wait_if_needed()
+
+        with pytest.raises(RateLimitExceeded, match="Daily API limit of 1 calls exceeded"):
+            limiter.acquire()
+
+    def test_daily_counter_resets(self, clock):
+        limiter = RateLimiter(calls_per_minute=10, daily_limit=1)
+        limiter.acquire()
+
+        clock.now += 24 * 3600
+        assert limiter.try_acquire() == 0.0
+        assert limiter.daily_calls == 1
+
+    def test_acquire_async(self, clock):
+        import asyncio
+
+        limiter = RateLimiter(calls_per_minute=1, daily_limit=10)
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock.sleep(seconds)
+
+        async def acquire_twice():
+            await limiter.acquire_async()
+            await limiter.acquire_async()
+
+        with patch('data_fetcher.asyncio.sleep', side_effect=fake_sleep):
+            asyncio.run(acquire_twice())
+
+        assert sleeps == [pytest.approx(60.0)]
+        assert limiter.daily_calls == 2
+
+
+
+class TestSingleFlight:
+
+    def test_waiters_share_result(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(flight.do, 'key', work)
+            started.wait(timeout=5)
+            followers = [executor.submit(flight.do, 'key', work) for _ in range(2)]
+            time.sleep(0.05)
+            release.set()
+
+            assert leader.result() == ('result', False)
+            assert [f.result() for f in followers] == [('result', True)] * 2
+
+        assert len(calls) == 1
+        assert flight.calls == {}
+
+    def test_waiters_receive_leader_error(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(timeout=5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, 'key', fail)
+            started.wait(timeout=5)
+            follower = executor.submit(flight.do, 'key', fail)
+            time.sleep(0.05)
+            release.set()
+
+            with pytest.raises(ValueError):
+                leader.result()
+            with pytest.raises(ValueError):
+                follower.result()
+
+        # Key is released, so the next call runs again
+        assert flight.do('key', lambda: 42) == (42, False)
@@ -0,0 +1,196 @@
+import pytest
+import pandas as pd
+import numpy as np
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_fetcher import DataFetcher
+from data_sources import LocalDatasetSource, create_data_source
+
+
+TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
+
+
+def _vendor_dump(days=400):
+    """Long-format end-of-day dump with vendor-style lower-case columns"""
+    end = pd.Timestamp.now().normalize()
+    dates = pd.bdate_range(end=end, periods=days)
+    frames = []
+    for i, ticker in enumerate(TICKERS):
+        close = 100.0 * (i + 1) + np.arange(days, dtype=float)
+        frames.append(pd.DataFrame({
+            'ticker': ticker,
+            'date': dates,
+            'open': close - 0.5,
+            'high': close + 1.0,
+            'low': close - 1.0,
+            'close': close,
+            'volume': 1_000_000 + i
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestLocalDatasetSource:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def parquet_dataset(self, temp_dir):
+        root = Path(temp_dir) / 'eod'
+        pq.write_to_dataset(pa.Table.from_pandas(_vendor_dump(), preserve_index=False),
+                            root, partition_cols=['ticker'])
+        return str(root)
+
+    @pytest.fixture
+    def csv_dataset(self, temp_dir):
+        root = Path(temp_dir) / 'eod_csv'
+        root.mkdir()
+        dump = _vendor_dump()
+        dump['date'] = dump['date'].dt.strftime('%Y-%m-%d')
+        # Two flat files, each holding several tickers
+        dump[dump['ticker'].isin(TICKERS[:2])].to_csv(root / 'part-0.csv', index=False)
+        dump[dump['ticker'].isin(TICKERS[2:])].to_csv(root / 'part-1.csv', index=False)
+        return str(root)
+
+    def test_load_pushes_down_ticker_and_date(self, parquet_dataset):
+        source = LocalDatasetSource(parquet_dataset)
+        start = datetime.now() - timedelta(days=30)
+
+        frames = source.load(['AAPL', 'MSFT', 'NOPE'], start=start, columns=['Close'])
+
+        assert sorted(frames) == ['AAPL', 'MSFT']
+        for frame in frames.values():
+            assert list(frame.columns) == ['Close']
+            assert frame.index.name == 'Date'
+            assert frame.index.min() >= pd.Timestamp(start.date())
+            assert frame.index.is_monotonic_increasing
+            assert frame['Close'].dtype == 'float64'
+
+    def test_load_close_is_wide(self, parquet_dataset):
+        close = LocalDatasetSource(parquet_dataset).load_close(TICKERS)
+
+        assert sorted(close.columns) == sorted(TICKERS)
+        assert len(close) == 400
+        assert close['MSFT'].iloc[-1] == 200.0 + 399
+
+    def test_csv_dataset_without_partitioning(self, csv_dataset):
+        source = LocalDatasetSource(csv_dataset, file_format='csv', partitioning=None)
+        frames = source.load(['GOOGL'], start=datetime.now() - timedelta(days=10))
+
+        assert list(frames) == ['GOOGL']
+        assert list(frames['GOOGL'].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert len(frames['GOOGL']) <= 10
+
+    def test_missing_columns_rejected(self, temp_dir):
+        root = Path(temp_dir) / 'bad'
+        root.mkdir()
+        pd.DataFrame({'symbol': ['AAPL'], 'date': ['2024-01-02'], 'close': [1.0]}).to_csv(
+            root / 'part-0.csv', index=False)
+
+        with pytest.raises(ValueError, match="no 'ticker' column"):
+            LocalDatasetSource(str(root), file_format='csv', partitioning=None)
+
+        source = LocalDatasetSource(str(root), file_format='csv', partitioning=None, ticker_column='symbol')
+        assert source.column_map == {'Close': 'close'}
+
+    def test_create_data_source(self, parquet_dataset):
+        assert create_data_source({}) is None
+        source = create_data_source({'data_source': 'local_dataset', 'dataset_path': parquet_dataset})
+        assert isinstance(source, LocalDatasetSource)
+
+        with pytest.raises(ValueError, match="Unsupported data source"):
+            create_data_source({'data_source': 'bloomberg'})
+
+    def test_fetcher_serves_dataset_without_api(self, parquet_dataset, temp_dir):
+        config = {'data': {'alpha_vantage_api_key': 'TEST_API_KEY', 'data_source': 'local_dataset',
+                           'dataset_path': parquet_dataset}}
+        fetcher = DataFetcher(cache_dir=str(Path(temp_dir) / 'cache'), config=config)
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.side_effect = AssertionError("API must not be called for dataset tickers")
+
+        results = fetcher.fetch_many(['aapl', 'MSFT'], period='1y', columns=['Close'])
+        assert all(is_from_cache and not data.empty for data, is_from_cache in results.values())
+
+        single, _ = fetcher.fetch_ticker_data('GOOGL', period='1y')
+        assert list(single.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+        close = fetcher.fetch_close_many(TICKERS, period='6mo')
+        assert sorted(close.columns) == sorted(TICKERS)
+
+    def test_fetcher_falls_back_for_unknown_tickers(self, parquet_dataset, temp_dir):
+        fetcher = DataFetcher(cache_dir=str(Path(temp_dir) / 'cache'),
+                              config={'data': {'alpha_vantage_api_key': 'TEST_API_KEY'}},
+                              data_source=LocalDatasetSource(parquet_dataset))
+        dates = pd.date_range(datetime.now() - timedelta(days=60), periods=60, freq='D')
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.return_value = (pd.DataFrame({
+            '1. open': 1.0, '2. high': 1.0, '3. low': 1.0, '4. close': 1.0, '5. volume': 1.0
+        }, index=dates), {})
+
+        results = fetcher.fetch_many(['AAPL', 'TSLA'], period='1y')
+
+        assert results['AAPL'][1] is True
+        assert results['TSLA'][1] is False
+        fetcher.ts.get_daily.assert_called_once()
+        assert fetcher.ts.get_daily.call_args.kwargs['symbol'] == 'TSLA'
+
+    def test_fetch_many_scans_dataset_once(self, parquet_dataset, temp_dir):
+        """Tickers missing from the dataset fall back without another scan each"""
+        source = LocalDatasetSource(parquet_dataset)
+        fetcher = DataFetcher(cache_dir=str(Path(temp_dir) / 'cache'),
+                              config={'data': {'alpha_vantage_api_key': 'TEST_API_KEY'}},
+                              data_source=source)
+        dates = pd.date_range(datetime.now() - timedelta(days=60), periods=60, freq='D')
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.return_value = (pd.DataFrame({
+            '1. open': 1.0, '2. high': 1.0, '3. low': 1.0, '4. close': 1.0, '5. volume': 1.0
+        }, index=dates), {})
+
+        with patch.object(source, 'load', wraps=source.load) as mock_load:
+            results = fetcher.fetch_many(['AAPL', 'MSFT', 'TSLA', 'NFLX'], period='1y')
+
+        mock_load.assert_called_once()
+        assert sorted(mock_load.call_args.args[0]) == ['AAPL', 'MSFT', 'NFLX', 'TSLA']
+        assert [results[t][1] for t in ('AAPL', 'MSFT', 'TSLA', 'NFLX')] == [True, True, False, False]
+
+    def test_fetcher_falls_back_when_bulk_data_is_invalid(self, parquet_dataset, temp_dir):
+        """Bulk data that fails validation is fetched through the normal path"""
+        source = LocalDatasetSource(parquet_dataset)
+        fetcher = DataFetcher(cache_dir=str(Path(temp_dir) / 'cache'),
+                              config={'data': {'alpha_vantage_api_key': 'TEST_API_KEY'}},
+                              data_source=source)
+        dates = pd.date_range(datetime.now() - timedelta(days=60), periods=60, freq='D')
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.return_value = (pd.DataFrame({
+            '1. open': 1.0, '2. high': 1.0, '3. low': 1.0, '4. close': 1.0, '5. volume': 1.0
+        }, index=dates), {})
+
+        load = source.load
+        def load_with_bad_msft(tickers, *args, **kwargs):
+            frames = load(tickers, *args, **kwargs)
+            if 'MSFT' in frames:
+                frames['MSFT'] = frames['MSFT'].iloc[0:0]
+            return frames
+
+        with patch.object(source, 'load', side_effect=load_with_bad_msft):
+            results = fetcher.fetch_many(['AAPL', 'MSFT'], period='1y')
+            assert results['AAPL'][1] is True
+            assert results['MSFT'][1] is False and not results['MSFT'][0].empty
+            assert fetcher.ts.get_daily.call_args.kwargs['symbol'] == 'MSFT'
+
+            single, _ = fetcher.fetch_ticker_data('MSFT', period='1y')
+            assert not single.empty
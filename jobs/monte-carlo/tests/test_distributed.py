@@ -0,0 +1,163 @@
+import pytest
+import json
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from distributed import (PartialSummary, chunk_seed, chunk_sizes, final_price_blocks, fit_parameters,
+                         load_partials, partial_filename, reduce_partials, reduce_runs, run_chunk, SKETCH_WIDTH)
+from monte_carlo import MonteCarloSimulator
+from tests.fake_gcs import FakeStorageClient
+
+
+LEVELS = [0.95, 0.99]
+
+
+class TestDistributedRuns:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def historical_data(self):
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        close = 100 * np.exp(np.cumsum(np.random.RandomState(3).normal(0.0005, 0.02, 300)))
+        return pd.DataFrame({'Close': close}, index=dates)
+
+    def _chunks(self, historical_data, count=4, simulations=20000, days=60, seed=11):
+        return [run_chunk('AAPL', historical_data, days, simulations, LEVELS, index, count, seed)
+                for index in range(count)]
+
+    def test_chunk_seeds_are_spawned(self):
+        children = np.random.SeedSequence(11).spawn(3)
+        for index, child in enumerate(children):
+            assert chunk_seed(11, index).generate_state(4).tolist() == child.generate_state(4).tolist()
+        assert chunk_sizes(10, 3) == [4, 3, 3]
+        with pytest.raises(ValueError):
+            chunk_sizes(10, 0)
+
+    def test_chunks_are_reproducible_and_independent(self, historical_data):
+        first = run_chunk('AAPL', historical_data, 30, 1000, LEVELS, 1, 4, seed=5)
+        again = run_chunk('AAPL', historical_data, 30, 1000, LEVELS, 1, 4, seed=5)
+        other = run_chunk('AAPL', historical_data, 30, 1000, LEVELS, 2, 4, seed=5)
+
+        assert first['summary'] == again['summary']
+        assert first['summary']['mean'] != other['summary']['mean']
+        assert first['summary']['n'] == 250
+        with pytest.raises(ValueError):
+            run_chunk('AAPL', historical_data, 30, 1000, LEVELS, 4, 4, seed=5)
+
+    def test_chunks_use_the_run_fit(self, historical_data):
+        """Chunks given the dispatcher's fit need no history and match a chunk that fitted itself"""
+        fit = json.loads(json.dumps(fit_parameters(historical_data)))
+        fitted = run_chunk('AAPL', None, 30, 1000, LEVELS, 1, 4, seed=5, fit=fit)
+        assert fitted == dict(run_chunk('AAPL', historical_data, 30, 1000, LEVELS, 1, 4, seed=5),
+                              generated_at=fitted['generated_at'])
+
+        # A later, refreshed history does not change a chunk given the run's fit
+        refreshed = historical_data.copy()
+        refreshed.iloc[-1, 0] *= 1.1
+        later = run_chunk('AAPL', refreshed, 30, 1000, LEVELS, 2, 4, seed=5, fit=fit)
+        assert later['initial_price'] == fitted['initial_price'] and later['parameters'] == fitted['parameters']
+
+        with pytest.raises(ValueError, match="Insufficient historical data"):
+            fit_parameters(historical_data.iloc[:10])
+
+    def test_blocks_follow_gbm(self):
+        rng = np.random.default_rng(0)
+        with patch('distributed.MAX_BLOCK_VALUES', 1000):
+            blocks = list(final_price_blocks(100.0, 0.001, 0.02, 100, 95, rng))
+        assert [len(block) for block in blocks] == [10] * 9 + [5]
+
+        # Same draws, one path per row, as the day-by-day GBM recursion
+        rng, reference = np.random.default_rng(1), np.random.default_rng(1)
+        final = next(final_price_blocks(100.0, 0.001, 0.02, 20, 5, rng))
+        dW = reference.standard_normal((5, 20))
+        expected = 100.0 * np.exp(((0.001 - 0.5 * 0.02 ** 2) + 0.02 * dW).sum(axis=1))
+        np.testing.assert_allclose(final, expected, rtol=1e-12)
+
+    def test_merge_matches_pooled_statistics(self):
+        rng = np.random.default_rng(2)
+        parts = [100 * np.exp(rng.normal(0.01, 0.2, size)) for size in (5000, 1, 12000, 700)]
+        pooled = np.concatenate(parts)
+
+        merged = PartialSummary.for_parameters(100.0, 0.01, 0.2, 1)
+        for part in parts:
+            summary = PartialSummary.for_parameters(100.0, 0.01, 0.2, 1)
+            summary.add(part)
+            merged.merge(PartialSummary.from_dict(json.loads(json.dumps(summary.to_dict()))))
+
+        expected = MonteCarloSimulator().calculate_statistics(pooled)
+        stats = merged.statistics()
+        for key in ('mean', 'std', 'min', 'max', 'skewness', 'kurtosis'):
+            assert stats[key] == pytest.approx(expected[key], rel=1e-9)
+
+        # Quantiles are exact to within one histogram bin
+        bin_width = 2 * SKETCH_WIDTH * 0.2 / merged.bins
+        for key in ('median', 'q25', 'q75'):
+            assert stats[key] == pytest.approx(expected[key], rel=bin_width)
+        for level, value in merged.var(LEVELS).items():
+            assert value == pytest.approx(np.percentile(pooled, (1 - level) * 100), rel=bin_width)
+
+        with pytest.raises(ValueError):
+            merged.merge(PartialSummary(0.0, 1.0, 10))
+
+    def test_reduce_matches_run_simulation_format(self, historical_data):
+        partials = self._chunks(historical_data)
+        summary = reduce_partials(list(reversed(partials)))
+
+        reference = MonteCarloSimulator.summarize_results('AAPL', MonteCarloSimulator().run_simulation(
+            historical_data, days=60, simulations=20000, confidence_levels=LEVELS))
+
+        assert set(summary) >= set(reference)
+        assert set(summary['statistics']) == set(reference['statistics'])
+        assert set(summary['var']) == set(reference['var'])
+        assert summary['simulations'] == 20000 and summary['chunks'] == 4
+        assert summary['parameters'] == pytest.approx(reference['parameters'])
+        # Different random streams, same distribution
+        assert summary['statistics']['mean'] == pytest.approx(reference['statistics']['mean'], rel=0.01)
+        assert summary['var']['0.95'] == pytest.approx(reference['var']['0.95'], rel=0.02)
+
+    def test_reduce_rejects_incomplete_or_mixed_runs(self, historical_data):
+        partials = self._chunks(historical_data, simulations=400)
+
+        with pytest.raises(ValueError, match=r"Missing chunks of AAPL: \[2\]"):
+            reduce_partials(partials[:2] + partials[3:])
+        other_seed = run_chunk('AAPL', historical_data, 60, 400, LEVELS, 0, 4, seed=12)
+        with pytest.raises(ValueError, match="different runs"):
+            reduce_partials(partials + [other_seed])
+
+        summaries, errors = reduce_runs(partials[:3] + [other_seed])
+        assert summaries == [] and len(errors) == 2
+
+    def test_load_partials_from_directory_and_gcs(self, historical_data, temp_dir):
+        partials = self._chunks(historical_data, count=2, simulations=400)
+        for partial in partials:
+            alloc_dir = Path(temp_dir) / f"alloc-{partial['chunk_index']}"
+            alloc_dir.mkdir()
+            (alloc_dir / partial_filename('AAPL', partial['chunk_index'], 2)).write_text(json.dumps(partial))
+
+        summaries, errors = reduce_runs(load_partials(temp_dir))
+        assert errors == [] and summaries[0]['simulations'] == 400
+
+        fake_client = FakeStorageClient()
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = fake_client
+            from gcs_uploader import GCSUploader
+            uploader = GCSUploader()
+            for index in range(2):
+                uploader.upload_results_directory(str(Path(temp_dir) / f"alloc-{index}"), 'gs://bucket',
+                                                  prefix=f"alloc-{index}")
+
+            summaries, errors = reduce_runs(load_partials('gs://bucket'))
+        assert errors == [] and summaries[0]['chunks'] == 2
@@ -0,0 +1,133 @@
+import pytest
+import pandas as pd
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_fetcher import DataFetcher
+from fundamentals import FundamentalsStore
+
+
+def _overview(name, sector='Technology', industry='Software'):
+    return pd.DataFrame([{'Name': name, 'Sector': sector, 'Industry': industry,
+                          'MarketCapitalization': '1000', 'Exchange': 'NASDAQ'}]), None
+
+
+class TestFundamentalsStore:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _age(self, store, symbol, days):
+        store.conn.execute("UPDATE fundamentals SET fetched_at = ? WHERE symbol = ?",
+                           ((datetime.now() - timedelta(days=days)).isoformat(), symbol))
+
+    def test_put_get_and_ttl(self, temp_dir):
+        store = FundamentalsStore(Path(temp_dir) / 'f.db', ttl_days=30)
+        store.put('AAPL', {'symbol': 'AAPL', 'sector': 'Technology'})
+        store.put('SPY', error='No company info available for SPY')
+
+        assert store.get('AAPL')['info']['sector'] == 'Technology'
+        assert store.get('SPY')['info'] is None
+        assert store.get('MSFT') is None
+        assert store.is_fresh(store.get('AAPL'))
+
+        self._age(store, 'AAPL', 31)
+        assert not store.is_fresh(store.get('AAPL'))
+        assert store.stats() == {'symbols': 2, 'fresh': 1, 'ttl_days': 30}
+
+    def test_needs_refresh_orders_missing_then_oldest(self, temp_dir):
+        store = FundamentalsStore(Path(temp_dir) / 'f.db', ttl_days=30)
+        for symbol, age in (('A', 40), ('B', 60), ('C', 1)):
+            store.put(symbol, {'symbol': symbol})
+            self._age(store, symbol, age)
+
+        assert store.needs_refresh(['A', 'B', 'C', 'D']) == ['D', 'B', 'A']
+        assert sorted(store.get_many(['A', 'C', 'D'])) == ['A', 'C']
+
+
+class TestFetcherFundamentals:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _fetcher(self, cache_dir, daily_limit=25, reserve=5):
+        fetcher = DataFetcher(cache_dir=cache_dir, config={
+            'data': {
+                'alpha_vantage_api_key': 'TEST_API_KEY',
+                'api_rate_limit_per_minute': 100,
+                'api_daily_limit': daily_limit,
+                'fundamentals_reserve_calls': reserve
+            }
+        })
+        fetcher.fd = Mock()
+        fetcher.fd.get_company_overview.side_effect = lambda symbol: _overview(f"{symbol} Inc")
+        return fetcher
+
+    def test_get_ticker_info_cached_across_fetchers(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        assert fetcher.get_ticker_info('aapl')['name'] == 'AAPL Inc'
+        assert fetcher.get_ticker_info('AAPL')['name'] == 'AAPL Inc'
+        assert fetcher.fd.get_company_overview.call_count == 1
+
+        # A new process on the same cache directory does not call the API
+        second = self._fetcher(temp_dir)
+        assert second.get_ticker_info('AAPL')['sector'] == 'Technology'
+        second.fd.get_company_overview.assert_not_called()
+
+        second.get_ticker_info('AAPL', force_refresh=True)
+        assert second.fd.get_company_overview.call_count == 1
+
+    def test_unknown_symbol_is_remembered(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        fetcher.fd.get_company_overview.side_effect = lambda symbol: (pd.DataFrame(), None)
+
+        assert 'error' in fetcher.get_ticker_info('SPY')
+        assert 'error' in fetcher.get_ticker_info('SPY')
+        assert fetcher.fd.get_company_overview.call_count == 1
+
+    def test_expired_info_served_when_refresh_fails(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        fetcher.get_ticker_info('AAPL')
+        fetcher.fundamentals.conn.execute("UPDATE fundamentals SET fetched_at = ?",
+                                          ((datetime.now() - timedelta(days=365)).isoformat(),))
+
+        fetcher.fd.get_company_overview.side_effect = ValueError("Thank you for using Alpha Vantage!")
+        assert fetcher.get_ticker_info('AAPL')['name'] == 'AAPL Inc'
+
+    def test_bulk_lookup_is_free_and_refreshes_in_background(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        fetcher.get_ticker_info('AAPL')
+        fetcher.fd.get_company_overview.reset_mock()
+
+        info = fetcher.get_ticker_info_many(['AAPL', 'MSFT', 'GOOGL'])
+        assert list(info) == ['AAPL']
+        assert fetcher.wait_for_background_refreshes(timeout=10)
+
+        called = sorted(call.kwargs['symbol'] for call in fetcher.fd.get_company_overview.call_args_list)
+        assert called == ['GOOGL', 'MSFT']
+        info = fetcher.get_ticker_info_many(['AAPL', 'MSFT', 'GOOGL'], refresh=False)
+        assert info['MSFT']['industry'] == 'Software'
+
+    def test_background_refresh_keeps_quota_reserve(self, temp_dir):
+        fetcher = self._fetcher(temp_dir, daily_limit=7, reserve=5)
+
+        queued = fetcher.refresh_fundamentals_in_background(['A', 'B', 'C', 'D'])
+        assert queued == ['A', 'B', 'C', 'D']
+        assert fetcher.wait_for_background_refreshes(timeout=10)
+
+        assert fetcher.fd.get_company_overview.call_count == 2
+        assert fetcher.rate_limiter.remaining_today() == 5
+        assert fetcher.get_cache_info()['fundamentals']['symbols'] == 2
@@ -4,12 +4,15 @@ import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import json
+import gzip
 import sys
 
 # Add src directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from gcs_uploader import GCSUploader
+from google.api_core import exceptions as api_exceptions
+from tests.fake_gcs import FakeStorageClient
 
 
 class TestGCSUploader:
@@ -105,6 +108,276 @@ class TestGCSUploader:
         # Check result
         assert result_url == "gs://test-bucket/path/results.csv"
 
+    @patch('gcs_uploader.storage')
+    def test_upload_file_gzip_text(self, mock_storage, temp_dir):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        uploaded = {}
+
+        def capture_upload(file_obj, content_type=None, size=None):
+            uploaded['data'] = file_obj.read()
+            uploaded['content_type'] = content_type
+            uploaded['size'] = size
+
+        mock_blob.upload_from_file.side_effect = capture_upload
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        # Highly repetitive CSV content compresses well
+        content = 'Day,Simulation_1\n' + ''.join(f'{i},100.0\n' for i in range(5000))
+        local_file = Path(temp_dir) / 'paths.csv'
+        local_file.write_text(content)
+
+        uploader = GCSUploader(compress_text=True)
+        result_url = uploader.upload_file(str(local_file), "test-bucket", "path/paths.csv")
+
+        assert mock_blob.content_encoding == 'gzip'
+        assert uploaded['content_type'] == 'text/csv'
+        assert gzip.decompress(uploaded['data']).decode() == content
+
+        stats = uploader.transfer_stats[result_url]
+        assert stats['raw_bytes'] == len(content)
+        assert stats['stored_bytes'] == len(uploaded['data']) == uploaded['size']
+        assert stats['stored_bytes'] < stats['raw_bytes']
+        assert stats['content_encoding'] == 'gzip'
+
+    @patch('gcs_uploader.storage')
+    def test_upload_file_gzip_skips_binary(self, mock_storage, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock(spec=['upload_from_file', 'metadata'])
+
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        uploader = GCSUploader(compress_text=True)
+        result_url = uploader.upload_file(str(Path(temp_dir) / 'plot.png'), "test-bucket", "plot.png")
+
+        assert not hasattr(mock_blob, 'content_encoding')
+        assert uploader.transfer_stats[result_url]['content_encoding'] is None
+        assert uploader.transfer_stats[result_url]['stored_bytes'] == len(sample_files['plot.png'])
+
+    def test_is_retryable_error(self):
+        assert GCSUploader.is_retryable_error(api_exceptions.ServiceUnavailable("503"))
+        assert GCSUploader.is_retryable_error(api_exceptions.TooManyRequests("429"))
+        assert GCSUploader.is_retryable_error(api_exceptions.InternalServerError("500"))
+        assert GCSUploader.is_retryable_error(ConnectionError("reset"))
+        assert not GCSUploader.is_retryable_error(api_exceptions.Forbidden("403"))
+        assert not GCSUploader.is_retryable_error(api_exceptions.NotFound("404"))
+        assert not GCSUploader.is_retryable_error(ValueError("bad"))
+
+    @patch('gcs_uploader.time.sleep')
+    @patch('gcs_uploader.storage')
+    def test_upload_file_retries_transient_errors(self, mock_storage, mock_sleep, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        attempts = []
+
+        def flaky_upload(file_obj, content_type=None, size=None):
+            attempts.append(file_obj.read())
+            if len(attempts) < 3:
+                raise api_exceptions.ServiceUnavailable("503 Service Unavailable")
+
+        mock_blob.upload_from_file.side_effect = flaky_upload
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        uploader = GCSUploader(initial_backoff=1.0, max_backoff=2.0)
+        result_url = uploader.upload_file(str(Path(temp_dir) / 'results.csv'), "test-bucket", "results.csv")
+
+        assert result_url == "gs://test-bucket/results.csv"
+        assert mock_blob.upload_from_file.call_count == 3
+        # File is rewound so every attempt sends the full content
+        assert all(data == sample_files['results.csv'].encode() for data in attempts)
+        # Delays are jittered but capped by the backoff schedule
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 1.0
+        assert 0 <= delays[1] <= 2.0
+
+    @patch('gcs_uploader.time.sleep')
+    @patch('gcs_uploader.storage')
+    def test_upload_file_does_not_retry_permanent_errors(self, mock_storage, mock_sleep, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        mock_blob.upload_from_file.side_effect = api_exceptions.Forbidden("403 Forbidden")
+
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        uploader = GCSUploader()
+        with pytest.raises(Exception, match="Failed to upload"):
+            uploader.upload_file(str(Path(temp_dir) / 'results.csv'), "test-bucket", "results.csv")
+
+        assert mock_blob.upload_from_file.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch('gcs_uploader.time.sleep')
+    @patch('gcs_uploader.storage')
+    def test_upload_file_gives_up_after_max_retries(self, mock_storage, mock_sleep, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        mock_blob.upload_from_file.side_effect = api_exceptions.ServiceUnavailable("503")
+
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        uploader = GCSUploader(max_retries=2)
+        with pytest.raises(Exception, match="Failed to upload"):
+            uploader.upload_file(str(Path(temp_dir) / 'results.csv'), "test-bucket", "results.csv")
+
+        assert mock_blob.upload_from_file.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch('gcs_uploader.time.sleep')
+    @patch('gcs_uploader.storage')
+    def test_upload_file_respects_retry_deadline(self, mock_storage, mock_sleep, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        mock_blob.upload_from_file.side_effect = api_exceptions.ServiceUnavailable("503")
+
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_storage.Client.return_value = mock_client
+
+        # Any positive delay overruns a zero budget
+        uploader = GCSUploader(max_retries=10, retry_deadline=0.0)
+        with patch('gcs_uploader.random.uniform', return_value=0.5):
+            with pytest.raises(Exception, match="Failed to upload"):
+                uploader.upload_file(str(Path(temp_dir) / 'results.csv'), "test-bucket", "results.csv")
+
+        assert mock_blob.upload_from_file.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_plan_slices(self):
+        uploader = GCSUploader.__new__(GCSUploader)
+        uploader.slice_size = 100
+
+        assert uploader._plan_slices(250) == [(0, 100), (100, 100), (200, 50)]
+
+        # Slices grow so the count never exceeds the compose limit
+        slices = uploader._plan_slices(100 * 40)
+        assert len(slices) <= 32
+        assert sum(length for _, length in slices) == 100 * 40
+
+    @patch('gcs_uploader.storage')
+    def test_upload_file_sliced_with_fake_store(self, mock_storage, temp_dir):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+
+        content = bytes(range(256)) * 40  # 10240 bytes
+        local_file = Path(temp_dir) / 'AAPL_simulation.csv'
+        local_file.write_bytes(content)
+
+        uploader = GCSUploader(slice_threshold=4096, slice_size=1024, slice_workers=4)
+        result_url = uploader.upload_file(str(local_file), "test-bucket", "run/AAPL_simulation.csv",
+                                          metadata={'upload_source': 'test'})
+
+        assert result_url == "gs://test-bucket/run/AAPL_simulation.csv"
+        data, properties = fake_client.get(("test-bucket", "run/AAPL_simulation.csv"))
+        assert data == content
+        assert properties['content_type'] == 'text/csv'
+        assert properties['metadata'] == {'upload_source': 'test'}
+
+        # Ten slices composed in order, then cleaned up
+        [(destination, sources)] = fake_client.compose_calls
+        assert destination == "run/AAPL_simulation.csv"
+        assert len(sources) == 10
+        assert sources == sorted(sources)
+        assert fake_client.names("test-bucket") == ["run/AAPL_simulation.csv"]
+
+    @patch('gcs_uploader.storage')
+    def test_upload_file_sliced_gzip_with_fake_store(self, mock_storage, temp_dir):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+
+        content = ''.join(f'{i},{i * 0.37:.6f}\n' for i in range(20000))
+        local_file = Path(temp_dir) / 'paths.csv'
+        local_file.write_text(content)
+
+        uploader = GCSUploader(compress_text=True, slice_threshold=1024, slice_size=1024)
+        uploader.upload_file(str(local_file), "test-bucket", "paths.csv")
+
+        data, properties = fake_client.get(("test-bucket", "paths.csv"))
+        assert properties['content_encoding'] == 'gzip'
+        assert gzip.decompress(data).decode() == content
+        assert len(fake_client.compose_calls) == 1
+
+    @patch('gcs_uploader.storage')
+    def test_upload_file_below_slice_threshold_uses_single_stream(self, mock_storage, temp_dir, sample_files):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+
+        uploader = GCSUploader(slice_threshold=1024 * 1024)
+        uploader.upload_file(str(Path(temp_dir) / 'results.csv'), "test-bucket", "results.csv")
+
+        assert fake_client.compose_calls == []
+        assert fake_client.get(("test-bucket", "results.csv"))[0] == sample_files['results.csv'].encode()
+
+    @patch('gcs_uploader.storage')
+    def test_upload_file_sliced_with_mock_client(self, mock_storage, temp_dir):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        slice_blobs = {}
+
+        def make_blob(name, chunk_size=None):
+            blob = Mock()
+            blob.name = name
+            slice_blobs[name] = blob
+            return blob
+
+        mock_bucket.blob.side_effect = make_blob
+        mock_client.bucket.return_value = mock_bucket
+        mock_storage.Client.return_value = mock_client
+
+        local_file = Path(temp_dir) / 'big.bin'
+        local_file.write_bytes(b'x' * 3000)
+
+        uploader = GCSUploader(slice_threshold=1000, slice_size=1000)
+        uploader.upload_file(str(local_file), "test-bucket", "big.bin")
+
+        final_blob = slice_blobs.pop("big.bin")
+        assert len(slice_blobs) == 3
+        final_blob.compose.assert_called_once()
+        assert [b.name for b in final_blob.compose.call_args.args[0]] == sorted(slice_blobs)
+        for blob in slice_blobs.values():
+            blob.upload_from_file.assert_called_once()
+            blob.delete.assert_called_once()
+
+    @patch('gcs_uploader.time.sleep')
+    @patch('gcs_uploader.storage')
+    def test_upload_file_sliced_failure_cleans_up(self, mock_storage, mock_sleep, temp_dir):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+
+        local_file = Path(temp_dir) / 'big.bin'
+        local_file.write_bytes(b'y' * 4000)
+
+        original_upload = FakeStorageClient.put
+
+        def failing_put(self, key, data, properties):
+            if key[1].endswith('__slice_02'):
+                raise api_exceptions.Forbidden("403 Forbidden")
+            original_upload(self, key, data, properties)
+
+        uploader = GCSUploader(slice_threshold=1000, slice_size=1000)
+        with patch.object(FakeStorageClient, 'put', failing_put):
+            with pytest.raises(Exception, match="Failed to upload"):
+                uploader.upload_file(str(local_file), "test-bucket", "big.bin")
+
+        assert fake_client.compose_calls == []
+        assert fake_client.names("test-bucket") == []
+
     @patch('gcs_uploader.storage')
     def test_upload_file_not_found(self, mock_storage):
         mock_client = Mock()
@@ -148,6 +421,55 @@ class TestGCSUploader:
             assert filename in uploaded_files
             assert uploaded_files[filename].startswith("gs://test-bucket/")
 
+    @patch('gcs_uploader.storage')
+    def test_upload_results_directory_manifest_reports_bytes(self, mock_storage, temp_dir, sample_files):
+        mock_client = Mock()
+        mock_bucket = Mock()
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.side_effect = lambda name: Mock(spec=['upload_from_file', 'metadata', 'content_encoding'])
+        mock_storage.Client.return_value = mock_client
+
+        uploader = GCSUploader(compress_text=True)
+        uploaded_files, success = uploader.upload_results_directory(
+            local_dir=temp_dir,
+            bucket_url="gs://test-bucket",
+            prefix="monte-carlo"
+        )
+
+        assert success is True
+        with open(Path(temp_dir) / 'upload_manifest.json') as f:
+            manifest = json.load(f)
+
+        transfer = manifest['transfer']
+        assert set(transfer) == set(sample_files)
+        assert transfer['results.csv']['content_encoding'] == 'gzip'
+        assert transfer['plot.png']['content_encoding'] is None
+        assert manifest['upload_info']['total_raw_bytes'] == sum(t['raw_bytes'] for t in transfer.values())
+        assert manifest['upload_info']['total_stored_bytes'] == sum(t['stored_bytes'] for t in transfer.values())
+
+    @patch('gcs_uploader.storage')
+    def test_upload_results_directory_lists_linked_files(self, mock_storage, temp_dir, sample_files):
+        mock_storage.Client.return_value = Mock()
+        uploader = GCSUploader()
+        uploader.upload_file = Mock(side_effect=lambda local_file_path, bucket_name, object_name, metadata=None:
+                                    f"gs://{bucket_name}/{object_name}")
+
+        cached_url = "gs://test-bucket/alloc-1/20240101_000000/AAPL_simulation.csv"
+        uploaded_files, success = uploader.upload_results_directory(
+            local_dir=temp_dir,
+            bucket_url="gs://test-bucket",
+            prefix="alloc-2",
+            linked_files={'AAPL_simulation.csv': cached_url}
+        )
+
+        assert success is True
+        assert 'AAPL_simulation.csv' not in uploaded_files
+        with open(Path(temp_dir) / 'upload_manifest.json') as f:
+            manifest = json.load(f)
+        assert manifest['files']['AAPL_simulation.csv'] == cached_url
+        assert manifest['linked_files'] == ['AAPL_simulation.csv']
+        assert set(sample_files) <= set(manifest['files'])
+
     @patch('gcs_uploader.storage')
     def test_list_bucket_contents(self, mock_storage):
         mock_client = Mock()
@@ -167,6 +489,108 @@ class TestGCSUploader:
         mock_bucket.list_blobs.assert_called_once_with(prefix="data/")
         assert result == ["file1.csv", "file2.png"]
 
+    @staticmethod
+    def _populate(fake_client, names):
+        for name in names:
+            fake_client.put(("test-bucket", name), f"data for {name}".encode(),
+                            {'content_type': None, 'content_encoding': None, 'metadata': None})
+
+    @patch('gcs_uploader.storage')
+    def test_iter_bucket_contents_is_lazy_and_paginated(self, mock_storage):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+        self._populate(fake_client, [f"alloc-1/20240101/file{i:02d}.csv" for i in range(25)])
+
+        uploader = GCSUploader()
+        blobs = uploader.iter_bucket_contents("test-bucket", prefix="alloc-1/", page_size=10)
+
+        # Nothing is listed until the generator is consumed
+        assert fake_client.list_calls == []
+        first = next(blobs)
+        assert first.name == "alloc-1/20240101/file00.csv"
+
+        names = [first.name] + [blob.name for blob in blobs]
+        assert len(names) == 25
+        assert fake_client.list_calls[0]['page_size'] == 10
+        assert fake_client.list_calls[0]['fields'] == 'items(name,size,updated),nextPageToken'
+
+    @patch('gcs_uploader.storage')
+    def test_get_blob_and_delete_object(self, mock_storage):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+        fake_client.put(("test-bucket", "cache/AAPL.csv"), b"data",
+                        {'content_type': None, 'content_encoding': None, 'metadata': {'cached_at': 'now'}})
+
+        uploader = GCSUploader()
+        assert uploader.get_blob("test-bucket", "cache/AAPL.csv").metadata == {'cached_at': 'now'}
+        assert uploader.get_blob("test-bucket", "cache/MSFT.csv") is None
+
+        assert uploader.delete_object("test-bucket", "cache/AAPL.csv") is True
+        assert uploader.get_blob("test-bucket", "cache/AAPL.csv") is None
+        assert uploader.delete_object("test-bucket", "cache/AAPL.csv") is False
+
+    @patch('gcs_uploader.storage')
+    def test_list_prefixes(self, mock_storage):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+        self._populate(fake_client, [
+            "results/alloc-a/20240101/AAPL_simulation.csv",
+            "results/alloc-a/20240101/upload_manifest.json",
+            "results/alloc-b/20240102/MSFT_simulation.csv",
+            "results/readme.txt",
+        ])
+
+        uploader = GCSUploader()
+        prefixes = list(uploader.list_prefixes("test-bucket", prefix="results/"))
+
+        assert prefixes == ["results/alloc-a/", "results/alloc-b/"]
+        assert fake_client.list_calls[0]['delimiter'] == '/'
+
+    @patch('gcs_uploader.storage')
+    def test_download_prefix(self, mock_storage, temp_dir):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+        names = [f"results/alloc-a/run/file{i:03d}.csv" for i in range(50)]
+        self._populate(fake_client, names + ["results/alloc-a/", "results/other/skip.csv"])
+
+        uploader = GCSUploader()
+        downloaded, success = uploader.download_prefix(
+            "test-bucket", "results/alloc-a/", temp_dir, max_workers=4
+        )
+
+        assert success is True
+        assert sorted(downloaded) == names
+        for name in names:
+            local_file = Path(temp_dir) / name[len("results/alloc-a/"):]
+            assert downloaded[name] == str(local_file.resolve())
+            assert local_file.read_text() == f"data for {name}"
+
+    @patch('gcs_uploader.storage')
+    def test_download_prefix_with_filter_and_failures(self, mock_storage, temp_dir):
+        fake_client = FakeStorageClient()
+        mock_storage.Client.return_value = fake_client
+        self._populate(fake_client, [
+            "run/a_summary.json", "run/b_summary.json", "run/a_simulation.csv", "run/../escape.json"
+        ])
+
+        uploader = GCSUploader(max_retries=0)
+        original_download = uploader._call_with_retry
+
+        def failing_retry(func, description):
+            if description.endswith("b_summary.json"):
+                raise api_exceptions.Forbidden("403 Forbidden")
+            return original_download(func, description)
+
+        uploader._call_with_retry = failing_retry
+        downloaded, success = uploader.download_prefix(
+            "test-bucket", "run/", str(Path(temp_dir) / "out"),
+            name_filter=lambda name: name.endswith(".json")
+        )
+
+        assert success is False
+        assert list(downloaded) == ["run/a_summary.json"]
+        assert not (Path(temp_dir) / "escape.json").exists()
+
     @patch('gcs_uploader.storage')
     def test_get_bucket_info(self, mock_storage):
         mock_client = Mock()
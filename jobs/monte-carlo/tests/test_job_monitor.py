@@ -0,0 +1,161 @@
+import pytest
+import json
+import os
+import tempfile
+import shutil
+import subprocess
+import time
+from pathlib import Path
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from job_monitor import JobMonitor
+from nomad_dispatcher import NomadClient
+from tests.fake_nomad import FakeNomad
+
+
+EVENTS = Path(__file__).parent / 'fixtures' / 'nomad' / 'events.ndjson'
+PREFIX = 'monte-carlo-batch/dispatch-1760860800-'
+
+
+def recorded_frames():
+    with open(EVENTS, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TestJobMonitor:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def nomad(self):
+        with FakeNomad() as nomad:
+            nomad.load_events(EVENTS)
+            yield nomad
+
+    def test_replay_tracks_outcomes_and_reschedules(self):
+        monitor = JobMonitor()
+        changes = []
+        for frame in recorded_frames():
+            for event in frame.get('Events', []):
+                job = monitor.apply(event)
+                if job is not None:
+                    changes.append((job.tickers, job.status))
+
+        assert monitor.done
+        assert monitor.index == 110
+        assert {job.tickers: job.status for job in monitor.jobs.values()} == {
+            'AAPL': 'complete', 'MSFT': 'complete', 'TSLA': 'failed'}
+        assert monitor.jobs[PREFIX + 'bbbb2222'].reschedules == 1
+        assert len(monitor.jobs[PREFIX + 'bbbb2222'].allocations) == 2
+        assert 'traefik' not in monitor.jobs
+
+        counts = monitor.counts()
+        assert (counts['complete'], counts['failed'], counts['rescheduled']) == (2, 1, 1)
+        # The failed first MSFT allocation is not reported as a failed job
+        assert ('MSFT', 'failed') in changes
+        assert changes[-2:] == [('TSLA', 'failed'), ('MSFT', 'complete')]
+
+    def test_seed_from_listing(self):
+        monitor = JobMonitor(job_ids=[PREFIX + 'aaaa1111', PREFIX + 'cccc3333'])
+        monitor.seed([
+            {'ID': PREFIX + 'aaaa1111', 'Status': 'dead', 'Meta': {'TICKER': 'AAPL'},
+             'JobSummary': {'Summary': {'simulation': {'Complete': 1, 'Failed': 0}}}},
+            {'ID': PREFIX + 'bbbb2222', 'Status': 'running'},
+            {'ID': PREFIX + 'cccc3333', 'Status': 'running', 'Meta': {'TICKER': 'TSLA'},
+             'JobSummary': {'Summary': {'simulation': {'Running': 1}}}},
+        ], index=42)
+
+        assert monitor.index == 42
+        assert set(monitor.jobs) == {PREFIX + 'aaaa1111', PREFIX + 'cccc3333'}
+        assert monitor.jobs[PREFIX + 'aaaa1111'].status == 'complete'
+        assert monitor.jobs[PREFIX + 'cccc3333'].status == 'running'
+        assert not monitor.done
+
+    def test_single_stream_from_listing_index(self, nomad):
+        monitor = JobMonitor()
+        assert monitor.run(NomadClient(address=nomad.address), timeout=10, reconnect_delay=0.01)
+
+        assert len(nomad.streams) == 1
+        assert nomad.streams[0] == {'index': nomad.index + 1, 'topics': ['Allocation', 'Job']}
+        assert monitor.counts()['complete'] == 2
+
+    def test_reconnects_from_last_index(self, nomad):
+        nomad.stream_limit = 3
+        monitor = JobMonitor()
+        assert monitor.run(NomadClient(address=nomad.address), timeout=10, reconnect_delay=0.01)
+
+        indexes = [stream['index'] for stream in nomad.streams]
+        assert len(indexes) > 1
+        assert indexes == sorted(indexes)
+        assert indexes[1] == 104
+        assert monitor.jobs[PREFIX + 'bbbb2222'].reschedules == 1
+        assert monitor.counts()['failed'] == 1
+
+    def test_timeout_when_jobs_still_running(self, nomad):
+        nomad.events = [frame for frame in nomad.events if frame.get('Index', 0) <= 104]
+        monitor = JobMonitor()
+        assert not monitor.run(NomadClient(address=nomad.address), timeout=0.3, reconnect_delay=0.05)
+        assert monitor.counts()['running'] == 3
+
+    def test_timeout_while_stream_sends_only_heartbeats(self, nomad):
+        """A quiet stream kept open by heartbeats still honours the timeout"""
+        nomad.events = [frame for frame in nomad.events if frame.get('Index', 0) <= 104]
+        nomad.heartbeats = 50
+        nomad.heartbeat_interval = 0.1
+        monitor = JobMonitor()
+
+        started = time.monotonic()
+        assert not monitor.run(NomadClient(address=nomad.address), timeout=0.5, reconnect_delay=0.05)
+        assert time.monotonic() - started < 2.5
+        assert len(nomad.streams) == 1
+
+    def test_cli_report_and_exit_code(self, nomad, temp_dir):
+        record = Path(temp_dir) / 'dispatch.json'
+        report = Path(temp_dir) / 'monitor.json'
+        record.write_text(json.dumps({'dispatched': [
+            {'tickers': ['AAPL'], 'job_id': PREFIX + 'aaaa1111'},
+            {'tickers': ['MSFT'], 'job_id': PREFIX + 'bbbb2222'}]}))
+
+        script = Path(__file__).parent.parent / 'src' / 'job_monitor.py'
+        result = subprocess.run([sys.executable, str(script), '--nomad-addr', nomad.address,
+                                 '--dispatch-record', str(record), '--timeout', '10', '--report', str(report)],
+                                capture_output=True, text=True, timeout=30)
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert 'Completed=2' in result.stdout
+        data = json.loads(report.read_text())
+        assert [job['tickers'] for job in data['jobs']] == ['AAPL', 'MSFT']
+        assert data['counts']['rescheduled'] == 1
+
+    def test_dispatch_script_follows_jobs_with_monitor(self, nomad, temp_dir):
+        """dispatch-batch-jobs.sh --wait hands the dispatched jobs to job_monitor.py"""
+        bin_dir = Path(temp_dir) / 'bin'
+        bin_dir.mkdir()
+        fake_cli = bin_dir / 'nomad'
+        fake_cli.write_text(f"""#!/bin/bash
+case "$1 $2" in
+    "job inspect") exit 0 ;;
+    "job dispatch")
+        case "$*" in
+            *TICKER=AAPL*) echo "Dispatched Job ID = {PREFIX}aaaa1111" ;;
+            *TICKER=MSFT*) echo "Dispatched Job ID = {PREFIX}bbbb2222" ;;
+        esac ;;
+esac
+""")
+        fake_cli.chmod(0o755)
+
+        script = Path(__file__).parent.parent / 'dispatch-batch-jobs.sh'
+        env = {**os.environ, 'PATH': f"{bin_dir}:{os.environ['PATH']}", 'NOMAD_ADDR': nomad.address,
+               'PYTHON': sys.executable}
+        result = subprocess.run(['bash', str(script), '--wait', '--timeout', '10', 'AAPL', 'MSFT'],
+                                capture_output=True, text=True, timeout=60, env=env)
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert 'Followed 2 jobs: 2 completed' in result.stdout
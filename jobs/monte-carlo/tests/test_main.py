@@ -0,0 +1,223 @@
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import os
+import subprocess
+import tempfile
+import shutil
+import yaml
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_fetcher import DataFetcher
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+
+class TestMainStartup:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def warm_run(self, temp_dir):
+        """Config and cache directory for a run served entirely from the cache"""
+        config = {
+            'data': {
+                'alpha_vantage_api_key': 'TEST_API_KEY',
+                'api_client': 'pooled',
+                'cache_format': 'csv'
+            }
+        }
+        config_path = Path(temp_dir) / 'simulation.yaml'
+        config_path.write_text(yaml.safe_dump(config))
+
+        cache_dir = Path(temp_dir) / 'cache'
+        fetcher = DataFetcher(cache_dir=str(cache_dir), config=config)
+        dates = pd.bdate_range(end=datetime.now(), periods=300)
+        close = 100 + np.cumsum(np.random.RandomState(1).normal(0, 1, 300))
+        for ticker in ('AAPL', 'MSFT', 'GOOGL'):
+            fetcher._save_to_cache(ticker, '2y', pd.DataFrame({
+                'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6
+            }, index=dates))
+            fetcher.fundamentals.put(ticker, {'symbol': ticker, 'sector': 'Technology', 'industry': 'Hardware'})
+
+        return config_path, cache_dir
+
+    def _run_main(self, temp_dir, config_path, cache_dir, *extra, tickers='AAPL'):
+        env = dict(os.environ, PYTHONPATH=str(SRC_DIR), MPLBACKEND='Agg')
+        env.pop('ALPHA_VANTAGE_API_KEY', None)
+        return subprocess.run(
+            [sys.executable, str(SRC_DIR / 'main.py'), '--tickers', tickers, '--days', '5',
+             '--simulations', '50', '--config', str(config_path), '--cache-dir', str(cache_dir),
+             '--output-dir', str(Path(temp_dir) / 'results'), *extra],
+            env=env, capture_output=True, text=True, timeout=120
+        )
+
+    def test_warm_cache_run_skips_heavy_imports(self, temp_dir, warm_run):
+        timings_path = Path(temp_dir) / 'timings.json'
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--timings', str(timings_path))
+
+        assert result.returncode == 0, result.stdout + result.stderr
+
+        # Recent pandas versions import pyarrow themselves when it is
+        # installed; nothing else may be loaded by a warm csv-cache run
+        baseline = subprocess.run([sys.executable, '-c', "import sys, pandas; print('pyarrow' in sys.modules)"],
+                                  capture_output=True, text=True).stdout.strip() == 'True'
+        expected = ['pyarrow'] if baseline else []
+
+        report = json.loads(timings_path.read_text())
+        assert report['heavy_modules_loaded'] == expected
+        assert f"Heavy modules loaded: {', '.join(expected) or 'none'}" in result.stdout
+        assert {'imports', 'setup', 'fetch', 'simulate'} <= set(report['phases'])
+        assert 'upload' not in report['phases']
+
+        summary = json.loads((Path(temp_dir) / 'results' / 'AAPL_summary.json').read_text())
+        assert summary['sector'] == 'Technology'
+
+    def test_timings_flag_is_optional(self, temp_dir, warm_run):
+        result = self._run_main(temp_dir, *warm_run, '--no-plots')
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Timings:" not in result.stdout
+
+    def test_fundamentals_refresh_is_opt_in(self, temp_dir, warm_run):
+        config_path, cache_dir = warm_run
+        fetcher = DataFetcher(cache_dir=str(cache_dir), config=yaml.safe_load(config_path.read_text()))
+        fetcher.fundamentals.conn.execute("DELETE FROM fundamentals WHERE symbol = 'AAPL'")
+
+        # Without the flag no overview fetch is queued, so nothing is spent
+        # (the test API key would make any request fail)
+        result = self._run_main(temp_dir, config_path, cache_dir, '--no-plots', '--refresh-wait', '0')
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "info refresh" not in result.stdout
+        assert fetcher.fundamentals.needs_refresh(['AAPL']) == ['AAPL']
+
+    def test_packed_dispatch_tickers(self, temp_dir, warm_run):
+        # TICKER meta of a packed dispatch, plus the payload file Nomad writes
+        payload = Path(temp_dir) / 'tickers.txt'
+        payload.write_text("MSFT\ngoogl\n")
+
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--tickers-file', str(payload),
+                                tickers='aapl,MSFT')
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Starting Monte Carlo simulation for: AAPL, MSFT, GOOGL" in result.stdout
+        for ticker in ('AAPL', 'MSFT', 'GOOGL'):
+            assert (Path(temp_dir) / 'results' / f'{ticker}_summary.json').exists()
+
+        # Unpacked dispatches have no payload file
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--tickers-file', str(Path(temp_dir) / 'missing'))
+        assert result.returncode == 0, result.stdout + result.stderr
+
+    def test_chunked_runs_reduce_to_one_summary(self, temp_dir, warm_run):
+        from distributed import load_partials, reduce_runs
+
+        for index in ('0', '1', '2'):
+            result = self._run_main(temp_dir, *warm_run, '--no-plots', '--chunk-index', index,
+                                    '--chunk-count', '3', '--seed', '7')
+            assert result.returncode == 0, result.stdout + result.stderr
+
+        results_dir = Path(temp_dir) / 'results'
+        assert not list(results_dir.glob('*_simulation.csv'))
+        summaries, errors = reduce_runs(load_partials(str(results_dir)))
+        assert errors == []
+        assert [(s['ticker'], s['simulations'], s['chunks']) for s in summaries] == [('AAPL', 50, 3)]
+
+        # Unset Nomad meta is interpolated as empty strings: a normal run
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--chunk-index', '',
+                                '--chunk-count', '', '--seed', '')
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert (results_dir / 'AAPL_simulation.csv').exists()
+
+    def test_chunk_uses_dispatched_parameters(self, temp_dir, warm_run):
+        from distributed import fit_parameters, run_chunk
+
+        config_path, cache_dir = warm_run
+        history, _ = DataFetcher(cache_dir=str(cache_dir), config=yaml.safe_load(config_path.read_text())) \
+            .fetch_ticker_data('AAPL', period='2y')
+        fit = fit_parameters(history)
+
+        # TSLA has no cached history: the dispatched fit is all the chunk needs
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--chunk-index', '1', '--chunk-count', '2',
+                                '--seed', '7', '--parameters', json.dumps(fit), tickers='TSLA')
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert 'Fetching data for TSLA' not in result.stdout
+        partial = json.loads(next((Path(temp_dir) / 'results').glob('TSLA_chunk_*_partial.json')).read_text())
+        expected = run_chunk('TSLA', None, 5, 50, [0.05, 0.95], 1, 2, 7, fit=fit)
+        assert partial['summary'] == expected['summary'] and partial['parameters'] == fit['parameters']
+
+        # Without it, a chunk with no data fails instead of leaving a gap for the reducer
+        no_key = Path(temp_dir) / 'no-key.yaml'
+        no_key.write_text(yaml.safe_dump({'data': {'cache_format': 'csv'}}))
+        result = self._run_main(temp_dir, no_key, cache_dir, '--no-plots', '--chunk-index', '0',
+                                '--chunk-count', '2', '--seed', '7', tickers='TSLA')
+        assert result.returncode == 1, result.stdout + result.stderr
+        assert 'no partial summary for TSLA' in result.stdout
+        assert not list((Path(temp_dir) / 'results').glob('TSLA_chunk_0000_*'))
+
+    def test_chunk_resumes_from_checkpoint(self, temp_dir, warm_run):
+        from checkpoint import LocalCheckpointStore
+        from distributed import chunk_identity, find_checkpoint, run_chunk
+
+        # A previous allocation finished the chunk but was evicted before uploading
+        checkpoints = LocalCheckpointStore(str(Path(temp_dir) / 'checkpoints'))
+        config_path, cache_dir = warm_run
+        history, _ = DataFetcher(cache_dir=str(cache_dir), config=yaml.safe_load(config_path.read_text())) \
+            .fetch_ticker_data('AAPL', period='2y')
+        expected = run_chunk('AAPL', history[['Close']], 5, 50, [0.05, 0.95], 0, 2, 7,
+                             checkpoint_store=checkpoints)
+
+        result = self._run_main(temp_dir, *warm_run, '--no-plots', '--chunk-index', '0', '--chunk-count', '2',
+                                '--seed', '7', '--checkpoint', str(Path(temp_dir) / 'checkpoints'))
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Resuming chunk 1/2 from checkpoint" in result.stdout
+        partial = json.loads(next((Path(temp_dir) / 'results').glob('AAPL_chunk_*_partial.json')).read_text())
+        assert partial['summary'] == expected['summary']
+        # Stored partials make the checkpoint unnecessary
+        assert find_checkpoint(checkpoints, chunk_identity('AAPL', 5, 50, [0.05, 0.95], 0, 2, 7)) is None
+
+    def test_result_cache_short_circuits_identical_runs(self, temp_dir, warm_run):
+        result_cache = str(Path(temp_dir) / 'results-cache')
+        results_dir = Path(temp_dir) / 'results'
+
+        uncached = self._run_main(temp_dir, *warm_run, '--no-plots', tickers='AAPL,MSFT')
+        assert uncached.returncode == 0, uncached.stdout + uncached.stderr
+        expected = {ticker: json.loads((results_dir / f'{ticker}_summary.json').read_text())
+                    for ticker in ('AAPL', 'MSFT')}
+        expected_csv = (results_dir / 'MSFT_simulation.csv').read_text()
+        shutil.rmtree(results_dir)
+
+        first = self._run_main(temp_dir, *warm_run, '--no-plots', '--result-cache', result_cache)
+        assert first.returncode == 0, first.stdout + first.stderr
+        assert "Result cache hit" not in first.stdout
+
+        # AAPL comes from the cache; MSFT still draws what it would have drawn
+        second = self._run_main(temp_dir, *warm_run, '--no-plots', '--result-cache', result_cache,
+                                tickers='AAPL,MSFT')
+        assert second.returncode == 0, second.stdout + second.stderr
+        assert second.stdout.count("Result cache hit") == 1
+        for ticker in ('AAPL', 'MSFT'):
+            summary = json.loads((results_dir / f'{ticker}_summary.json').read_text())
+            assert summary['statistics'] == expected[ticker]['statistics']
+            assert summary['var'] == expected[ticker]['var']
+        assert (results_dir / 'MSFT_simulation.csv').read_text() == expected_csv
+        assert json.loads((Path(result_cache) / 'latest' / 'MSFT_5d_50.json').read_text())['key']
+
+        forced = self._run_main(temp_dir, *warm_run, '--no-plots', '--result-cache', result_cache,
+                                '--force-recompute', '')
+        assert "Result cache hit" in forced.stdout
+        forced = self._run_main(temp_dir, *warm_run, '--no-plots', '--result-cache', result_cache,
+                                '--force-recompute')
+        assert forced.returncode == 0, forced.stdout + forced.stderr
+        assert "Result cache hit" not in forced.stdout
@@ -132,6 +132,26 @@ class TestMonteCarloSimulator:
         # Check VaR results
         assert len(results['var']) == 2
 
+    def test_summarize_results(self, simulator, sample_dataframe):
+        import json
+
+        results = simulator.run_simulation(
+            historical_data=sample_dataframe,
+            days=10,
+            simulations=100,
+            confidence_levels=[0.05, 0.95]
+        )
+        summary = MonteCarloSimulator.summarize_results('TEST', results)
+
+        # Summary must survive a JSON round trip without the path matrix
+        restored = json.loads(json.dumps(summary))
+        assert restored['ticker'] == 'TEST'
+        assert restored['simulations'] == 100
+        assert restored['days'] == 10
+        assert restored['statistics']['mean'] == pytest.approx(results['statistics']['mean'])
+        assert set(restored['var']) == {'0.05', '0.95'}
+        assert 'paths' not in restored
+
     def test_run_simulation_insufficient_data(self, simulator):
         # Create DataFrame with insufficient data (< 30 days)
         short_data = pd.DataFrame({
@@ -0,0 +1,198 @@
+import pytest
+import json
+import tempfile
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import nomad_dispatcher
+from nomad_dispatcher import Dispatcher, NomadClient, NomadError, shard_tickers, parse_meta
+from tests.fake_nomad import FakeNomad
+
+
+TICKERS = [f"T{i:03d}" for i in range(20)]
+
+
+class TestNomadDispatcher:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def nomad(self):
+        with FakeNomad() as nomad:
+            yield nomad
+
+    def _dispatcher(self, nomad, **kwargs):
+        kwargs.setdefault('rate', 0)
+        kwargs.setdefault('backoff', 0.01)
+        return Dispatcher(NomadClient(address=nomad.address), **kwargs)
+
+    def test_shard_tickers(self):
+        assert shard_tickers(['A', 'B', 'C', 'D', 'E'], 2) == [['A', 'B'], ['C', 'D'], ['E']]
+        with pytest.raises(ValueError):
+            shard_tickers(['A'], 0)
+
+    def test_concurrent_dispatch_is_bounded(self, nomad):
+        nomad.latency = 0.05
+        results = self._dispatcher(nomad, concurrency=4).dispatch_all(TICKERS, meta={'DAYS': '30'})
+
+        assert [result['tickers'] for result in results] == [[ticker] for ticker in TICKERS]
+        assert all(result['error'] is None and result['job_id'] for result in results)
+        assert sorted(d['meta']['TICKER'] for d in nomad.dispatches) == TICKERS
+        assert all(d['meta']['DAYS'] == '30' for d in nomad.dispatches)
+        assert 1 < nomad.max_in_flight <= 4
+
+    def test_rate_is_paced(self, nomad):
+        started = time.monotonic()
+        self._dispatcher(nomad, rate=50, concurrency=8).dispatch_all(TICKERS[:10])
+
+        assert time.monotonic() - started >= 9 / 50
+        times = sorted(d['time'] for d in nomad.dispatches)
+        assert min(b - a for a, b in zip(times, times[1:])) >= 0.015
+
+    def test_pack_tickers_in_meta(self, nomad):
+        results = self._dispatcher(nomad).dispatch_all(TICKERS[:5], per_dispatch=2)
+
+        assert len(results) == 3
+        assert sorted(d['meta']['TICKER'] for d in nomad.dispatches) == ['T000,T001', 'T002,T003', 'T004']
+
+    def test_pack_tickers_in_payload(self, nomad):
+        self._dispatcher(nomad).dispatch_all(TICKERS[:4], per_dispatch=3, pack='payload')
+
+        packed = next(d for d in nomad.dispatches if d['payload'] is not None)
+        assert packed['meta']['TICKER'] == 'T000'
+        assert packed['payload'].decode().split() == ['T000', 'T001', 'T002']
+        single = next(d for d in nomad.dispatches if d['payload'] is None)
+        assert single['meta']['TICKER'] == 'T003'
+
+    def test_retries_transient_errors_once_per_shard(self, nomad):
+        nomad.fail_next = [503, 429]
+        results = self._dispatcher(nomad, concurrency=1).dispatch_all(['AAPL'])
+
+        assert results[0]['error'] is None
+        assert results[0]['attempts'] == 3
+        assert len(nomad.dispatches) == 1
+
+    def test_rejected_dispatch_is_not_retried(self, nomad):
+        results = self._dispatcher(nomad).dispatch_all(['AAPL'], meta={'REGION': 'eu'})
+
+        assert results[0]['job_id'] is None
+        assert '400' in results[0]['error']
+        assert results[0]['attempts'] == 1
+
+    def test_idempotency_token_prevents_duplicates(self, nomad):
+        client = NomadClient(address=nomad.address)
+        first = client.dispatch('monte-carlo-batch', {'TICKER': 'AAPL'}, idempotency_token='abc')
+        second = client.dispatch('monte-carlo-batch', {'TICKER': 'AAPL'}, idempotency_token='abc')
+
+        assert first['DispatchedJobID'] == second['DispatchedJobID']
+        assert len(nomad.dispatches) == 1
+
+        client.stop_job(first['DispatchedJobID'])
+        assert client.list_jobs('monte-carlo-batch/dispatch-')[0]['Status'] == 'dead'
+        with pytest.raises(NomadError) as error:
+            client.read_job('missing')
+        assert error.value.status == 404
+
+    def test_parse_meta(self):
+        assert parse_meta(['A=1', 'B=x=y']) == {'A': '1', 'B': 'x=y'}
+        with pytest.raises(ValueError):
+            parse_meta(['A'])
+
+    def test_cli(self, nomad, temp_dir):
+        tickers_file = Path(temp_dir) / 'tickers.txt'
+        tickers_file.write_text("msft  # comment\n\nGOOGL\n")
+        output = Path(temp_dir) / 'dispatched.json'
+
+        argv = ['nomad_dispatcher.py', 'aapl', '--tickers-file', str(tickers_file), '--per-dispatch', '2',
+                '--days', '30', '--nomad-addr', nomad.address, '--output', str(output)]
+        with patch.object(sys, 'argv', argv):
+            nomad_dispatcher.main()
+
+        record = json.loads(output.read_text())
+        assert [entry['tickers'] for entry in record['dispatched']] == [['AAPL', 'MSFT'], ['GOOGL']]
+        assert record['failed'] == []
+        assert all(d['meta']['DAYS'] == '30' and d['meta']['SIMULATIONS'] == '10000'
+                   for d in nomad.dispatches)
+
+    def test_cli_chunked_run(self, nomad, temp_dir, monkeypatch):
+        from data_fetcher import DataFetcher
+        from distributed import fit_parameters
+
+        # History for AAPL only: TSLA cannot be fitted and is not dispatched
+        monkeypatch.delenv('ALPHA_VANTAGE_API_KEY', raising=False)
+        cache_dir = str(Path(temp_dir) / 'cache')
+        dates = pd.bdate_range(end=datetime.now(), periods=300)
+        close = 100 + np.cumsum(np.random.RandomState(1).normal(0, 1, 300))
+        history = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6},
+                               index=dates)
+        DataFetcher(cache_dir=cache_dir, config={})._save_to_cache('AAPL', '2y', history)
+
+        output = Path(temp_dir) / 'dispatched.json'
+        argv = ['nomad_dispatcher.py', 'AAPL', 'TSLA', '--chunks', '3', '--seed', '42', '--simulations', '1000000',
+                '--cache-dir', cache_dir, '--config', str(Path(temp_dir) / 'missing.yaml'),
+                '--nomad-addr', nomad.address, '--output', str(output)]
+        with patch.object(sys, 'argv', argv), pytest.raises(SystemExit) as exit_info:
+            nomad_dispatcher.main()
+        assert exit_info.value.code == 1
+
+        record = json.loads(output.read_text())
+        assert (record['chunks'], record['seed']) == (3, 42)
+        assert [entry['chunk_index'] for entry in record['dispatched']] == [0, 1, 2]
+        assert [entry['tickers'] for entry in record['failed']] == [['TSLA']]
+        assert sorted(d['meta']['CHUNK_INDEX'] for d in nomad.dispatches) == ['0', '1', '2']
+        assert all(d['meta']['TICKER'] == 'AAPL' and d['meta']['CHUNK_COUNT'] == '3' and d['meta']['SEED'] == '42'
+                   and d['meta']['SIMULATIONS'] == '1000000' for d in nomad.dispatches)
+        # Every chunk gets the one fit made by the dispatcher
+        expected = fit_parameters(DataFetcher(cache_dir=cache_dir, config={})
+                                  .fetch_ticker_data('AAPL', period='2y', columns=['Close'])[0])
+        assert all(json.loads(d['meta']['PARAMETERS']) == expected for d in nomad.dispatches)
+
+        argv = ['nomad_dispatcher.py', 'AAPL', '--chunks', '3', '--per-dispatch', '2', '--nomad-addr', nomad.address]
+        with patch.object(sys, 'argv', argv), pytest.raises(SystemExit) as exit_info:
+            nomad_dispatcher.main()
+        assert exit_info.value.code == 1
+
+    def test_cli_skips_recent_results(self, nomad, temp_dir):
+        from result_cache import LocalResultCache, latest_name
+
+        cache = LocalResultCache(str(Path(temp_dir) / 'results-cache'))
+        cache.write_latest(latest_name('AAPL', 30, 10000), {'key': 'abc', 'created_at': datetime.now().isoformat()})
+        cache.write_latest(latest_name('MSFT', 30, 10000),
+                           {'key': 'def', 'created_at': (datetime.now() - timedelta(days=2)).isoformat()})
+        cache.write_latest(latest_name('GOOGL', 252, 10000), {'key': 'ghi', 'created_at': datetime.now().isoformat()})
+        output = Path(temp_dir) / 'dispatched.json'
+
+        argv = ['nomad_dispatcher.py', 'AAPL', 'MSFT', 'GOOGL', '--days', '30', '--nomad-addr', nomad.address,
+                '--result-cache', str(Path(temp_dir) / 'results-cache'), '--output', str(output)]
+        with patch.object(sys, 'argv', argv):
+            nomad_dispatcher.main()
+
+        record = json.loads(output.read_text())
+        assert [entry['ticker'] for entry in record['cached']] == ['AAPL']
+        assert sorted(d['meta']['TICKER'] for d in nomad.dispatches) == ['GOOGL', 'MSFT']
+
+        with patch.object(sys, 'argv', argv + ['--force-recompute']):
+            nomad_dispatcher.main()
+        forced = nomad.dispatches[2:]
+        assert sorted(d['meta']['TICKER'] for d in forced) == ['AAPL', 'GOOGL', 'MSFT']
+        assert all(d['meta']['FORCE_RECOMPUTE'] == 'true' for d in forced)
+
+    def test_cli_missing_job(self, nomad):
+        argv = ['nomad_dispatcher.py', 'AAPL', '--job-name', 'other', '--nomad-addr', nomad.address]
+        with patch.object(sys, 'argv', argv), pytest.raises(SystemExit) as exit_info:
+            nomad_dispatcher.main()
+        assert exit_info.value.code == 1
@@ -0,0 +1,135 @@
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_fetcher import DataFetcher
+from prewarm import CachePrewarmer, parse_ticker_list, MAX_CONSECUTIVE_FAILURES
+
+
+class TestCachePrewarmer:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @staticmethod
+    def _api_frame(periods=100):
+        dates = pd.date_range(datetime.now() - timedelta(days=periods), periods=periods, freq='D')
+        return pd.DataFrame({
+            '1. open': 100 + np.random.randn(periods),
+            '2. high': 102 + np.random.randn(periods),
+            '3. low': 98 + np.random.randn(periods),
+            '4. close': 100 + np.random.randn(periods),
+            '5. volume': 1000000.0 + np.random.randint(-1000, 1000, periods)
+        }, index=dates)
+
+    def _fetcher(self, cache_dir, daily_limit=25):
+        fetcher = DataFetcher(cache_dir=cache_dir, config={
+            'data': {
+                'alpha_vantage_api_key': 'TEST_API_KEY',
+                'cache_duration_days': 1,
+                'api_rate_limit_per_minute': 100,
+                'api_daily_limit': daily_limit
+            }
+        })
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.side_effect = lambda symbol, outputsize: (self._api_frame(), {})
+        return fetcher
+
+    @staticmethod
+    def _age(fetcher, ticker, days, period="2y"):
+        meta = fetcher._read_cache_meta(ticker, period)
+        meta['cached_at'] = (datetime.now() - timedelta(days=days)).isoformat()
+        fetcher._write_cache_meta(ticker, period, meta)
+
+    def _seed(self, fetcher, ticker, age_days):
+        fetcher._save_to_cache(ticker, "2y", fetcher._validate_data(self._api_frame(), ticker))
+        self._age(fetcher, ticker, age_days)
+
+    def test_parse_ticker_list(self):
+        tickers = parse_ticker_list(["aapl 3", "# comment", "", "MSFT", "GOOGL, 0.5  # trailing"])
+        assert tickers == {'AAPL': 3.0, 'MSFT': 1.0, 'GOOGL': 0.5}
+
+        with pytest.raises(ValueError):
+            parse_ticker_list(["AAPL 0"])
+
+    def test_rank_by_staleness_and_priority(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        self._seed(fetcher, "OLD", 10)
+        self._seed(fetcher, "VIP", 4)
+        self._seed(fetcher, "FRESH", 0)
+
+        prewarmer = CachePrewarmer(fetcher, Path(temp_dir) / 'state.json')
+        candidates, skipped = prewarmer.rank({'OLD': 1.0, 'VIP': 5.0, 'FRESH': 10.0, 'NEW': 1.0})
+
+        assert [entry['ticker'] for entry in candidates] == ['NEW', 'VIP', 'OLD']
+        assert [(entry['ticker'], entry['reason']) for entry in skipped] == [('FRESH', 'fresh')]
+
+    def test_spends_remaining_quota_and_resumes(self, temp_dir):
+        fetcher = self._fetcher(temp_dir, daily_limit=3)
+        for ticker, age in [("A", 5), ("B", 4), ("C", 3)]:
+            self._seed(fetcher, ticker, age)
+        fetcher.rate_limiter.acquire()  # one call already spent today elsewhere
+
+        state_path = Path(temp_dir) / 'state.json'
+        report = CachePrewarmer(fetcher, state_path).run({'A': 1.0, 'B': 1.0, 'C': 1.0, 'D': 1.0})
+
+        # D has no cache at all and ranks first; two calls were left
+        assert [entry['ticker'] for entry in report['refreshed']] == ['D', 'A']
+        assert report['calls_spent'] == 2
+        assert report['calls_remaining'] == 0
+        assert report['pending'] == ['B', 'C']
+        assert {entry['ticker']: entry['reason'] for entry in report['skipped']} == \
+            {'B': 'quota_exhausted', 'C': 'quota_exhausted'}
+        assert fetcher.cache_status("A", "2y")['state'] == 'fresh'
+
+        state = json.loads(state_path.read_text())
+        assert state['pending'] == ['B', 'C']
+
+        # Next day: a fresh quota picks up the carried-over tickers
+        next_day = self._fetcher(temp_dir, daily_limit=3)
+        report = CachePrewarmer(next_day, state_path).run({'A': 1.0, 'B': 1.0, 'C': 1.0, 'D': 1.0})
+
+        assert [entry['ticker'] for entry in report['refreshed']] == ['B', 'C']
+        assert all(entry['carried_over'] for entry in report['refreshed'])
+        assert report['pending'] == []
+
+    def test_max_calls_caps_spending(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        report = CachePrewarmer(fetcher, Path(temp_dir) / 'state.json', max_calls=1).run({'A': 1.0, 'B': 1.0})
+
+        assert len(report['refreshed']) == 1
+        assert report['calls_spent'] == 1
+        assert len(report['pending']) == 1
+
+    def test_repeated_failures_are_skipped(self, temp_dir):
+        fetcher = self._fetcher(temp_dir)
+        fetcher.ts.get_daily.side_effect = ValueError("Invalid API call")
+        state_path = Path(temp_dir) / 'state.json'
+
+        for _ in range(MAX_CONSECUTIVE_FAILURES):
+            report = CachePrewarmer(fetcher, state_path).run({'BAD': 1.0})
+            assert report['failed'][0]['ticker'] == 'BAD'
+
+        report = CachePrewarmer(fetcher, state_path).run({'BAD': 1.0})
+        assert report['failed'] == []
+        assert report['skipped'][0]['reason'] == 'repeated_failures'
+        assert report['calls_spent'] == 0
+
+    def test_requires_api_key(self, temp_dir, monkeypatch):
+        monkeypatch.delenv('ALPHA_VANTAGE_API_KEY', raising=False)
+        fetcher = DataFetcher(cache_dir=temp_dir, config={})
+        with pytest.raises(ValueError, match="API key"):
+            CachePrewarmer(fetcher, Path(temp_dir) / 'state.json')
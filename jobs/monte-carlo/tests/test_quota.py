@@ -0,0 +1,179 @@
+import pytest
+import tempfile
+import shutil
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from quota import (InMemoryQuotaStore, SQLiteQuotaStore, InMemoryKV, KVQuotaStore,
+                   create_quota_store)
+from data_fetcher import RateLimiter
+
+
+NOON = datetime(2024, 1, 2, 12, 0, 0).timestamp()
+
+
+def _reserve_many(path, now, count, results):
+    """Child process: try to reserve count calls against a shared SQLite store"""
+    store = SQLiteQuotaStore(path)
+    granted = 0
+    for _ in range(count):
+        wait, _ = store.reserve(now, 1000, 30)
+        if wait <= 0:
+            granted += 1
+    results.put(granted)
+
+
+class TestQuotaStores:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture(params=['memory', 'sqlite', 'kv'])
+    def store(self, request, temp_dir):
+        if request.param == 'memory':
+            return InMemoryQuotaStore()
+        if request.param == 'sqlite':
+            return SQLiteQuotaStore(str(Path(temp_dir) / 'quota.db'))
+        return KVQuotaStore(InMemoryKV())
+
+    def test_minute_window(self, store):
+        assert store.reserve(NOON, 2, 10) == (0.0, False)
+        assert store.reserve(NOON + 10, 2, 10) == (0.0, False)
+
+        wait, exhausted = store.reserve(NOON + 15, 2, 10)
+        assert wait == pytest.approx(45.0)
+        assert not exhausted
+        assert store.daily_calls(NOON + 15) == 2
+
+        assert store.reserve(NOON + 60, 2, 10) == (0.0, False)
+
+    def test_daily_limit_and_reset(self, store):
+        assert store.reserve(NOON, 100, 2)[0] == 0.0
+        assert store.reserve(NOON, 100, 2)[0] == 0.0
+
+        wait, exhausted = store.reserve(NOON, 100, 2)
+        assert exhausted
+        assert wait == pytest.approx(12 * 3600)
+
+        tomorrow = NOON + 24 * 3600
+        assert store.daily_calls(tomorrow) == 0
+        assert store.reserve(tomorrow, 100, 2) == (0.0, False)
+
+    def test_sqlite_store_shared_between_instances(self, temp_dir):
+        path = str(Path(temp_dir) / 'quota.db')
+        first = SQLiteQuotaStore(path)
+        second = SQLiteQuotaStore(path)
+
+        assert first.reserve(NOON, 2, 10)[0] == 0.0
+        assert second.reserve(NOON + 1, 2, 10)[0] == 0.0
+
+        # The second instance sees the first one's call
+        assert second.reserve(NOON + 2, 2, 10)[0] == pytest.approx(58.0)
+        assert first.daily_calls(NOON + 2) == 2
+
+    def test_sqlite_store_never_over_grants_across_processes(self, temp_dir):
+        path = str(Path(temp_dir) / 'quota.db')
+        SQLiteQuotaStore(path)
+
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Queue()
+        workers = [ctx.Process(target=_reserve_many, args=(path, NOON, 20, results))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        granted = [results.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=30)
+
+        # 80 attempts against a daily limit of 30
+        assert sum(granted) == 30
+        assert SQLiteQuotaStore(path).daily_calls(NOON) == 30
+
+    def test_kv_store_never_over_grants_under_contention(self):
+        kv = InMemoryKV()
+        stores = [KVQuotaStore(kv, max_attempts=1000) for _ in range(8)]
+
+        def attempt(store):
+            return store.reserve(NOON, 5, 100)[0] == 0.0
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            granted = list(executor.map(attempt, stores * 5))
+
+        assert sum(granted) == 5
+        assert stores[0].daily_calls(NOON) == 5
+
+    def test_kv_cas_rejects_stale_index(self):
+        kv = InMemoryKV()
+
+        assert kv.cas('key', 'a', 0)
+        _, index = kv.get('key')
+        assert not kv.cas('key', 'b', 0)
+        assert kv.cas('key', 'b', index)
+        assert not kv.cas('key', 'c', index)
+        assert kv.get('key')[0] == 'b'
+
+    def test_rate_limiters_share_store(self, temp_dir):
+        path = str(Path(temp_dir) / 'quota.db')
+        first = RateLimiter(calls_per_minute=5, daily_limit=3, store=SQLiteQuotaStore(path))
+        second = RateLimiter(calls_per_minute=5, daily_limit=3, store=SQLiteQuotaStore(path))
+
+        assert first.try_acquire() == 0.0
+        assert second.try_acquire() == 0.0
+        assert first.try_acquire() == 0.0
+
+        assert second.try_acquire() > 0
+        assert first.daily_calls == 3
+        assert second.daily_calls == 3
+
+
+class TestCreateQuotaStore:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_default_is_memory(self, temp_dir):
+        assert isinstance(create_quota_store({}, Path(temp_dir)), InMemoryQuotaStore)
+
+    def test_sqlite_defaults_to_cache_dir(self, temp_dir):
+        store = create_quota_store({'quota_backend': 'sqlite'}, Path(temp_dir))
+
+        assert isinstance(store, SQLiteQuotaStore)
+        assert store.path == Path(temp_dir) / '.quota' / 'api_quota.db'
+        assert store.path.exists()
+
+    def test_sqlite_custom_path(self, temp_dir):
+        path = Path(temp_dir) / 'shared' / 'quota.db'
+        store = create_quota_store({'quota_backend': 'sqlite', 'quota_path': str(path)}, Path(temp_dir))
+
+        assert store.path == path
+
+    def test_consul_backend(self, temp_dir):
+        store = create_quota_store({'quota_backend': 'consul', 'quota_key': 'test/quota',
+                                    'quota_consul_addr': 'consul.service:8500'}, Path(temp_dir))
+
+        assert isinstance(store, KVQuotaStore)
+        assert store.key == 'test/quota'
+        assert store.kv.address == 'http://consul.service:8500'
+
+    def test_consul_backend_uses_nomad_task_token(self, temp_dir, monkeypatch):
+        monkeypatch.delenv('CONSUL_HTTP_TOKEN', raising=False)
+        monkeypatch.setenv('CONSUL_TOKEN', 'task-token')
+        store = create_quota_store({'quota_backend': 'consul'}, Path(temp_dir))
+
+        assert store.kv.session.headers['X-Consul-Token'] == 'task-token'
+
+    def test_unsupported_backend(self, temp_dir):
+        with pytest.raises(ValueError, match="Unsupported quota backend"):
+            create_quota_store({'quota_backend': 'redis'}, Path(temp_dir))
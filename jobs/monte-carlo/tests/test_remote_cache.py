@@ -0,0 +1,173 @@
+import pytest
+import pandas as pd
+import numpy as np
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_fetcher import DataFetcher
+from gcs_uploader import GCSUploader
+from remote_cache import LocalDirectoryCache, GCSRemoteCache, create_remote_cache
+from tests.fake_gcs import FakeStorageClient
+
+
+class TestRemoteCacheBackends:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def fake_client(self):
+        return FakeStorageClient()
+
+    @pytest.fixture
+    def uploader(self, fake_client):
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = fake_client
+            yield GCSUploader()
+
+    @pytest.fixture(params=['directory', 'gcs'])
+    def remote(self, request, temp_dir, uploader):
+        if request.param == 'directory':
+            return LocalDirectoryCache(str(Path(temp_dir) / 'remote'))
+        return GCSRemoteCache(uploader, 'bucket', 'cache')
+
+    def test_put_stat_get_roundtrip(self, remote, temp_dir):
+        source = Path(temp_dir) / 'source.csv'
+        source.write_bytes(b'Date,Close\n2024-01-01,1.0\n')
+        meta = {'cached_at': '2024-01-02T00:00:00', 'format': 'csv', 'rows': 1}
+
+        assert remote.stat('AAPL_2y') is None
+
+        remote.put('AAPL_2y', str(source), meta)
+        assert remote.stat('AAPL_2y') == meta
+
+        target = Path(temp_dir) / 'target.csv'
+        remote.get('AAPL_2y', str(target))
+        assert target.read_bytes() == source.read_bytes()
+
+    def test_gcs_stores_metadata_on_object(self, uploader, fake_client, temp_dir):
+        source = Path(temp_dir) / 'source.csv'
+        source.write_bytes(b'data')
+        GCSRemoteCache(uploader, 'bucket', 'cache/').put('AAPL_2y', str(source),
+                                                          {'cached_at': '2024-01-02T00:00:00'})
+
+        data, properties = fake_client.get(('bucket', 'cache/AAPL_2y'))
+        assert data == b'data'
+        assert properties['metadata']['cached_at'] == '2024-01-02T00:00:00'
+
+    def test_create_remote_cache(self, uploader, temp_dir):
+        gcs = create_remote_cache('gs://bucket/shared/cache', uploader=uploader)
+        assert isinstance(gcs, GCSRemoteCache)
+        assert (gcs.bucket_name, gcs.prefix) == ('bucket', 'shared/cache/')
+
+        local = create_remote_cache(f"file://{temp_dir}/remote")
+        assert isinstance(local, LocalDirectoryCache)
+        assert local.root == Path(temp_dir) / 'remote'
+
+
+class TestDataFetcherRemoteTier:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def remote(self, temp_dir):
+        return LocalDirectoryCache(str(Path(temp_dir) / 'remote'))
+
+    @staticmethod
+    def _config(cache_format='csv'):
+        return {
+            'data': {
+                'alpha_vantage_api_key': 'TEST_API_KEY',
+                'cache_duration_days': 1,
+                'cache_format': cache_format
+            }
+        }
+
+    @staticmethod
+    def _api_frame(periods=50):
+        dates = pd.date_range(datetime.now() - timedelta(days=periods), periods=periods, freq='D')
+        return pd.DataFrame({
+            '1. open': 100 + np.random.randn(periods),
+            '2. high': 102 + np.random.randn(periods),
+            '3. low': 98 + np.random.randn(periods),
+            '4. close': 100 + np.random.randn(periods),
+            '5. volume': 1000000.0 + np.random.randint(-1000, 1000, periods)
+        }, index=dates)
+
+    def _fetcher(self, cache_dir, remote, cache_format='csv'):
+        fetcher = DataFetcher(cache_dir=cache_dir, config=self._config(cache_format),
+                              remote_cache=remote)
+        fetcher.ts = Mock()
+        fetcher.ts.get_daily.return_value = (self._api_frame(), {})
+        return fetcher
+
+    def test_write_back_then_read_through(self, temp_dir, remote):
+        """A second allocation with an empty local cache is served from the remote tier"""
+        first = self._fetcher(str(Path(temp_dir) / 'alloc1'), remote)
+        fetched, is_from_cache = first.fetch_ticker_data("AAPL", "1y")
+        assert not is_from_cache
+        assert remote.stat("AAPL_1y")['cached_at'] == first._read_cache_meta("AAPL", "1y")['cached_at']
+
+        second = self._fetcher(str(Path(temp_dir) / 'alloc2'), remote, cache_format='parquet')
+        result, is_from_cache = second.fetch_ticker_data("AAPL", "1y", columns=['Close'])
+
+        assert is_from_cache
+        second.ts.get_daily.assert_not_called()
+        np.testing.assert_allclose(result['Close'].values, fetched['Close'].values)
+
+        # Stored locally in this fetcher's own format with the origin's timestamp
+        assert second._get_cache_path("AAPL", "1y").suffix == '.parquet'
+        assert second._get_cache_path("AAPL", "1y").exists()
+        assert second._read_cache_meta("AAPL", "1y")['cached_at'] == remote.stat("AAPL_1y")['cached_at']
+
+    def test_expired_remote_entry_seeds_incremental_refresh(self, temp_dir, remote):
+        first = self._fetcher(str(Path(temp_dir) / 'alloc1'), remote)
+        first.fetch_ticker_data("AAPL", "1y")
+
+        meta = remote.stat("AAPL_1y")
+        meta['cached_at'] = (datetime.now() - timedelta(days=3)).isoformat()
+        remote.put("AAPL_1y", str(first._get_cache_path("AAPL", "1y")), meta)
+
+        second = self._fetcher(str(Path(temp_dir) / 'alloc2'), remote)
+        result, is_from_cache = second.fetch_ticker_data("AAPL", "1y")
+
+        assert not is_from_cache
+        # One compact request instead of a full download
+        second.ts.get_daily.assert_called_once()
+        assert second.ts.get_daily.call_args.kwargs['outputsize'] == 'compact'
+        assert second._read_cache_meta("AAPL", "1y")['refresh'] == 'incremental'
+        assert remote.stat("AAPL_1y")['refresh'] == 'incremental'
+
+    def test_stale_remote_not_downloaded(self, temp_dir, remote):
+        fetcher = self._fetcher(temp_dir + '/alloc', remote)
+        fetcher.fetch_ticker_data("AAPL", "1y")
+
+        with patch.object(remote, 'get') as mock_get:
+            assert not fetcher._pull_from_remote("AAPL", "1y")
+            mock_get.assert_not_called()
+
+    def test_remote_failures_fall_back_to_api(self, temp_dir):
+        remote = Mock()
+        remote.stat.side_effect = ConnectionError("unreachable")
+        remote.put.side_effect = ConnectionError("unreachable")
+
+        fetcher = self._fetcher(temp_dir, remote)
+        result, is_from_cache = fetcher.fetch_ticker_data("AAPL", "1y")
+
+        assert not is_from_cache
+        assert not result.empty
+        assert fetcher._is_cache_valid("AAPL", "1y")
@@ -0,0 +1,122 @@
+import pytest
+import json
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from gcs_uploader import GCSUploader
+from result_cache import (GCSResultCache, LocalResultCache, create_result_cache, is_recent, latest_name,
+                          result_key, rng_state_from_dict, rng_state_to_dict, series_fingerprint)
+from tests.fake_gcs import FakeStorageClient
+
+
+class TestResultCache:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def prices(self):
+        dates = pd.bdate_range('2024-01-01', periods=100)
+        return pd.Series(100 + np.arange(100) * 0.5, index=dates, name='Close')
+
+    @pytest.fixture
+    def artifact(self, temp_dir):
+        path = Path(temp_dir) / 'AAPL_simulation.csv'
+        path.write_text("Simulation_1\n100.0\n101.0\n")
+        return str(path)
+
+    def _record(self, key):
+        return {'key': key, 'ticker': 'AAPL', 'summary': {'statistics': {'mean': 101.0}},
+                'rng_state_after': rng_state_to_dict(np.random.RandomState(1))}
+
+    def test_key_covers_series_parameters_and_generator(self, prices):
+        key = result_key(prices, 252, 1000, [0.95], np.random.RandomState(42))
+        assert key == result_key(prices.copy(), 252, 1000, [0.95], np.random.RandomState(42))
+
+        changed = prices.copy()
+        changed.iloc[-1] += 0.01
+        shifted = prices.copy()
+        shifted.index = shifted.index + pd.Timedelta(days=1)
+        advanced = np.random.RandomState(42)
+        advanced.normal(size=3)
+        for other in (result_key(changed, 252, 1000, [0.95], np.random.RandomState(42)),
+                      result_key(shifted, 252, 1000, [0.95], np.random.RandomState(42)),
+                      result_key(prices, 126, 1000, [0.95], np.random.RandomState(42)),
+                      result_key(prices, 252, 1001, [0.95], np.random.RandomState(42)),
+                      result_key(prices, 252, 1000, [0.99], np.random.RandomState(42)),
+                      result_key(prices, 252, 1000, [0.95], advanced)):
+            assert other != key
+        assert series_fingerprint(prices) != series_fingerprint(changed)
+
+    def test_rng_state_round_trip(self):
+        state = np.random.RandomState(42)
+        state.normal(size=5)
+        saved = json.loads(json.dumps(rng_state_to_dict(state)))
+        expected = state.normal(size=5)
+
+        restored = np.random.RandomState(0)
+        restored.set_state(rng_state_from_dict(saved))
+        np.testing.assert_array_equal(restored.normal(size=5), expected)
+
+    def test_local_cache(self, temp_dir, artifact):
+        cache = create_result_cache(str(Path(temp_dir) / 'results-cache'))
+        assert isinstance(cache, LocalResultCache)
+        assert cache.get('abc') is None
+
+        cache.put('abc', self._record('abc'), {'AAPL_simulation.csv': artifact})
+        entry = cache.get('abc')
+        assert entry['summary'] == {'statistics': {'mean': 101.0}}
+        assert cache.artifact_url(entry, 'AAPL_simulation.csv') is None
+
+        restored = Path(temp_dir) / 'restored.csv'
+        cache.restore(entry, 'AAPL_simulation.csv', str(restored))
+        assert restored.read_text() == Path(artifact).read_text()
+
+        (Path(temp_dir) / 'results-cache' / 'abc' / 'AAPL_simulation.csv').unlink()
+        assert cache.get('abc') is None
+
+    def test_gcs_cache_references_uploaded_artifacts(self, artifact):
+        fake_client = FakeStorageClient()
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = fake_client
+            uploader = GCSUploader()
+            cache = create_result_cache('gs://bucket/results-cache', uploader)
+            assert isinstance(cache, GCSResultCache)
+
+            run_url = uploader.upload_file(artifact, 'bucket', 'alloc-1/AAPL_simulation.csv')
+            cache.put('abc', self._record('abc'), {'AAPL_simulation.csv': artifact},
+                      urls={'AAPL_simulation.csv': run_url})
+            assert not fake_client.contains(('bucket', 'results-cache/abc/AAPL_simulation.csv'))
+            assert cache.artifact_url(cache.get('abc'), 'AAPL_simulation.csv') == run_url
+
+            # Without an uploaded copy the artifact is stored in the entry
+            cache.put('def', self._record('def'), {'AAPL_simulation.csv': artifact})
+            assert fake_client.contains(('bucket', 'results-cache/def/AAPL_simulation.csv'))
+
+            # A deleted run upload invalidates the entries pointing at it
+            fake_client.delete(('bucket', 'alloc-1/AAPL_simulation.csv'))
+            assert cache.get('abc') is None
+            assert cache.get('def') is not None
+
+    def test_latest_pointer(self, temp_dir):
+        cache = LocalResultCache(temp_dir)
+        name = latest_name('aapl', 252, 10000)
+        assert name == 'latest/AAPL_252d_10000.json'
+        assert cache.read_latest(name) is None
+
+        cache.write_latest(name, {'key': 'abc', 'created_at': datetime.now().isoformat()})
+        assert is_recent(cache.read_latest(name), 24)
+        assert not is_recent({'key': 'abc', 'created_at': (datetime.now() - timedelta(hours=25)).isoformat()}, 24)
+        assert not is_recent(None, 24)
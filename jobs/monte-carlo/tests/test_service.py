@@ -0,0 +1,202 @@
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import tempfile
+import shutil
+import threading
+import time
+import urllib.request
+import urllib.error
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from aggregate import ResultsAggregator
+from data_fetcher import DataFetcher
+from gcs_uploader import GCSUploader
+from monte_carlo import MonteCarloSimulator
+from service import SimulationService, SimulationRequest, RequestError, ServiceBusy, create_server
+from tests.fake_gcs import FakeStorageClient
+
+
+def _price_history(days=300, start=100.0):
+    dates = pd.bdate_range(end=datetime.now(), periods=days)
+    close = start * np.exp(np.cumsum(np.random.RandomState(7).normal(0.0005, 0.01, days)))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': 1e6}, index=dates)
+
+
+class TestSimulationService:
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def fetcher(self, temp_dir, monkeypatch):
+        monkeypatch.delenv('ALPHA_VANTAGE_API_KEY', raising=False)
+        fetcher = DataFetcher(cache_dir=temp_dir, config={})
+        fetcher._save_to_cache('AAPL', '2y', _price_history())
+        fetcher._save_to_cache('MSFT', '2y', _price_history(start=300.0))
+        return fetcher
+
+    @pytest.fixture
+    def service(self, fetcher):
+        service = SimulationService(fetcher, workers=2, batch_window=0.2,
+                                    defaults={'days': 20, 'simulations': 200, 'confidence_levels': [0.95]})
+        yield service
+        service.close(timeout=10)
+
+    @pytest.fixture
+    def server(self, service):
+        server = create_server(service, '127.0.0.1', 0)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @staticmethod
+    def _call(url, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_request_validation(self):
+        defaults = {'days': 252, 'simulations': 1000, 'confidence_levels': [0.95]}
+        request = SimulationRequest.from_json({'ticker': ' aapl '}, defaults)
+        assert (request.ticker, request.days, request.simulations) == ('AAPL', 252, 1000)
+
+        for payload in ([], {}, {'ticker': 'AAPL', 'days': 0}, {'ticker': 'AAPL', 'simulations': 'many'},
+                        {'ticker': 'AAPL', 'confidence_levels': [1.5]},
+                        {'ticker': 'AAPL', 'upload': 'false'}, {'ticker': 'AAPL', 'upload': 1}):
+            with pytest.raises(RequestError):
+                SimulationRequest.from_json(payload, defaults)
+
+    def test_concurrent_requests_share_one_batch(self, service, fetcher):
+        with patch.object(fetcher, 'fetch_many', wraps=fetcher.fetch_many) as fetch_many, \
+                patch.object(fetcher, 'refresh_fundamentals_in_background') as refresh:
+            requests = [service.submit(SimulationRequest(ticker, 20, 200, [0.95]))
+                        for ticker in ('AAPL', 'MSFT', 'AAPL', 'AAPL')]
+            for request in requests:
+                assert request.done.wait(30)
+
+        fetch_many.assert_called_once()
+        assert fetch_many.call_args.args[0] == ['AAPL', 'MSFT']
+        # Company overviews are not refreshed from the request path by default
+        refresh.assert_not_called()
+        assert all(request.error is None for request in requests)
+        assert {request.result['request']['batch_size'] for request in requests} == {4}
+
+        stats = service.stats()['service']
+        assert stats['batches'] == 1 and stats['completed'] == 4
+        # Same inputs and seed give the same result, whichever worker ran it
+        assert requests[0].result['statistics'] == requests[2].result['statistics']
+
+    def test_cache_miss_does_not_stall_cache_hits(self, service, fetcher):
+        """A miss waiting on the API is fetched off the batching thread"""
+        release = threading.Event()
+        fetch_many = fetcher.fetch_many
+
+        def slow_fetch_many(tickers, *args, **kwargs):
+            if 'TSLA' in tickers:
+                release.wait(30)
+            return fetch_many(tickers, *args, **kwargs)
+
+        with patch.object(fetcher, 'fetch_many', side_effect=slow_fetch_many):
+            miss = service.submit(SimulationRequest('TSLA', 20, 200, [0.95]))
+            # Same batch and a later one: both are served while TSLA waits
+            same_batch = service.submit(SimulationRequest('AAPL', 20, 200, [0.95]))
+            assert same_batch.done.wait(30)
+            later = service.submit(SimulationRequest('MSFT', 20, 200, [0.95]))
+            assert later.done.wait(30)
+            assert not miss.done.is_set()
+
+            release.set()
+            assert miss.done.wait(30)
+
+        assert same_batch.error is None and later.error is None
+        assert isinstance(miss.error, LookupError)
+
+    def test_close_does_not_block_on_full_queue(self, fetcher):
+        service = SimulationService(fetcher, batch_window=0.0, max_queue=1)
+        release = threading.Event()
+        cache_status = fetcher.cache_status
+
+        def stuck_cache_status(*args, **kwargs):
+            release.wait(30)
+            return cache_status(*args, **kwargs)
+
+        with patch.object(fetcher, 'cache_status', side_effect=stuck_cache_status):
+            first = service.submit(SimulationRequest('AAPL', 20, 200, [0.95]))
+            # The batcher holds the first request, so this one fills the queue
+            while service.queue.qsize():
+                time.sleep(0.01)
+            service.submit(SimulationRequest('MSFT', 20, 200, [0.95]))
+
+            closer = threading.Thread(target=service.close, kwargs={'timeout': 0.2})
+            closer.start()
+            closer.join(5)
+            assert not closer.is_alive()
+
+            release.set()
+            assert first.done.wait(30)
+
+        with pytest.raises(ServiceBusy):
+            service.submit(SimulationRequest('AAPL', 20, 200, [0.95]))
+
+    def test_matches_batch_simulation(self, service, fetcher):
+        result = service.simulate(SimulationRequest('AAPL', 20, 200, [0.95]), timeout=30)
+
+        data, _ = fetcher.fetch_ticker_data('AAPL', period='2y', columns=['Close'])
+        expected = MonteCarloSimulator().run_simulation(data, days=20, simulations=200,
+                                                        confidence_levels=[0.95])
+        assert result['statistics']['mean'] == pytest.approx(expected['statistics']['mean'])
+        assert result['initial_price'] == pytest.approx(expected['initial_price'])
+
+    def test_http_api(self, server):
+        status, health = self._call(f"{server}/health")
+        assert status == 200 and health['status'] == 'ok'
+
+        status, result = self._call(f"{server}/simulate", {'ticker': 'msft', 'days': 10})
+        assert status == 200
+        assert result['ticker'] == 'MSFT' and result['days'] == 10 and result['simulations'] == 200
+
+        assert self._call(f"{server}/simulate", {'days': 10})[0] == 400
+        assert self._call(f"{server}/simulate", {'ticker': 'NOPE'})[0] == 404
+        assert self._call(f"{server}/simulate", {'ticker': 'AAPL', 'upload': True})[0] == 400
+        assert self._call(f"{server}/simulate", {'ticker': 'AAPL', 'upload': 'false'})[0] == 400
+        assert self._call(f"{server}/missing")[0] == 404
+
+        status, stats = self._call(f"{server}/stats")
+        # Invalid requests are rejected before they are queued
+        assert stats['service']['requests'] == 2
+        assert stats['cache']['total_files'] == 2
+
+    def test_upload_is_visible_to_aggregator(self, fetcher):
+        fake_client = FakeStorageClient()
+        with patch('gcs_uploader.storage') as mock_storage:
+            mock_storage.Client.return_value = fake_client
+            uploader = GCSUploader()
+
+        service = SimulationService(fetcher, uploader=uploader, gcs_bucket="gs://bucket/results",
+                                    gcs_prefix="service")
+        try:
+            result = service.simulate(SimulationRequest('AAPL', 20, 200, [0.95], upload=True), timeout=30)
+        finally:
+            service.close(timeout=10)
+
+        assert result['uploaded_to'].startswith("gs://bucket/results/service/")
+        report = ResultsAggregator(uploader).aggregate("gs://bucket/results/service")
+        assert report['tickers'][0]['ticker'] == 'AAPL'
+        assert report['tickers'][0]['total_simulations'] == 200